@@ -0,0 +1,75 @@
+"""Add archive tables
+
+Revision ID: 3b9d4e2c71a5
+Revises: f0e029cad3b6
+Create Date: 2026-10-19 18:12:44.209317
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "3b9d4e2c71a5"
+down_revision = "f0e029cad3b6"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "expenses_archive",
+        sa.Column("id", sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column("descriptions", sa.String(), nullable=False),
+        sa.Column("amount", sa.DECIMAL(), nullable=False),
+        sa.Column("time", sa.DateTime(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("group_id", sa.Integer(), nullable=False),
+        sa.Column("category_id", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        op.f("ix_expenses_archive_group_id"),
+        "expenses_archive",
+        ["group_id"],
+        unique=False,
+    )
+    op.create_index(
+        op.f("ix_expenses_archive_user_id"),
+        "expenses_archive",
+        ["user_id"],
+        unique=False,
+    )
+    op.create_table(
+        "replenishments_archive",
+        sa.Column("id", sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column("descriptions", sa.String(), nullable=False),
+        sa.Column("amount", sa.DECIMAL(), nullable=False),
+        sa.Column("time", sa.DateTime(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        op.f("ix_replenishments_archive_user_id"),
+        "replenishments_archive",
+        ["user_id"],
+        unique=False,
+    )
+    op.create_table(
+        "user_archive_totals",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("expense_amount", sa.DECIMAL(), nullable=False),
+        sa.Column("replenishment_amount", sa.DECIMAL(), nullable=False),
+        sa.PrimaryKeyConstraint("user_id"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("user_archive_totals")
+    op.drop_index(
+        op.f("ix_replenishments_archive_user_id"), table_name="replenishments_archive"
+    )
+    op.drop_table("replenishments_archive")
+    op.drop_index(op.f("ix_expenses_archive_user_id"), table_name="expenses_archive")
+    op.drop_index(op.f("ix_expenses_archive_group_id"), table_name="expenses_archive")
+    op.drop_table("expenses_archive")
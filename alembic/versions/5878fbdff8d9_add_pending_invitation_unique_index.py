@@ -0,0 +1,41 @@
+"""Add unique index on pending invitations
+
+Revision ID: 5878fbdff8d9
+Revises: 7fdc8513226f
+Create Date: 2026-10-19 10:12:41.316204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "5878fbdff8d9"
+down_revision = "7fdc8513226f"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Only the newest pending invitation per recipient and group stays pending.
+    op.execute(
+        """
+        UPDATE invitations SET status = 'OVERDUE'
+        WHERE status = 'PENDING' AND id NOT IN (
+            SELECT max(id) FROM invitations
+            WHERE status = 'PENDING'
+            GROUP BY recipient_id, group_id
+        )
+        """
+    )
+    op.create_index(
+        "uq_invitations_pending_recipient_group",
+        "invitations",
+        ["recipient_id", "group_id"],
+        unique=True,
+        postgresql_where=sa.text("status = 'PENDING'"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("uq_invitations_pending_recipient_group", table_name="invitations")
@@ -0,0 +1,45 @@
+"""Add group counter changes table
+
+Revision ID: 68e87b8cc0ae
+Revises: a043afed6bd6
+Create Date: 2026-10-19 15:21:44.092316
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "68e87b8cc0ae"
+down_revision = "a043afed6bd6"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "group_counter_changes",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("group_id", sa.Integer(), nullable=False),
+        sa.Column("member_delta", sa.Integer(), nullable=False),
+        sa.Column("expense_delta", sa.Integer(), nullable=False),
+        sa.Column("amount_delta", sa.DECIMAL(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["group_id"],
+            ["groups.id"],
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        op.f("ix_group_counter_changes_group_id"),
+        "group_counter_changes",
+        ["group_id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        op.f("ix_group_counter_changes_group_id"), table_name="group_counter_changes"
+    )
+    op.drop_table("group_counter_changes")
@@ -0,0 +1,37 @@
+"""Add expense listing indexes
+
+Revision ID: 9d1f6b3e8a20
+Revises: e7a3c9b15f26
+Create Date: 2026-10-19 21:02:57.615380
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "9d1f6b3e8a20"
+down_revision = "e7a3c9b15f26"
+branch_labels = None
+depends_on = None
+
+INDEXES = {
+    "ix_expenses_group_id_time": ["group_id", "time", "id"],
+    "ix_expenses_group_id_category_id_time": ["group_id", "category_id", "time", "id"],
+    "ix_expenses_group_id_user_id_time": ["group_id", "user_id", "time", "id"],
+    "ix_expenses_group_id_amount": ["group_id", "amount", "id"],
+    "ix_expenses_user_id_time": ["user_id", "time", "id"],
+    "ix_expenses_user_id_amount": ["user_id", "amount", "id"],
+}
+
+
+def upgrade() -> None:
+    for name, columns in INDEXES.items():
+        op.create_index(name, "expenses", columns, unique=False)
+    # ix_expenses_group_id_time leads with group_id and replaces it.
+    op.drop_index("ix_expenses_group_id", table_name="expenses")
+
+
+def downgrade() -> None:
+    op.create_index("ix_expenses_group_id", "expenses", ["group_id"], unique=False)
+    for name in INDEXES:
+        op.drop_index(name, table_name="expenses")
@@ -0,0 +1,54 @@
+"""Add group counters table
+
+Revision ID: a043afed6bd6
+Revises: 5878fbdff8d9
+Create Date: 2026-10-19 14:02:17.503811
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "a043afed6bd6"
+down_revision = "5878fbdff8d9"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "group_counters",
+        sa.Column("group_id", sa.Integer(), nullable=False),
+        sa.Column("member_count", sa.Integer(), nullable=False),
+        sa.Column("expense_count", sa.Integer(), nullable=False),
+        sa.Column("total_amount", sa.DECIMAL(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["group_id"],
+            ["groups.id"],
+        ),
+        sa.PrimaryKeyConstraint("group_id"),
+    )
+    op.execute(
+        """
+        INSERT INTO group_counters
+            (group_id, member_count, expense_count, total_amount)
+        SELECT
+            groups.id,
+            (
+                SELECT count(*) FROM user_groups
+                WHERE user_groups.group_id = groups.id
+                AND user_groups.status = 'ACTIVE'
+            ),
+            (SELECT count(*) FROM expenses WHERE expenses.group_id = groups.id),
+            (
+                SELECT coalesce(sum(amount), 0) FROM expenses
+                WHERE expenses.group_id = groups.id
+            )
+        FROM groups
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("group_counters")
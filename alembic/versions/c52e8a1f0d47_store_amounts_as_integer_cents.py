@@ -0,0 +1,57 @@
+"""Store amounts as integer cents
+
+Revision ID: c52e8a1f0d47
+Revises: 3b9d4e2c71a5
+Create Date: 2026-10-19 19:05:31.774102
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "c52e8a1f0d47"
+down_revision = "3b9d4e2c71a5"
+branch_labels = None
+depends_on = None
+
+AMOUNTS = {
+    "expenses": ["amount"],
+    "replenishments": ["amount"],
+    "expenses_archive": ["amount"],
+    "replenishments_archive": ["amount"],
+    "user_archive_totals": ["expense_amount", "replenishment_amount"],
+    "group_counters": ["total_amount"],
+    "group_counter_changes": ["amount_delta"],
+}
+
+
+def convert(to_cents: bool) -> None:
+    # PostgreSQL rewrites each table once in place, partitions included;
+    # SQLite keeps the declared type and only needs the values scaled.
+    postgresql = op.get_bind().dialect.name == "postgresql"
+    for table, columns in AMOUNTS.items():
+        for column in columns:
+            if to_cents:
+                type_, value = sa.BigInteger(), f"round({column} * 100)"
+            else:
+                type_, value = sa.DECIMAL(), f"round({column} / 100.0, 2)"
+            if postgresql:
+                op.alter_column(
+                    table,
+                    column,
+                    type_=type_,
+                    postgresql_using=f"{value}::{'bigint' if to_cents else 'numeric'}",
+                )
+            else:
+                op.execute(f"UPDATE {table} SET {column} = {value}")
+                with op.batch_alter_table(table) as batch_op:
+                    batch_op.alter_column(column, type_=type_)
+
+
+def upgrade() -> None:
+    convert(to_cents=True)
+
+
+def downgrade() -> None:
+    convert(to_cents=False)
@@ -0,0 +1,41 @@
+"""Add description search indexes
+
+Revision ID: e7a3c9b15f26
+Revises: c52e8a1f0d47
+Create Date: 2026-10-19 20:11:48.036517
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "e7a3c9b15f26"
+down_revision = "c52e8a1f0d47"
+branch_labels = None
+depends_on = None
+
+TABLES = (
+    "expenses",
+    "replenishments",
+    "expenses_archive",
+    "replenishments_archive",
+)
+
+
+def upgrade() -> None:
+    # The expression must match database.dialect.search_vector for the
+    # planner to use the index; SQLite searches with LIKE instead.
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    for table in TABLES:
+        op.execute(
+            f"CREATE INDEX ix_{table}_descriptions_search ON {table} "
+            "USING gin (to_tsvector('simple'::regconfig, descriptions))"
+        )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    for table in TABLES:
+        op.execute(f"DROP INDEX ix_{table}_descriptions_search")
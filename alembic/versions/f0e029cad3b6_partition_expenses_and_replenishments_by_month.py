@@ -0,0 +1,112 @@
+"""Partition expenses and replenishments by month
+
+Revision ID: f0e029cad3b6
+Revises: 68e87b8cc0ae
+Create Date: 2026-10-19 16:40:03.518962
+
+"""
+import datetime
+
+from alembic import op
+from dateutil.relativedelta import relativedelta
+
+
+# revision identifiers, used by Alembic.
+revision = "f0e029cad3b6"
+down_revision = "68e87b8cc0ae"
+branch_labels = None
+depends_on = None
+
+MONTHS_AHEAD = 3
+
+COLUMNS = {
+    "expenses": """
+        id integer NOT NULL DEFAULT nextval('expenses_id_seq'),
+        descriptions varchar NOT NULL,
+        amount numeric NOT NULL,
+        time timestamp NOT NULL,
+        user_id integer NOT NULL,
+        group_id integer NOT NULL,
+        category_id integer NOT NULL
+    """,
+    "replenishments": """
+        id integer NOT NULL DEFAULT nextval('replenishments_id_seq'),
+        descriptions varchar NOT NULL,
+        amount numeric NOT NULL,
+        time timestamp NOT NULL,
+        user_id integer NOT NULL
+    """,
+}
+
+INDEXES = {
+    "expenses": ["id", "group_id", "category_id"],
+    "replenishments": ["id"],
+}
+
+FOREIGN_KEYS = {
+    "expenses": [
+        "expenses_group_id_category_id_fkey FOREIGN KEY (group_id, category_id) "
+        "REFERENCES categories_groups (group_id, category_id)",
+        "expenses_user_id_fkey FOREIGN KEY (user_id) REFERENCES users (id)",
+    ],
+    "replenishments": [
+        "replenishments_user_id_fkey FOREIGN KEY (user_id) REFERENCES users (id)",
+    ],
+}
+
+
+def months(table: str) -> list:
+    first = op.get_bind().exec_driver_sql(f"SELECT min(time) FROM {table}").scalar()
+    month = (first or datetime.datetime.utcnow()).date().replace(day=1)
+    last = datetime.date.today().replace(day=1) + relativedelta(months=MONTHS_AHEAD)
+    result = []
+    while month <= last:
+        result.append(month)
+        month += relativedelta(months=1)
+    return result
+
+
+def rebuild(table: str, partitioned: bool) -> None:
+    # The new table is loaded before its keys and indexes are built; the
+    # sequence is detached first so dropping the old table keeps it.
+    new = f"{table}_new"
+    op.execute(f"ALTER SEQUENCE {table}_id_seq OWNED BY NONE")
+    if partitioned:
+        op.execute(f"CREATE TABLE {new} ({COLUMNS[table]}) PARTITION BY RANGE (time)")
+        op.execute(f"CREATE TABLE {table}_default PARTITION OF {new} DEFAULT")
+        for month in months(table):
+            op.execute(
+                f"CREATE TABLE {table}_{month:%Y_%m} PARTITION OF {new} "
+                f"FOR VALUES FROM ('{month}') "
+                f"TO ('{month + relativedelta(months=1)}')"
+            )
+    else:
+        op.execute(f"CREATE TABLE {new} ({COLUMNS[table]})")
+    op.execute(f"INSERT INTO {new} SELECT * FROM {table}")
+    op.execute(f"DROP TABLE {table}")
+    op.execute(f"ALTER TABLE {new} RENAME TO {table}")
+    op.execute(f"ALTER SEQUENCE {table}_id_seq OWNED BY {table}.id")
+    primary_key = "id, time" if partitioned else "id"
+    op.execute(
+        f"ALTER TABLE {table} ADD CONSTRAINT {table}_pkey PRIMARY KEY ({primary_key})"
+    )
+    for column in INDEXES[table]:
+        op.execute(f"CREATE INDEX ix_{table}_{column} ON {table} ({column})")
+    for foreign_key in FOREIGN_KEYS[table]:
+        op.execute(f"ALTER TABLE {table} ADD CONSTRAINT {foreign_key}")
+
+
+def upgrade() -> None:
+    # Partitioning is PostgreSQL only; its primary key must then include
+    # the partition key, so it becomes (id, time).
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    for table in COLUMNS:
+        rebuild(table, partitioned=True)
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    for table in COLUMNS:
+        rebuild(table, partitioned=False)
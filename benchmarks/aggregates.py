@@ -0,0 +1,90 @@
+"""
+Compares summing amounts per group over a NUMERIC column, as amounts were
+stored before, with summing them over the BIGINT cents column they are
+stored in now. Both tables are temporary and hold the same rows.
+
+    PYTHONPATH=src SQLALCHEMY_DATABASE_URI=postgresql://... \
+        python benchmarks/aggregates.py --rows 1000000
+"""
+import argparse
+import os
+import random
+import time
+from decimal import Decimal
+
+from sqlalchemy import (
+    DECIMAL,
+    Column,
+    Integer,
+    MetaData,
+    Table,
+    create_engine,
+    func,
+    select,
+)
+from sqlalchemy.engine import Connection
+
+from database import Money, engine_options
+
+NUMBER = 10
+GROUPS = 100
+
+metadata = MetaData()
+numeric_amounts = Table(
+    "bench_numeric_amounts",
+    metadata,
+    Column("group_id", Integer, nullable=False),
+    Column("amount", DECIMAL, nullable=False),
+    prefixes=["TEMPORARY"],
+)
+cents_amounts = Table(
+    "bench_cents_amounts",
+    metadata,
+    Column("group_id", Integer, nullable=False),
+    Column("amount", Money, nullable=False),
+    prefixes=["TEMPORARY"],
+)
+
+
+def populate(connection: Connection, rows: int) -> None:
+    metadata.create_all(connection)
+    random.seed(0)
+    batch = []
+    for index in range(rows):
+        amount = Decimal(random.randint(1, 10_000_000)).scaleb(-2)
+        batch.append({"group_id": index % GROUPS, "amount": amount})
+        if len(batch) == 10_000 or index == rows - 1:
+            connection.execute(numeric_amounts.insert(), batch)
+            connection.execute(cents_amounts.insert(), batch)
+            batch = []
+
+
+def measure(name: str, connection: Connection, table: Table) -> list:
+    statement = (
+        select(table.c.group_id, func.sum(table.c.amount))
+        .group_by(table.c.group_id)
+        .order_by(table.c.group_id)
+    )
+    connection.execute(statement).all()
+    start = time.perf_counter()
+    for _ in range(NUMBER):
+        sums = connection.execute(statement).all()
+    elapsed = (time.perf_counter() - start) / NUMBER
+    print(f"  {name:8} {elapsed * 1000:8.2f} ms/query")
+    return sums
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+    uri = os.environ.get("SQLALCHEMY_DATABASE_URI", "sqlite://")
+    bench_engine = create_engine(uri, **engine_options(uri))
+    with bench_engine.connect() as connection:
+        populate(connection, args.rows)
+        print(f"{args.rows} rows in {GROUPS} groups")
+        numeric_sums = measure("numeric", connection, numeric_amounts)
+        cents_sums = measure("cents", connection, cents_amounts)
+        differing = sum(a != b for a, b in zip(numeric_sums, cents_sums))
+        print(f"  {differing} of {GROUPS} numeric sums differ from the exact cents")
+    bench_engine.dispose()
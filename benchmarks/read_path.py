@@ -0,0 +1,120 @@
+"""
+Compares building Page[UserExpense] items from ORM instances with the
+column-row fast path used by the read endpoints.
+
+    PYTHONPATH=src SQLALCHEMY_DATABASE_URI=sqlite:// python benchmarks/read_path.py
+"""
+import datetime
+import time
+import tracemalloc
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session, joinedload
+
+from database import Base, engine_options
+from enums import GroupStatusEnum
+from models import Category, CategoryGroup, Expense, Group, User
+from schemas import UserExpense
+from services.rows import USER_EXPENSE_COLUMNS, to_user_expenses
+
+ROWS = 500
+NUMBER = 20
+
+
+def populate(db: Session) -> int:
+    user = User(login="bench@example.com", first_name="bench", last_name="bench")
+    db.add(user)
+    db.flush()
+    group = Group(
+        title="group",
+        description="group",
+        admin_id=user.id,
+        status=GroupStatusEnum.ACTIVE,
+        icon_url="icon",
+        color_code="#000000",
+    )
+    category = Category(title="groceries")
+    db.add_all([group, category])
+    db.flush()
+    db.add(
+        CategoryGroup(
+            group_id=group.id,
+            category_id=category.id,
+            icon_url="icon",
+            color_code="#ffffff",
+        )
+    )
+    start = datetime.datetime(2023, 1, 1)
+    db.add_all(
+        Expense(
+            descriptions=f"expense {index}",
+            amount=index,
+            time=start + datetime.timedelta(hours=index),
+            user_id=user.id,
+            group_id=group.id,
+            category_id=category.id,
+        )
+        for index in range(ROWS)
+    )
+    db.commit()
+    return user.id
+
+
+def orm_path(db: Session, user_id: int) -> list:
+    return db.scalars(
+        select(Expense)
+        .options(
+            joinedload(Expense.category_group).joinedload(CategoryGroup.group),
+            joinedload(Expense.category_group).joinedload(CategoryGroup.category),
+        )
+        .filter_by(user_id=user_id)
+    ).all()
+
+
+def row_path(db: Session, user_id: int) -> list:
+    rows = db.execute(
+        select(*USER_EXPENSE_COLUMNS)
+        .join(Expense.category_group)
+        .join(CategoryGroup.group)
+        .join(CategoryGroup.category)
+        .where(Expense.user_id == user_id)
+    )
+    return to_user_expenses(rows)
+
+
+def validated(path):
+    def validated_path(db: Session, user_id: int) -> list:
+        return [UserExpense.from_orm(item) for item in path(db, user_id)]
+
+    return validated_path
+
+
+def measure(name: str, path, db: Session, user_id: int) -> None:
+    start = time.perf_counter()
+    for _ in range(NUMBER):
+        path(db, user_id)
+        db.expunge_all()
+    elapsed = (time.perf_counter() - start) / NUMBER
+    tracemalloc.start()
+    path(db, user_id)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    db.expunge_all()
+    print(
+        f"{name:12} {elapsed * 1000:8.2f} ms/page"
+        f"  {peak / ROWS:8.0f} bytes/row peak"
+    )
+
+
+if __name__ == "__main__":
+    uri = "sqlite://"
+    bench_engine = create_engine(uri, **engine_options(uri))
+    Base.metadata.create_all(bench_engine)
+    with Session(bench_engine) as db:
+        user_id = populate(db)
+        orm_path(db, user_id)
+        row_path(db, user_id)
+        measure("orm", orm_path, db, user_id)
+        measure("rows", row_path, db, user_id)
+        measure("orm+schema", validated(orm_path), db, user_id)
+        measure("rows+schema", validated(row_path), db, user_id)
@@ -0,0 +1,136 @@
+"""
+Compares running the statements of a totals endpoint one by one, batched
+into a single SELECT and fanned out over the connection pool, with every
+packet to PostgreSQL delayed as if the database ran on another host.
+
+    PYTHONPATH=src SQLALCHEMY_DATABASE_URI=postgresql://... \
+        python benchmarks/round_trips.py --rtt-ms 1 --rtt-ms 5
+"""
+import argparse
+import asyncio
+import datetime
+import os
+import threading
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session
+
+from database import Base, fan_out, select_scalars
+from database.dialect import in_month
+from models import Expense
+from services.totals import sum_amount
+
+NUMBER = 50
+GROUP_ID = 1
+USER_ID = 1
+
+
+class DelayProxy(threading.Thread):
+    """
+    TCP proxy that holds every chunk for half of `rtt` in each direction.
+    """
+
+    def __init__(self, host: str, port: int, rtt: float) -> None:
+        super().__init__(daemon=True)
+        self.target = (host, port)
+        self.delay = rtt / 2
+        self.port = None
+        self._ready = threading.Event()
+
+    def run(self) -> None:
+        asyncio.run(self.serve())
+
+    async def serve(self) -> None:
+        server = await asyncio.start_server(self.handle, "127.0.0.1", 0)
+        self.port = server.sockets[0].getsockname()[1]
+        self._ready.set()
+        async with server:
+            await server.serve_forever()
+
+    async def handle(self, reader, writer) -> None:
+        upstream_reader, upstream_writer = await asyncio.open_connection(*self.target)
+        await asyncio.gather(
+            self.pump(reader, upstream_writer),
+            self.pump(upstream_reader, writer),
+        )
+
+    async def pump(self, reader, writer) -> None:
+        try:
+            while chunk := await reader.read(65536):
+                await asyncio.sleep(self.delay)
+                writer.write(chunk)
+                await writer.drain()
+        finally:
+            writer.close()
+
+    def start_and_wait(self) -> int:
+        self.start()
+        self._ready.wait()
+        return self.port
+
+
+def statements() -> list:
+    month = datetime.date(2023, 2, 1)
+    return [
+        sum_amount(Expense.amount, Expense.group_id == GROUP_ID),
+        sum_amount(
+            Expense.amount,
+            Expense.group_id == GROUP_ID,
+            in_month(Expense.time, month.year, month.month),
+        ),
+        sum_amount(
+            Expense.amount,
+            Expense.group_id == GROUP_ID,
+            in_month(Expense.time, month.year, month.month - 1),
+        ),
+        sum_amount(Expense.amount, Expense.user_id == USER_ID),
+    ]
+
+
+def sequential(db: Session) -> list:
+    return [db.execute(statement).scalar() for statement in statements()]
+
+
+def batched(db: Session) -> list:
+    return list(select_scalars(db, *statements()))
+
+
+def fanned_out(db: Session) -> list:
+    return fan_out(
+        db,
+        *(
+            lambda session, statement=statement: session.execute(statement).scalar()
+            for statement in statements()
+        ),
+    )
+
+
+def measure(name: str, mode, db: Session) -> None:
+    mode(db)
+    start = time.perf_counter()
+    for _ in range(NUMBER):
+        mode(db)
+        db.rollback()
+    elapsed = (time.perf_counter() - start) / NUMBER
+    print(f"  {name:10} {elapsed * 1000:8.2f} ms/call")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rtt-ms", type=float, action="append")
+    args = parser.parse_args()
+    url = make_url(os.environ["SQLALCHEMY_DATABASE_URI"])
+    Base.metadata.create_all(create_engine(url))
+    for rtt_ms in args.rtt_ms or [0.0, 1.0, 5.0]:
+        proxy = DelayProxy(url.host or "localhost", url.port or 5432, rtt_ms / 1000)
+        bench_engine = create_engine(
+            url.set(host="127.0.0.1", port=proxy.start_and_wait())
+        )
+        print(f"rtt {rtt_ms} ms")
+        with Session(bench_engine) as db:
+            measure("sequential", sequential, db)
+            measure("batched", batched, db)
+            measure("fan-out", fanned_out, db)
+        bench_engine.dispose()
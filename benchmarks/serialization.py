@@ -0,0 +1,87 @@
+"""
+Compares the response encoders on the largest payloads the API returns:
+a full page of user history and a month of per-user daily expenses.
+
+    PYTHONPATH=src python benchmarks/serialization.py
+"""
+import datetime
+import json
+import random
+import timeit
+from typing import List
+
+import msgpack
+import orjson
+from fastapi.encoders import jsonable_encoder
+from fastapi_pagination import Page
+
+from schemas import GroupDailyExpensesDetail, UserHistory
+
+NUMBER = 200
+
+
+def user_history_page(size: int = 500) -> Page[UserHistory]:
+    start = datetime.datetime(2023, 1, 1)
+    items = [
+        UserHistory(
+            id=index,
+            descriptions=f"expense {index}",
+            amount=round(random.uniform(1, 1000), 2),
+            time=start + datetime.timedelta(hours=index),
+            category_id=index % 12,
+            group_id=index % 5,
+            color_code_category="#a1b2c3",
+            title_category="groceries",
+            title_group="flat",
+            color_code_group="#c3b2a1",
+        )
+        for index in range(size)
+    ]
+    return Page[UserHistory](items=items, total=size * 4, page=1, size=size, pages=4)
+
+
+def group_daily_expenses(days: int = 31, users: int = 10) -> List:
+    start = datetime.date(2023, 1, 1)
+    return [
+        GroupDailyExpensesDetail(
+            date=start + datetime.timedelta(days=day),
+            total_amount=round(random.uniform(1, 1000), 2),
+            users=[
+                {
+                    "id": user,
+                    "first_name": f"first {user}",
+                    "last_name": f"last {user}",
+                    "amount": round(random.uniform(1, 100), 2),
+                }
+                for user in range(users)
+            ],
+        )
+        for day in range(days)
+    ]
+
+
+ENCODERS = {
+    "json": lambda content: json.dumps(
+        content, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode("utf-8"),
+    "orjson": orjson.dumps,
+    "msgpack": msgpack.packb,
+}
+
+
+def run(name: str, payload) -> None:
+    content = jsonable_encoder(payload)
+    encode_ms = timeit.timeit(lambda: jsonable_encoder(payload), number=NUMBER)
+    print(f"{name}: jsonable_encoder {encode_ms / NUMBER * 1000:.3f} ms")
+    for encoder_name, encoder in ENCODERS.items():
+        seconds = timeit.timeit(lambda: encoder(content), number=NUMBER)
+        print(
+            f"  {encoder_name:8} {seconds / NUMBER * 1000:.3f} ms"
+            f"  {len(encoder(content)):>8} bytes"
+        )
+
+
+if __name__ == "__main__":
+    random.seed(0)
+    run("Page[UserHistory] (500 items)", user_history_page())
+    run("List[GroupDailyExpensesDetail] (31 days x 10 users)", group_daily_expenses())
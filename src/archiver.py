@@ -0,0 +1,56 @@
+"""
+Moves the expenses and replenishments older than ARCHIVE_AFTER_MONTHS
+months to their archive tables, `--chunk-size` rows per transaction. Reads
+keep returning the archived rows. Run it daily, e.g. from cron:
+
+    PYTHONPATH=src python src/archiver.py --chunk-size 1000
+"""
+import argparse
+import sys
+from typing import List, Optional
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from config import settings
+from database import engine_options
+from models import Expense, Replenishment
+from services.archive import archive_cutoff, archive_rows
+
+
+def run(uri: str, chunk_size: int = 1000) -> int:
+    """
+    Archives every row before the cutoff and prints how many rows of each
+    table it moved; returns the exit status, 1 when archiving is disabled.
+    """
+    cutoff = archive_cutoff()
+    if cutoff is None:
+        print("ARCHIVE_AFTER_MONTHS is not set", file=sys.stderr)
+        return 1
+    db_engine = create_engine(uri, **engine_options(uri))
+    for model in (Expense, Replenishment):
+        archived = 0
+        while True:
+            with Session(db_engine) as db:
+                moved = archive_rows(db, model, cutoff, chunk_size)
+                db.commit()
+            if not moved:
+                break
+            archived += moved
+        print(f"Archived {archived} {model.__tablename__} before {cutoff:%Y-%m-%d}")
+    db_engine.dispose()
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--uri", default=settings.SQLALCHEMY_DATABASE_URI)
+    args = parser.parse_args(argv)
+    return run(args.uri, args.chunk_size)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,20 @@
+from config import settings
+from .bus import InvalidationBus
+from .memory import MemoryCache
+from .sqlite import SQLiteCache
+from .tiered import TieredCache, namespace
+
+cache = TieredCache()
+if settings.CACHE_ENABLED:
+    from database import engine, primary_reads
+
+    cache.configure(
+        MemoryCache(
+            maxsize=settings.CACHE_L1_SIZE,
+            ttl=settings.CACHE_L1_TTL_SECONDS,
+            version_ttl=settings.CACHE_L1_VERSION_TTL_SECONDS,
+        ),
+        SQLiteCache(settings.CACHE_FILE, ttl=settings.CACHE_L2_TTL_SECONDS),
+        bus=InvalidationBus(engine) if settings.CACHE_BUS_ENABLED else None,
+        loading=primary_reads,
+    )
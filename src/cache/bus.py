@@ -0,0 +1,101 @@
+import logging
+import os
+import select
+import socket
+import threading
+from typing import Callable, Optional
+
+from sqlalchemy import func, select as sql_select
+from sqlalchemy.engine import Connection, Engine
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "cache_invalidation"
+
+
+class InvalidationBus:
+    """
+    Carries cache invalidations between workers and hosts over PostgreSQL
+    NOTIFY. `publish` sends the namespace and the id of the invalidation
+    event on `channel` in the transaction of the write, so it is delivered
+    when the write commits and never when it rolls back, or else from a
+    pooled connection; a listener thread in every worker holds its own
+    connection on LISTEN and passes the namespaces and events published by
+    the other workers to `on_invalidate`. The listener reconnects after
+    `retry_seconds` if the connection drops.
+    """
+
+    def __init__(
+        self,
+        db_engine: Engine,
+        channel: str = CHANNEL,
+        retry_seconds: float = 1.0,
+    ) -> None:
+        self.engine = db_engine
+        self.channel = channel
+        self.retry_seconds = retry_seconds
+        self.origin = f"{socket.gethostname()}:{os.getpid()}"
+        self.on_invalidate: Optional[Callable[[str, str], None]] = None
+        self.listening = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def publish(
+        self, space: str, event: str, connection: Optional[Connection] = None
+    ) -> None:
+        payload = f"{self.origin} {event} {space}"
+        notify = sql_select(func.pg_notify(self.channel, payload))
+        if connection is not None:
+            connection.execute(notify)
+            return
+        try:
+            with self.engine.connect() as connection:
+                connection.execute(notify)
+                connection.commit()
+        except Exception:
+            logger.exception("Could not publish invalidation of %s", space)
+
+    def start(self, on_invalidate: Callable[[str, str], None]) -> None:
+        self.on_invalidate = on_invalidate
+        self._stopped.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="cache-invalidation", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            try:
+                self._listen()
+            except Exception:
+                logger.exception("Cache invalidation listener failed")
+                self._stopped.wait(self.retry_seconds)
+
+    def _listen(self) -> None:
+        connection = self.engine.raw_connection()
+        try:
+            dbapi_connection = connection.dbapi_connection
+            dbapi_connection.autocommit = True
+            with dbapi_connection.cursor() as cursor:
+                cursor.execute(f'LISTEN "{self.channel}"')
+            self.listening.set()
+            while not self._stopped.is_set():
+                if select.select([dbapi_connection], [], [], 0.5) == ([], [], []):
+                    continue
+                dbapi_connection.poll()
+                while dbapi_connection.notifies:
+                    self.receive(dbapi_connection.notifies.pop(0).payload)
+        finally:
+            self.listening.clear()
+            connection.invalidate()
+
+    def receive(self, payload: str) -> None:
+        origin, event, space = payload.split(" ", 2)
+        if origin != self.origin and self.on_invalidate is not None:
+            self.on_invalidate(space, event)
@@ -0,0 +1,66 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+
+class MemoryCache:
+    """
+    Per-process LRU tier. Entries live for `ttl` seconds. Namespace versions
+    bumped here are only seen by this process, which receives every
+    invalidation event once; versions copied from a slower tier are kept
+    for `version_ttl` seconds, then read from it again.
+    """
+
+    def __init__(
+        self, maxsize: int = 1024, ttl: float = 30.0, version_ttl: float = 1.0
+    ) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.version_ttl = version_ttl
+        self._entries: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+        self._versions: Dict[str, Tuple[float, int]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def version(self, namespace: str) -> Optional[int]:
+        with self._lock:
+            entry = self._versions.get(namespace)
+            if entry is None:
+                return None
+            expires, version = entry
+            if expires <= time.monotonic():
+                del self._versions[namespace]
+                return None
+            return version
+
+    def set_version(self, namespace: str, version: int) -> None:
+        with self._lock:
+            self._versions[namespace] = (time.monotonic() + self.version_ttl, version)
+
+    def bump(self, namespace: str, event: Optional[str] = None) -> None:
+        with self._lock:
+            _, version = self._versions.get(namespace, (0.0, 0))
+            self._versions[namespace] = (float("inf"), version + 1)
@@ -0,0 +1,111 @@
+import random
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS entries "
+    "(key TEXT PRIMARY KEY, value BLOB NOT NULL, expires REAL NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS versions "
+    "(namespace TEXT PRIMARY KEY, version INTEGER NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS events "
+    "(event TEXT PRIMARY KEY, expires REAL NOT NULL)",
+)
+
+
+class SQLiteCache:
+    """
+    Tier shared by every worker process on the host through a SQLite file
+    in WAL mode. It also keeps the namespace versions, so an invalidation
+    in one worker is seen by all of them. A bump for an invalidation event
+    is applied once, by the first worker on the host to apply the event;
+    events are remembered for `event_ttl` seconds. Expired entries are
+    pruned on a `prune_rate` fraction of writes.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        ttl: float = 300.0,
+        prune_rate: float = 0.01,
+        event_ttl: float = 3600.0,
+    ) -> None:
+        self.path = path
+        self.ttl = ttl
+        self.prune_rate = prune_rate
+        self.event_ttl = event_ttl
+        self._local = threading.local()
+        connection = self._connection()
+        connection.execute("PRAGMA journal_mode=WAL")
+        for statement in SCHEMA:
+            connection.execute(statement)
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=1.0, isolation_level=None)
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def get(self, key: str) -> Optional[bytes]:
+        row = (
+            self._connection()
+            .execute(
+                "SELECT value FROM entries WHERE key = ? AND expires > ?",
+                (key, time.time()),
+            )
+            .fetchone()
+        )
+        return row[0] if row else None
+
+    def set(self, key: str, value: bytes) -> None:
+        connection = self._connection()
+        now = time.time()
+        connection.execute(
+            "INSERT OR REPLACE INTO entries (key, value, expires) VALUES (?, ?, ?)",
+            (key, value, now + self.ttl),
+        )
+        if random.random() < self.prune_rate:
+            connection.execute("DELETE FROM entries WHERE expires <= ?", (now,))
+
+    def delete(self, key: str) -> None:
+        self._connection().execute("DELETE FROM entries WHERE key = ?", (key,))
+
+    def version(self, namespace: str) -> int:
+        row = (
+            self._connection()
+            .execute("SELECT version FROM versions WHERE namespace = ?", (namespace,))
+            .fetchone()
+        )
+        return row[0] if row else 0
+
+    def set_version(self, namespace: str, version: int) -> None:
+        # Versions only move forward: others may have bumped past `version`.
+        self._connection().execute(
+            "INSERT INTO versions (namespace, version) VALUES (?, ?) "
+            "ON CONFLICT (namespace) DO UPDATE "
+            "SET version = max(version, excluded.version)",
+            (namespace, version),
+        )
+
+    def bump(self, namespace: str, event: Optional[str] = None) -> None:
+        connection = self._connection()
+        with connection:
+            connection.execute("BEGIN IMMEDIATE")
+            if event is not None:
+                now = time.time()
+                applied = connection.execute(
+                    "INSERT OR IGNORE INTO events (event, expires) VALUES (?, ?)",
+                    (event, now + self.event_ttl),
+                ).rowcount
+                if random.random() < self.prune_rate:
+                    connection.execute("DELETE FROM events WHERE expires <= ?", (now,))
+                if not applied:
+                    return
+            connection.execute(
+                "INSERT INTO versions (namespace, version) VALUES (?, 1) "
+                "ON CONFLICT (namespace) DO UPDATE SET version = version + 1",
+                (namespace,),
+            )
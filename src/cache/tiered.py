@@ -0,0 +1,125 @@
+import pickle
+import uuid
+from contextlib import nullcontext
+from typing import Any, Callable, ContextManager, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+
+def namespace(*parts: Any) -> str:
+    return ":".join(str(part) for part in parts)
+
+
+class TieredCache:
+    """
+    Looks keys up through `tiers` from the fastest to the most shared one
+    and fills the faster tiers on the way back. Keys are versioned per
+    namespace: the last tier holds the versions and the faster ones keep
+    copies of them for a short while, so a hit in memory reads nothing
+    shared. `invalidate` bumps the version, so entries written before it
+    can no longer be reached. With a `bus`, invalidations are also
+    published to the other workers as events that each host applies once:
+    the first of its workers to evict for an event, the publisher on its
+    own host, bumps the shared version and the others only refresh their
+    copies. Misses are loaded inside `loading`, such as on the primary, so
+    no stale read is cached. Without tiers every lookup misses.
+    """
+
+    def __init__(
+        self,
+        *tiers,
+        bus=None,
+        loading: Callable[[], ContextManager] = nullcontext,
+    ) -> None:
+        self.configure(*tiers, bus=bus, loading=loading)
+
+    def configure(
+        self,
+        *tiers,
+        bus=None,
+        loading: Callable[[], ContextManager] = nullcontext,
+    ) -> None:
+        self.tiers = tiers
+        self.bus = bus
+        self.loading = loading
+
+    def _version(self, space: str) -> int:
+        for index, tier in enumerate(self.tiers):
+            version = tier.version(space)
+            if version is not None:
+                for faster in self.tiers[:index]:
+                    faster.set_version(space, version)
+                return version
+        return 0
+
+    def _key(self, space: str, key: str) -> str:
+        return f"{space}:{self._version(space)}:{key}"
+
+    def _get(self, full_key: str) -> Optional[Any]:
+        for index, tier in enumerate(self.tiers):
+            value = tier.get(full_key)
+            if value is not None:
+                for faster in self.tiers[:index]:
+                    faster.set(full_key, value)
+                return pickle.loads(value)
+        return None
+
+    def _set(self, full_key: str, value: Any) -> None:
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        for tier in self.tiers:
+            tier.set(full_key, data)
+
+    def get(self, space: str, key: str) -> Optional[Any]:
+        if not self.tiers:
+            return None
+        return self._get(self._key(space, key))
+
+    def set(self, space: str, key: str, value: Any) -> None:
+        if self.tiers:
+            self._set(self._key(space, key), value)
+
+    def get_or_load(self, space: str, key: str, loader: Callable[[], Any]) -> Any:
+        """
+        Returns the cached value or caches the result of `loader`. The
+        version is read before loading, so a value loaded while an
+        invalidation happens is stored under the old version.
+        """
+        if not self.tiers:
+            return loader()
+        full_key = self._key(space, key)
+        value = self._get(full_key)
+        if value is None:
+            with self.loading():
+                value = loader()
+            if value is not None:
+                self._set(full_key, value)
+        return value
+
+    def evict(self, space: str, event: Optional[str] = None) -> None:
+        """
+        Bumps the version of `space`, once per `event` when given.
+        """
+        if not self.tiers:
+            return
+        *faster, last = self.tiers
+        last.bump(space, event)
+        version = last.version(space)
+        for tier in faster:
+            tier.set_version(space, version)
+
+    def invalidate(self, space: str, db: Optional[Session] = None) -> None:
+        """
+        Evicts `space` here and publishes it to the other workers. Given the
+        session `db` of the write, the event is sent in its transaction and
+        `space` is evicted again once it commits, so a read racing the
+        commit cannot keep the old value cached.
+        """
+        invalidation = uuid.uuid4().hex
+        self.evict(space, invalidation)
+        if db is not None:
+            event.listen(db, "after_commit", lambda _: self.evict(space), once=True)
+        if self.bus is not None:
+            self.bus.publish(
+                space, invalidation, db.connection() if db is not None else None
+            )
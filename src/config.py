@@ -1,3 +1,5 @@
+from typing import Optional
+
 from pydantic import BaseSettings
 
 
@@ -7,8 +9,34 @@ class Settings(BaseSettings):
     SECRET_KEY: str
     SERVER_METADATA_URL: str
     SQLALCHEMY_DATABASE_URI: str
+    SQLALCHEMY_REPLICA_URI: Optional[str] = None
+    REPLICA_STICKY_SECONDS: float = 5.0
+    FANOUT_MAX_WORKERS: int = 4
+    CACHE_ENABLED: bool = False
+    CACHE_FILE: str = "cache.sqlite3"
+    CACHE_L1_SIZE: int = 1024
+    CACHE_L1_TTL_SECONDS: float = 30.0
+    CACHE_L1_VERSION_TTL_SECONDS: float = 1.0
+    CACHE_L2_TTL_SECONDS: float = 300.0
+    CACHE_BUS_ENABLED: bool = False
+    COUNTERS_WRITE_BEHIND: bool = False
+    COUNTERS_MAX_STALENESS_SECONDS: float = 1.0
+    COUNTERS_BATCH_SIZE: int = 1000
+    ARCHIVE_AFTER_MONTHS: Optional[int] = None
     ALLOWED_HOSTS: str
     DOMAIN_NAME: str
+    DEBUG_QUERY_HEADERS: bool = False
+    SLOW_QUERY_THRESHOLD_MS: Optional[float] = None
+    SLOW_QUERY_SAMPLE_RATE: float = 1.0
+    SLOW_QUERY_EXPLAIN: bool = False
+    SLOW_QUERY_LOG_FILE: str = "slow_queries.log"
+    METRICS_TOKEN: Optional[str] = None
+    PROFILING_TOKEN: Optional[str] = None
+    PROFILING_SAMPLE_RATE: float = 0.0
+    PROFILING_INTERVAL_MS: float = 1.0
+    PROFILING_DIR: str = "profiles"
+    TRACING_ENABLED: bool = False
+    TRACING_EXPORT_FILE: Optional[str] = None
 
 
 settings = Settings()
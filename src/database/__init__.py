@@ -1,2 +1,7 @@
 from .base_model import Base
-from .database import SessionLocal, engine, get_db
+from .database import SessionLocal, engine, get_db, replica_engine
+from .dialect import engine_options
+from .routing import ReplicaRoutingMiddleware, RoutingSession, primary_reads
+from .fanout import fan_out
+from .batch import select_scalars
+from .types import Money
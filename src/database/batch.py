@@ -0,0 +1,10 @@
+from sqlalchemy import Row, Select, select
+from sqlalchemy.orm import Session
+
+
+def select_scalars(db: Session, *queries: Select) -> Row:
+    """
+    Runs single-value `queries` as scalar subqueries of one SELECT, so they
+    cost one round trip to the database instead of one each.
+    """
+    return db.execute(select(*(query.scalar_subquery() for query in queries))).one()
@@ -1,10 +1,49 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker
 
 from config import settings
+from observability import SlowQueryLog
+from .dialect import engine_options
+from .fanout import FanOutQueuePool
+from .routing import RoutingSession
 
-engine = create_engine(settings.SQLALCHEMY_DATABASE_URI)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+slow_query_log = (
+    SlowQueryLog(
+        threshold_ms=settings.SLOW_QUERY_THRESHOLD_MS,
+        log_file=settings.SLOW_QUERY_LOG_FILE,
+        sample_rate=settings.SLOW_QUERY_SAMPLE_RATE,
+        explain=settings.SLOW_QUERY_EXPLAIN,
+    )
+    if settings.SLOW_QUERY_THRESHOLD_MS is not None
+    else None
+)
+
+
+def make_engine(uri: str) -> Engine:
+    db_engine = create_engine(
+        uri, **{"poolclass": FanOutQueuePool, **engine_options(uri)}
+    )
+    if slow_query_log is not None:
+        slow_query_log.attach(db_engine)
+    return db_engine
+
+
+engine = make_engine(settings.SQLALCHEMY_DATABASE_URI)
+replica_engine = (
+    make_engine(settings.SQLALCHEMY_REPLICA_URI)
+    if settings.SQLALCHEMY_REPLICA_URI
+    else None
+)
+
+SessionLocal = sessionmaker(
+    class_=RoutingSession,
+    replica=replica_engine,
+    autocommit=False,
+    autoflush=False,
+    expire_on_commit=False,
+    bind=engine,
+)
 
 
 def get_db():
@@ -0,0 +1,134 @@
+import datetime
+import re
+import sqlite3
+from typing import List, Tuple, Union
+
+from sqlalchemy import (
+    Date,
+    Index,
+    Numeric,
+    and_,
+    case,
+    cast,
+    event,
+    func,
+    literal,
+    literal_column,
+)
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+from sqlalchemy.sql import ColumnElement
+
+
+def is_sqlite(uri: str) -> bool:
+    return make_url(uri).get_backend_name() == "sqlite"
+
+
+def engine_options(uri: str) -> dict:
+    """
+    Extra `create_engine` arguments for the database at `uri`. SQLite
+    connections are shared with the threadpool, and an in-memory database
+    must stay on one connection to survive.
+    """
+    if not is_sqlite(uri):
+        return {}
+    options = {"connect_args": {"check_same_thread": False}}
+    if make_url(uri).database in (None, "", ":memory:"):
+        options["poolclass"] = StaticPool
+    return options
+
+
+@event.listens_for(Engine, "connect")
+def _enable_sqlite_foreign_keys(dbapi_connection, connection_record):
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
+
+
+def as_datetime(value: Union[datetime.date, datetime.datetime]) -> datetime.datetime:
+    """
+    Turns a date into midnight of that day, the value PostgreSQL compares a
+    timestamp column against. SQLite compares the stored text instead.
+    """
+    if isinstance(value, datetime.datetime):
+        return value
+    return datetime.datetime.combine(value, datetime.time.min)
+
+
+def date_bucket(column) -> ColumnElement:
+    return func.date(column, type_=Date)
+
+
+def in_month(column, year: int, month: int) -> ColumnElement:
+    start = datetime.datetime(year, month, 1)
+    if month == 12:
+        end = datetime.datetime(year + 1, 1, 1)
+    else:
+        end = datetime.datetime(year, month + 1, 1)
+    return and_(column >= start, column < end)
+
+
+def between_dates(
+    column,
+    start: Union[datetime.date, datetime.datetime],
+    end: Union[datetime.date, datetime.datetime],
+) -> ColumnElement:
+    return and_(column >= as_datetime(start), column <= as_datetime(end))
+
+
+def sum_if(value, condition) -> ColumnElement:
+    return func.sum(case((condition, value)))
+
+
+def insert(db: Session, table):
+    """
+    Returns the INSERT construct of the session's dialect, which supports
+    `on_conflict_do_nothing` and `on_conflict_do_update`.
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert(table)
+    if dialect == "sqlite":
+        return sqlite.insert(table)
+    raise NotImplementedError(f"Upserts are not supported on {dialect}")
+
+
+SEARCH_CONFIG = literal_column("'simple'::regconfig")
+
+
+def search_vector(column) -> ColumnElement:
+    """
+    The full-text document of `column`; PostgreSQL indexes it with GIN, so
+    a search must use this same expression to hit the index.
+    """
+    return func.to_tsvector(SEARCH_CONFIG, column)
+
+
+def search_index(name: str, column) -> Index:
+    return Index(name, search_vector(column), postgresql_using="gin").ddl_if(
+        dialect="postgresql"
+    )
+
+
+def search_words(query: str) -> List[str]:
+    return re.findall(r"\w+", query.lower())
+
+
+def text_search(
+    db: Session, column, words: List[str]
+) -> Tuple[ColumnElement, ColumnElement]:
+    """
+    Returns the condition that `column` holds every one of `words`, each as
+    a prefix, and the rank of a match. The rank is rounded so a keyset
+    cursor holds it exactly. SQLite falls back to LIKE and ranks every
+    match the same.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        query = func.to_tsquery(SEARCH_CONFIG, " & ".join(f"{w}:*" for w in words))
+        rank = func.ts_rank(search_vector(column), query)
+        return search_vector(column).op("@@")(query), func.round(cast(rank, Numeric), 4)
+    match = and_(*(column.icontains(word, autoescape=True) for word in words))
+    return match, cast(literal(0), Numeric)
@@ -0,0 +1,95 @@
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar, copy_context
+from typing import Any, Callable, List
+
+from sqlalchemy import exc
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+from sqlalchemy.util import queue as sqla_queue
+
+from config import settings
+from observability import TimedQueuePool
+from .routing import RoutingSession
+
+Query = Callable[[Session], Any]
+
+_executor = ThreadPoolExecutor(
+    max_workers=settings.FANOUT_MAX_WORKERS, thread_name_prefix="fan-out"
+)
+
+_no_wait: ContextVar[bool] = ContextVar("fan_out_no_wait", default=False)
+_INLINE = object()
+
+
+class PoolExhausted(exc.TimeoutError):
+    """
+    No pooled connection was free for a fan-out worker.
+    """
+
+
+class FanOutQueuePool(TimedQueuePool):
+    """
+    TimedQueuePool whose checkouts in a fan-out worker never wait. The
+    request that fanned out holds a connection while it waits for its
+    workers, so workers waiting for connections held by such requests
+    would only time out; they give up at once and the request runs their
+    queries itself.
+    """
+
+    def _do_get(self):
+        if not _no_wait.get():
+            return super()._do_get()
+        try:
+            return self._pool.get(False)
+        except sqla_queue.Empty:
+            pass
+        if not self._inc_overflow():
+            raise PoolExhausted("No pooled connection is free for a fan-out query")
+        try:
+            return self._create_connection()
+        except BaseException:
+            self._dec_overflow()
+            raise
+
+
+def _fork(db: Session) -> Session:
+    options = {"replica": db.replica} if isinstance(db, RoutingSession) else {}
+    session = type(db)(
+        bind=db.get_bind(), autoflush=False, expire_on_commit=False, **options
+    )
+    if isinstance(db, RoutingSession):
+        session._pinned = db._pinned
+    return session
+
+
+def _run_forked(db: Session, query: Query) -> Any:
+    _no_wait.set(True)
+    try:
+        with _fork(db) as session:
+            return query(session)
+    except PoolExhausted:
+        return _INLINE
+
+
+def fan_out(db: Session, *queries: Query) -> List[Any]:
+    """
+    Runs independent read-only `queries` concurrently and returns their
+    results in order. The first runs on `db` in the calling thread, the
+    others on their own sessions and pooled connections, outside the
+    transaction of `db`; so they must not depend on its uncommitted writes.
+    A query that finds no free connection in the pool runs on `db` after
+    the first. A session bound to a connection (a test transaction) or to
+    SQLite runs them one after another on `db`.
+    """
+    bind = db.get_bind()
+    if isinstance(bind, Connection) or bind.dialect.name == "sqlite":
+        return [query(db) for query in queries]
+    first, *rest = queries
+    futures = [
+        _executor.submit(copy_context().run, _run_forked, db, query) for query in rest
+    ]
+    results = [first(db)] + [future.result() for future in futures]
+    return [
+        query(db) if result is _INLINE else result
+        for query, result in zip(queries, results)
+    ]
@@ -0,0 +1,89 @@
+"""
+Keeps the monthly partitions of the tables partitioned by `time` on
+PostgreSQL ahead of the calendar. Run it daily, e.g. from cron:
+
+    PYTHONPATH=src python -m database.partitions --months-ahead 3
+"""
+import argparse
+import datetime
+from typing import List, Optional
+
+from dateutil.relativedelta import relativedelta
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Connection
+
+from config import settings
+
+PARTITIONED_TABLES = ("expenses", "replenishments")
+
+
+def partition_name(table: str, month: datetime.date) -> str:
+    return f"{table}_{month:%Y_%m}"
+
+
+def create_partition(connection: Connection, table: str, month: datetime.date) -> bool:
+    """
+    Creates the partition of `table` for `month` unless it exists, moving
+    in the rows its default partition holds for that month; returns whether
+    it was created.
+    """
+    name = partition_name(table, month)
+    if connection.scalar(text("SELECT to_regclass(:name)"), {"name": name}):
+        return False
+    start, end = month, month + relativedelta(months=1)
+    connection.execute(
+        text(f'CREATE TABLE "{name}" (LIKE "{table}" INCLUDING DEFAULTS)')
+    )
+    connection.execute(
+        text(
+            f'WITH moved AS (DELETE FROM "{table}_default" '
+            "WHERE time >= :start AND time < :end RETURNING *) "
+            f'INSERT INTO "{name}" SELECT * FROM moved'
+        ),
+        {"start": start, "end": end},
+    )
+    connection.execute(
+        text(
+            f'ALTER TABLE "{table}" ATTACH PARTITION "{name}" '
+            f"FOR VALUES FROM ('{start}') TO ('{end}')"
+        )
+    )
+    return True
+
+
+def ensure_partitions(
+    connection: Connection,
+    table: str,
+    months_ahead: int = 3,
+    today: Optional[datetime.date] = None,
+) -> List[str]:
+    """
+    Creates the partitions of `table` from the current month up to
+    `months_ahead` months later; returns the names of those it created.
+    """
+    month = (today or datetime.date.today()).replace(day=1)
+    created = []
+    for offset in range(months_ahead + 1):
+        current = month + relativedelta(months=offset)
+        if create_partition(connection, table, current):
+            created.append(partition_name(table, current))
+    return created
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--months-ahead", type=int, default=3)
+    parser.add_argument("--uri", default=settings.SQLALCHEMY_DATABASE_URI)
+    args = parser.parse_args(argv)
+    db_engine = create_engine(args.uri)
+    for table in PARTITIONED_TABLES:
+        with db_engine.begin() as connection:
+            for name in ensure_partitions(connection, table, args.months_ahead):
+                print(f"Created {name}")
+    db_engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+READ_METHODS = ("GET", "HEAD", "OPTIONS")
+STICKY_KEY = "primary_until"
+
+
+class Routing:
+    """
+    Routing decision of the request being served: `primary` pins every
+    statement to the primary, `wrote` records that a session has written.
+    """
+
+    __slots__ = ("primary", "wrote")
+
+    def __init__(self, primary: bool = False) -> None:
+        self.primary = primary
+        self.wrote = False
+
+
+_routing: ContextVar[Optional[Routing]] = ContextVar("routing", default=None)
+
+
+@contextmanager
+def primary_reads() -> Iterator[None]:
+    """
+    Sends the reads of the block to the primary, as a pinned request does,
+    for values that outlive the request and must not come from a lagging
+    replica.
+    """
+    routing = _routing.get()
+    if routing is None:
+        token = _routing.set(Routing(primary=True))
+        try:
+            yield
+        finally:
+            _routing.reset(token)
+        return
+    primary, routing.primary = routing.primary, True
+    try:
+        yield
+    finally:
+        routing.primary = primary
+
+
+def is_write(clause) -> bool:
+    return not clause.is_select or getattr(clause, "_for_update_arg", None) is not None
+
+
+class RoutingSession(Session):
+    """
+    Sends SELECTs to `replica` and everything else to the primary bind.
+    A locking SELECT ... FOR UPDATE counts as a write: a read-only standby
+    cannot take its locks. Once a session writes, or when the request is
+    pinned to the primary, its reads stay on the primary too so they see
+    its own writes.
+    """
+
+    def __init__(self, *args, replica: Optional[Engine] = None, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.replica = replica
+        self._pinned = False
+
+    def get_bind(self, mapper=None, *, clause=None, **kwargs):
+        if self.replica is None:
+            return super().get_bind(mapper, clause=clause, **kwargs)
+        routing = _routing.get()
+        if self._flushing or (clause is not None and is_write(clause)):
+            self._pinned = True
+            if routing is not None:
+                routing.wrote = True
+        if clause is None or self._pinned or (routing is not None and routing.primary):
+            return super().get_bind(mapper, clause=clause, **kwargs)
+        return self.replica
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Lets the reads of GET requests go to the replica. Other methods, and
+    any request of a client that wrote less than `sticky_seconds` ago, stay
+    on the primary. The end of the sticky window is kept in the session
+    cookie, so it holds across workers.
+    """
+
+    def __init__(self, app: ASGIApp, sticky_seconds: float = 5.0) -> None:
+        self.app = app
+        self.sticky_seconds = sticky_seconds
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        session = scope.get("session")
+        primary = scope["method"] not in READ_METHODS or (
+            session is not None and session.get(STICKY_KEY, 0) > time.time()
+        )
+        routing = Routing(primary)
+
+        async def send_wrapper(message: Message) -> None:
+            if (
+                message["type"] == "http.response.start"
+                and routing.wrote
+                and session is not None
+            ):
+                session[STICKY_KEY] = time.time() + self.sticky_seconds
+            await send(message)
+
+        token = _routing.set(routing)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _routing.reset(token)
@@ -0,0 +1,42 @@
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Optional, Union
+
+from sqlalchemy import BigInteger
+from sqlalchemy.sql import operators
+from sqlalchemy.types import TypeDecorator
+
+CENT = Decimal("0.01")
+
+
+class Money(TypeDecorator):
+    """
+    An amount stored as a BIGINT count of cents, so sums and rollups run on
+    integers. Amounts bind rounded half up to the cent and load as exact
+    two-place Decimals; sums and differences of Money columns load
+    the same way.
+    """
+
+    impl = BigInteger
+    cache_ok = True
+
+    class Comparator(TypeDecorator.Comparator):
+        def _adapt_expression(self, op, other_comparator):
+            if op in (operators.add, operators.sub):
+                return op, self.type
+            return super()._adapt_expression(op, other_comparator)
+
+    comparator_factory = Comparator
+
+    def process_bind_param(
+        self, value: Optional[Union[Decimal, float, int]], dialect
+    ) -> Optional[int]:
+        if value is None:
+            return None
+        return int(Decimal(str(value)).quantize(CENT, ROUND_HALF_UP).scaleb(2))
+
+    def process_result_value(
+        self, value: Optional[Union[Decimal, int]], dialect
+    ) -> Optional[Decimal]:
+        if value is None:
+            return None
+        return Decimal(int(value)).scaleb(-2)
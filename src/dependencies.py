@@ -14,6 +14,7 @@ from starlette.requests import Request
 from config import settings
 from database import get_db
 from models import User
+from observability import phase
 from services import get_user
 
 config = Config("src/.env")
@@ -38,8 +39,9 @@ def is_user_authenticated(request: Request, db: Session = Depends(get_db)) -> bo
         user_info = request.session["user"]
     except KeyError:
         return False
-    if get_user(db, user_info["email"]) is None:
-        return False
+    with phase("auth"):
+        if get_user(db, user_info["email"]) is None:
+            return False
     return True
 
 
@@ -51,7 +53,8 @@ def get_current_user(request: Request, db: Session = Depends(get_db)) -> User:
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="You are not authorized",
         )
-    user = get_user(db, user_info["email"])
+    with phase("auth"):
+        user = get_user(db, user_info["email"])
     return user
 
 
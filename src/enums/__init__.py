@@ -1 +1,6 @@
-from .status import GroupStatusEnum, ResponseStatusEnum, UserResponseEnum
+from .status import (
+    ExpenseSortEnum,
+    GroupStatusEnum,
+    ResponseStatusEnum,
+    UserResponseEnum,
+)
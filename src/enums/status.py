@@ -16,3 +16,8 @@ class ResponseStatusEnum(StrEnum):
 class UserResponseEnum(StrEnum):
     ACCEPTED = "ACCEPTED"
     DENIED = "DENIED"
+
+
+class ExpenseSortEnum(StrEnum):
+    TIME = "time"
+    AMOUNT = "amount"
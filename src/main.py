@@ -5,11 +5,27 @@ from fastapi.middleware.cors import CORSMiddleware
 from starlette.middleware.sessions import SessionMiddleware
 
 from config import settings, ALLOWED_HOSTS
+import services
+from observability import (
+    MetricsMiddleware,
+    ProfileStore,
+    ProfilingMiddleware,
+    QueryStatsMiddleware,
+    JsonFileExporter,
+    TracingMiddleware,
+    instrument_services,
+    metrics as metrics_registry,
+    trace_collector,
+)
+from cache import cache
+from database import ReplicaRoutingMiddleware, SessionLocal
+from responses import ContentNegotiationMiddleware
 from routers import (
     category,
     expense,
     group,
     invitation,
+    metrics,
     registration,
     replenishment,
     user,
@@ -24,7 +40,28 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+if settings.SQLALCHEMY_REPLICA_URI:
+    app.add_middleware(
+        ReplicaRoutingMiddleware, sticky_seconds=settings.REPLICA_STICKY_SECONDS
+    )
 app.add_middleware(SessionMiddleware, secret_key=settings.SECRET_KEY)
+app.add_middleware(ContentNegotiationMiddleware)
+app.add_middleware(
+    ProfilingMiddleware,
+    store=ProfileStore(settings.PROFILING_DIR),
+    token=settings.PROFILING_TOKEN,
+    sample_rate=settings.PROFILING_SAMPLE_RATE,
+    interval_ms=settings.PROFILING_INTERVAL_MS,
+)
+app.add_middleware(QueryStatsMiddleware)
+app.add_middleware(MetricsMiddleware)
+if settings.TRACING_ENABLED:
+    app.add_middleware(
+        TracingMiddleware,
+        exporter=JsonFileExporter(settings.TRACING_EXPORT_FILE)
+        if settings.TRACING_EXPORT_FILE
+        else trace_collector,
+    )
 
 app.include_router(registration.router)
 app.include_router(group.router)
@@ -33,9 +70,46 @@ app.include_router(invitation.router)
 app.include_router(category.router)
 app.include_router(expense.router)
 app.include_router(replenishment.router)
+app.include_router(metrics.router)
+
+instrument_services(services)
+metrics_registry.register_routes(app.routes)
 
 add_pagination(app)
 
+counter_consumer = (
+    services.GroupCounterConsumer(
+        SessionLocal, max_staleness=settings.COUNTERS_MAX_STALENESS_SECONDS
+    )
+    if settings.COUNTERS_WRITE_BEHIND
+    else None
+)
+
+
+@app.on_event("startup")
+def start_cache_bus() -> None:
+    if cache.bus is not None:
+        cache.bus.start(cache.evict)
+
+
+@app.on_event("shutdown")
+def stop_cache_bus() -> None:
+    if cache.bus is not None:
+        cache.bus.stop()
+
+
+@app.on_event("startup")
+def start_counter_consumer() -> None:
+    if counter_consumer is not None:
+        counter_consumer.start()
+
+
+@app.on_event("shutdown")
+def stop_counter_consumer() -> None:
+    if counter_consumer is not None:
+        counter_consumer.stop()
+
+
 if __name__ == "__main__":
     uvicorn.run(
         "main:app",
@@ -1,6 +1,7 @@
 from .user import User
 from .category import Category, CategoryGroup
 from .expense import Expense
-from .group import Group, UserGroup
+from .group import Group, GroupCounter, GroupCounterChange, UserGroup
 from .invitation import Invitation
 from .replenishment import Replenishment
+from .archive import ExpenseArchive, ReplenishmentArchive, UserArchiveTotal
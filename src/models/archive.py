@@ -0,0 +1,42 @@
+from sqlalchemy import Column, DateTime, Integer, String
+
+from database import Base, Money
+from database.dialect import search_index
+
+
+class ExpenseArchive(Base):
+    __tablename__ = "expenses_archive"
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    descriptions = Column(String, nullable=False)
+    amount = Column(Money, nullable=False)
+    time = Column(DateTime, nullable=False)
+    user_id = Column(Integer, index=True, nullable=False)
+    group_id = Column(Integer, index=True, nullable=False)
+    category_id = Column(Integer, nullable=False)
+
+    __table_args__ = (
+        search_index("ix_expenses_archive_descriptions_search", descriptions),
+    )
+
+
+class ReplenishmentArchive(Base):
+    __tablename__ = "replenishments_archive"
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    descriptions = Column(String, nullable=False)
+    amount = Column(Money, nullable=False)
+    time = Column(DateTime, nullable=False)
+    user_id = Column(Integer, index=True, nullable=False)
+
+    __table_args__ = (
+        search_index("ix_replenishments_archive_descriptions_search", descriptions),
+    )
+
+
+class UserArchiveTotal(Base):
+    __tablename__ = "user_archive_totals"
+
+    user_id = Column(Integer, primary_key=True)
+    expense_amount = Column(Money, default=0, nullable=False)
+    replenishment_amount = Column(Money, default=0, nullable=False)
@@ -1,29 +1,32 @@
 import datetime
 
 from sqlalchemy import (
-    DECIMAL,
     Column,
     DateTime,
     ForeignKey,
     ForeignKeyConstraint,
+    Index,
     Integer,
     String,
 )
 from sqlalchemy.orm import relationship
 
-from database import Base
+from database import Base, Money
+from database.dialect import search_index
 from models import CategoryGroup
 
 
 class Expense(Base):
+    # On PostgreSQL the table is partitioned by month of `time` and keyed by
+    # (id, time); see database.partitions.
     __tablename__ = "expenses"
 
     id = Column(Integer, primary_key=True, index=True)
     descriptions = Column(String, nullable=False)
-    amount = Column(DECIMAL, nullable=False)
+    amount = Column(Money, nullable=False)
     time = Column(DateTime, default=datetime.datetime.utcnow(), nullable=False)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    group_id = Column(Integer, index=True, nullable=False)
+    group_id = Column(Integer, nullable=False)
     category_id = Column(Integer, index=True, nullable=False)
 
     __table_args__ = (
@@ -31,6 +34,14 @@ class Expense(Base):
             [group_id, category_id],
             [CategoryGroup.group_id, CategoryGroup.category_id],
         ),
+        search_index("ix_expenses_descriptions_search", descriptions),
+        # One index per filter shape of the listings; see services.filters.
+        Index("ix_expenses_group_id_time", group_id, time, id),
+        Index("ix_expenses_group_id_category_id_time", group_id, category_id, time, id),
+        Index("ix_expenses_group_id_user_id_time", group_id, user_id, time, id),
+        Index("ix_expenses_group_id_amount", group_id, amount, id),
+        Index("ix_expenses_user_id_time", user_id, time, id),
+        Index("ix_expenses_user_id_amount", user_id, amount, id),
         {},
     )
 
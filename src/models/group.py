@@ -1,9 +1,16 @@
 import datetime
 
-from sqlalchemy import Column, DateTime, Enum, ForeignKey, Integer, String
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Enum,
+    ForeignKey,
+    Integer,
+    String,
+)
 from sqlalchemy.orm import relationship
 
-from database import Base
+from database import Base, Money
 from enums import GroupStatusEnum
 
 
@@ -34,3 +41,22 @@ class UserGroup(Base):
 
     user = relationship("User", back_populates="user_groups")
     group = relationship("Group", back_populates="users_group")
+
+
+class GroupCounter(Base):
+    __tablename__ = "group_counters"
+
+    group_id = Column(Integer, ForeignKey("groups.id"), primary_key=True)
+    member_count = Column(Integer, default=0, nullable=False)
+    expense_count = Column(Integer, default=0, nullable=False)
+    total_amount = Column(Money, default=0, nullable=False)
+
+
+class GroupCounterChange(Base):
+    __tablename__ = "group_counter_changes"
+
+    id = Column(Integer, primary_key=True)
+    group_id = Column(Integer, ForeignKey("groups.id"), index=True, nullable=False)
+    member_delta = Column(Integer, default=0, nullable=False)
+    expense_delta = Column(Integer, default=0, nullable=False)
+    amount_delta = Column(Money, default=0, nullable=False)
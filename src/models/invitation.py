@@ -1,6 +1,6 @@
 import datetime
 
-from sqlalchemy import Column, DateTime, Enum, ForeignKey, Integer, String
+from sqlalchemy import Column, DateTime, Enum, ForeignKey, Index, Integer, String
 from sqlalchemy.orm import relationship
 
 from database import Base
@@ -17,6 +17,17 @@ class Invitation(Base):
     creation_time = Column(DateTime, default=datetime.datetime.utcnow(), nullable=False)
     status = Column(String, Enum(ResponseStatusEnum), nullable=False)
 
+    __table_args__ = (
+        Index(
+            "uq_invitations_pending_recipient_group",
+            recipient_id,
+            group_id,
+            unique=True,
+            postgresql_where=status == ResponseStatusEnum.PENDING,
+            sqlite_where=status == ResponseStatusEnum.PENDING,
+        ),
+    )
+
     group = relationship("Group", back_populates="invitations")
     sender = relationship("User", foreign_keys=[sender_id])
     recipient = relationship("User", foreign_keys=[recipient_id])
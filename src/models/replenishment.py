@@ -1,18 +1,25 @@
 import datetime
 
-from sqlalchemy import DECIMAL, Column, DateTime, ForeignKey, Integer, String
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, String
 from sqlalchemy.orm import relationship
 
-from database import Base
+from database import Base, Money
+from database.dialect import search_index
 
 
 class Replenishment(Base):
+    # On PostgreSQL the table is partitioned by month of `time` and keyed by
+    # (id, time); see database.partitions.
     __tablename__ = "replenishments"
 
     id = Column(Integer, primary_key=True, index=True)
     descriptions = Column(String, nullable=False)
-    amount = Column(DECIMAL, nullable=False)
+    amount = Column(Money, nullable=False)
     time = Column(DateTime, default=datetime.datetime.utcnow(), nullable=False)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
 
+    __table_args__ = (
+        search_index("ix_replenishments_descriptions_search", descriptions),
+    )
+
     user = relationship("User", back_populates="replenishments")
@@ -0,0 +1,15 @@
+from .services import instrument_services
+from .query_stats import QueryStats, QueryStatsMiddleware, get_query_stats
+from .metrics import MetricsMiddleware, TimedQueuePool, metrics, render_metrics
+from .slow_queries import SlowQueryLog
+from .phases import phase
+from .routing import InstrumentedRoute
+from .profiling import ProfileStore, ProfilingMiddleware
+from .tracing import (
+    InMemoryCollector,
+    JsonFileExporter,
+    TracingMiddleware,
+    get_trace,
+    span,
+    trace_collector,
+)
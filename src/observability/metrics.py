@@ -0,0 +1,207 @@
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Tuple
+
+from anyio import to_thread
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
+from starlette.routing import BaseRoute, Route
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .services import service_stats
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    __slots__ = ("bounds", "counts", "sum", "count", "_lock")
+
+    def __init__(self, bounds: Tuple[float, ...] = LATENCY_BUCKETS) -> None:
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+    def render(self, name: str, labels: str = "") -> List[str]:
+        lines = []
+        cumulative = 0
+        prefix = f"{labels}," if labels else ""
+        suffix = f"{{{labels}}}" if labels else ""
+        for bound, bucket_count in zip(self.bounds, self.counts):
+            cumulative += bucket_count
+            lines.append(f'{name}_bucket{{{prefix}le="{bound}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{{prefix}le="+Inf"}} {self.count}')
+        lines.append(f"{name}_sum{suffix} {self.sum}")
+        lines.append(f"{name}_count{suffix} {self.count}")
+        return lines
+
+
+class RouteMetrics:
+    __slots__ = ("route", "method", "latency", "errors")
+
+    def __init__(self, route: str, method: str) -> None:
+        self.route = route
+        self.method = method
+        self.latency = Histogram()
+        self.errors = 0
+
+    @property
+    def labels(self) -> str:
+        return f'method="{self.method}",route="{self.route}"'
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self.routes: Dict[Tuple[object, str], RouteMetrics] = {}
+        self.unmatched = RouteMetrics("unmatched", "ANY")
+        self.in_flight = 0
+        self.pool_wait = Histogram()
+
+    def register_routes(self, routes: Iterable[BaseRoute]) -> None:
+        for route in routes:
+            if not isinstance(route, Route):
+                continue
+            for method in route.methods or ():
+                self.routes[(route.endpoint, method)] = RouteMetrics(route.path, method)
+
+    def route_metrics(self, scope: Scope) -> RouteMetrics:
+        return self.routes.get(
+            (scope.get("endpoint"), scope["method"]),
+            self.unmatched,
+        )
+
+
+metrics = MetricsRegistry()
+
+
+class TimedQueuePool(QueuePool):
+    """
+    QueuePool that records how long each checkout waited for a connection.
+    """
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            metrics.pool_wait.observe(time.perf_counter() - start)
+
+
+class MetricsMiddleware:
+    def __init__(self, app: ASGIApp, registry: MetricsRegistry = metrics) -> None:
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        registry = self.registry
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        registry.in_flight += 1
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = time.perf_counter() - start
+            registry.in_flight -= 1
+            route_metrics = registry.route_metrics(scope)
+            route_metrics.latency.observe(duration)
+            if status_code >= 500:
+                route_metrics.errors += 1
+
+
+def _metric(lines: List[str], name: str, kind: str, help_text: str) -> None:
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} {kind}")
+
+
+def render_metrics(engine: Engine, registry: MetricsRegistry = metrics) -> str:
+    """
+    Renders the registry in the Prometheus text exposition format.
+    Must be called from the event loop thread.
+    """
+    lines: List[str] = []
+    routes = [registry.unmatched, *registry.routes.values()]
+
+    _metric(lines, "http_requests_total", "counter", "Total HTTP requests.")
+    for route in routes:
+        lines.append(f"http_requests_total{{{route.labels}}} {route.latency.count}")
+
+    _metric(lines, "http_request_errors_total", "counter", "HTTP 5xx responses.")
+    for route in routes:
+        lines.append(f"http_request_errors_total{{{route.labels}}} {route.errors}")
+
+    _metric(
+        lines,
+        "http_request_duration_seconds",
+        "histogram",
+        "HTTP request latency.",
+    )
+    for route in routes:
+        lines.extend(
+            route.latency.render("http_request_duration_seconds", route.labels)
+        )
+
+    _metric(lines, "http_requests_in_flight", "gauge", "Requests being served.")
+    lines.append(f"http_requests_in_flight {registry.in_flight}")
+
+    limiter = to_thread.current_default_thread_limiter()
+    _metric(lines, "threadpool_tokens", "gauge", "Worker threadpool capacity.")
+    lines.append(f"threadpool_tokens {limiter.total_tokens}")
+    _metric(lines, "threadpool_tokens_borrowed", "gauge", "Busy worker threads.")
+    lines.append(f"threadpool_tokens_borrowed {limiter.borrowed_tokens}")
+
+    pool = engine.pool
+    if isinstance(pool, QueuePool):
+        _metric(lines, "db_pool_size", "gauge", "Configured pool size.")
+        lines.append(f"db_pool_size {pool.size()}")
+        _metric(lines, "db_pool_checked_out", "gauge", "Connections in use.")
+        lines.append(f"db_pool_checked_out {pool.checkedout()}")
+        _metric(lines, "db_pool_overflow", "gauge", "Connections over pool size.")
+        lines.append(f"db_pool_overflow {pool.overflow()}")
+    _metric(
+        lines,
+        "db_pool_wait_seconds",
+        "histogram",
+        "Time spent waiting for a pooled connection.",
+    )
+    lines.extend(registry.pool_wait.render("db_pool_wait_seconds"))
+
+    _metric(
+        lines,
+        "db_service_seconds_total",
+        "counter",
+        "DB time spent per service function.",
+    )
+    for stats in service_stats.values():
+        lines.append(
+            f'db_service_seconds_total{{service="{stats.name}"}} {stats.db_time}'
+        )
+    _metric(
+        lines,
+        "db_service_statements_total",
+        "counter",
+        "SQL statements issued per service function.",
+    )
+    for stats in service_stats.values():
+        lines.append(
+            f'db_service_statements_total{{service="{stats.name}"}} {stats.statements}'
+        )
+    return "\n".join(lines) + "\n"
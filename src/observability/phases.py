@@ -0,0 +1,68 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+from .query_stats import get_query_stats
+from .tracing import span
+
+
+class Phases:
+    __slots__ = ("wall", "db")
+
+    def __init__(self) -> None:
+        self.wall: Dict[str, float] = {}
+        self.db: Dict[str, float] = {}
+
+    def breakdown(self) -> Dict[str, float]:
+        """
+        Splits the handler time into auth, DB, service logic and
+        serialization, in seconds.
+        """
+        auth = self.wall.get("auth", 0.0)
+        endpoint = self.wall.get("endpoint", 0.0)
+        endpoint_db = self.db.get("endpoint", 0.0)
+        handler = self.wall.get("handler", 0.0)
+        return {
+            "auth": auth,
+            "db": endpoint_db,
+            "service": max(endpoint - endpoint_db, 0.0),
+            "serialization": max(handler - endpoint - auth, 0.0),
+        }
+
+
+_phases: ContextVar[Optional[Phases]] = ContextVar("phases", default=None)
+
+
+def get_phases() -> Optional[Phases]:
+    return _phases.get()
+
+
+@contextmanager
+def collect_phases():
+    phases = Phases()
+    token = _phases.set(phases)
+    try:
+        yield phases
+    finally:
+        _phases.reset(token)
+
+
+def _db_time() -> float:
+    stats = get_query_stats()
+    return stats.duration if stats is not None else 0.0
+
+
+@contextmanager
+def phase(name: str):
+    with span(name, name):
+        phases = _phases.get()
+        if phases is None:
+            yield
+            return
+        start, db_start = time.perf_counter(), _db_time()
+        try:
+            yield
+        finally:
+            phases.wall[name] = phases.wall.get(name, 0.0) + time.perf_counter() - start
+            phases.db[name] = phases.db.get(name, 0.0) + _db_time() - db_start
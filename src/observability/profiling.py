@@ -0,0 +1,155 @@
+import json
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from secrets import compare_digest
+from typing import Dict, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .metrics import metrics
+from .phases import Phases, collect_phases
+
+IDLE_MODULES = ("threading.py", "queue.py", "selectors.py")
+
+
+class StackSampler(threading.Thread):
+    """
+    Samples the stacks of every other thread of the process each `interval`
+    seconds and aggregates them in the collapsed ("folded") format used by
+    flamegraph.pl and speedscope. Threads parked in a wait are skipped.
+    """
+
+    def __init__(self, interval: float) -> None:
+        super().__init__(name="stack-sampler", daemon=True)
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stopped = threading.Event()
+
+    def run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            self.sample()
+
+    def sample(self) -> None:
+        self.samples += 1
+        threads = {thread.ident: thread.name for thread in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == self.ident or frame.f_code.co_filename.endswith(IDLE_MODULES):
+                continue
+            stack = []
+            while frame is not None:
+                module = frame.f_globals.get("__name__", "?")
+                stack.append(f"{module}:{frame.f_code.co_name}")
+                frame = frame.f_back
+            stack.append(threads.get(ident, str(ident)))
+            self.stacks[";".join(reversed(stack))] += 1
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self.join()
+
+    def folded(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.items())
+
+
+class ProfileStore:
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+
+    def save(self, profile_id: str, folded: str, summary: Dict) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, profile_id)
+        with open(f"{path}.folded", "w") as folded_file:
+            folded_file.write(folded)
+        with open(f"{path}.json", "w") as summary_file:
+            json.dump(summary, summary_file, indent=2)
+
+
+class ProfilingMiddleware:
+    """
+    Profiles requests that carry `X-Profile: <token>` or that are picked by
+    `sample_rate`. The folded stacks and a per-phase breakdown are saved to
+    `store`; the response gets X-Profile-Id and X-Profile-Phases headers.
+    The sampler sees the whole worker process, so requests served
+    concurrently show up in the same profile (`concurrent_requests`).
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        store: ProfileStore,
+        token: Optional[str] = None,
+        sample_rate: float = 0.0,
+        interval_ms: float = 1.0,
+    ) -> None:
+        self.app = app
+        self.store = store
+        self.token = token
+        self.sample_rate = sample_rate
+        self.interval = interval_ms / 1000
+
+    def should_profile(self, scope: Scope) -> bool:
+        header = Headers(scope=scope).get("x-profile")
+        if (
+            self.token
+            and header is not None
+            and compare_digest(header.encode(), self.token.encode())
+        ):
+            return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self.should_profile(scope):
+            await self.app(scope, receive, send)
+            return
+        with collect_phases() as phases:
+            await self.profile(scope, receive, send, phases)
+
+    async def profile(
+        self, scope: Scope, receive: Receive, send: Send, phases: Phases
+    ) -> None:
+        profile_id = uuid.uuid4().hex
+        concurrent_requests = metrics.in_flight
+        sampler = StackSampler(self.interval)
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal concurrent_requests
+            concurrent_requests = max(concurrent_requests, metrics.in_flight)
+            if message["type"] == "http.response.start":
+                breakdown = ";".join(
+                    f"{name}={duration * 1000:.2f}"
+                    for name, duration in phases.breakdown().items()
+                )
+                headers = MutableHeaders(scope=message)
+                headers.append("X-Profile-Id", profile_id)
+                headers.append("X-Profile-Phases", breakdown)
+            await send(message)
+
+        start = time.perf_counter()
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            sampler.stop()
+            duration = time.perf_counter() - start
+            summary = {
+                "id": profile_id,
+                "method": scope["method"],
+                "path": scope["path"],
+                "route": getattr(scope.get("route"), "path", None),
+                "duration_ms": round(duration * 1000, 2),
+                "samples": sampler.samples,
+                "interval_ms": self.interval * 1000,
+                "concurrent_requests": concurrent_requests,
+                "phases_ms": {
+                    name: round(value * 1000, 2)
+                    for name, value in phases.breakdown().items()
+                },
+            }
+            self.store.save(profile_id, sampler.folded(), summary)
@@ -0,0 +1,106 @@
+import threading
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from config import settings
+from .services import get_current_service
+from .tracing import get_trace
+
+
+class QueryStats:
+    """
+    Statements and DB time of a request. Fan-out threads share the request
+    context and record into it concurrently, hence the lock.
+    """
+
+    __slots__ = ("count", "duration", "scope", "_lock")
+
+    def __init__(self, scope: Optional[Scope] = None) -> None:
+        self.count = 0
+        self.duration = 0.0
+        self.scope = scope
+        self._lock = threading.Lock()
+
+    def record(self, duration: float) -> None:
+        with self._lock:
+            self.count += 1
+            self.duration += duration
+
+    @property
+    def route(self) -> Optional[str]:
+        route = self.scope.get("route") if self.scope else None
+        return route.path if route is not None else None
+
+
+_query_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+def get_query_stats() -> Optional[QueryStats]:
+    return _query_stats.get()
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    end = time.perf_counter()
+    start = conn.info["query_start_time"].pop()
+    duration = end - start
+    stats = _query_stats.get()
+    if stats is not None:
+        stats.record(duration)
+    service = get_current_service()
+    if service is not None:
+        service.record(duration)
+    trace = get_trace()
+    if trace is not None:
+        trace.record("sql", "db", start, end, {"statement": statement})
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(exception_context):
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("query_start_time"):
+        connection.info["query_start_time"].pop()
+
+
+class QueryStatsMiddleware:
+    """
+    Counts SQL statements and DB time of every request and, when
+    DEBUG_QUERY_HEADERS is enabled, reports them in X-DB-Query-Count and
+    X-DB-Time-Ms response headers.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        stats = QueryStats(scope)
+        token = _query_stats.set(stats)
+
+        async def send_wrapper(message: Message) -> None:
+            if (
+                message["type"] == "http.response.start"
+                and settings.DEBUG_QUERY_HEADERS
+            ):
+                headers = MutableHeaders(scope=message)
+                headers.append("X-DB-Query-Count", str(stats.count))
+                headers.append("X-DB-Time-Ms", f"{stats.duration * 1000:.2f}")
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _query_stats.reset(token)
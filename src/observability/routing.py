@@ -0,0 +1,68 @@
+import asyncio
+import functools
+import time
+from typing import Any, Callable, Coroutine
+
+from fastapi.routing import APIRoute
+from starlette.requests import Request
+from starlette.responses import Response
+
+from .phases import phase
+from .tracing import get_trace
+
+
+def _mark_endpoint_end() -> None:
+    trace = get_trace()
+    if trace is not None:
+        trace.endpoint_end = time.perf_counter()
+
+
+def _timed_endpoint(call: Callable) -> Callable:
+    if asyncio.iscoroutinefunction(call):
+
+        @functools.wraps(call)
+        async def async_endpoint(*args, **kwargs):
+            try:
+                with phase("endpoint"):
+                    return await call(*args, **kwargs)
+            finally:
+                _mark_endpoint_end()
+
+        return async_endpoint
+
+    @functools.wraps(call)
+    def endpoint(*args, **kwargs):
+        try:
+            with phase("endpoint"):
+                return call(*args, **kwargs)
+        finally:
+            _mark_endpoint_end()
+
+    return endpoint
+
+
+class InstrumentedRoute(APIRoute):
+    """
+    APIRoute that records the endpoint and whole handler (dependencies,
+    endpoint and response serialization) as request phases, and the
+    response serialization as a trace span.
+    """
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        self.dependant.call = _timed_endpoint(self.dependant.call)
+        handler = super().get_route_handler()
+
+        async def instrumented_handler(request: Request) -> Response:
+            with phase("handler"):
+                response = await handler(request)
+                trace = get_trace()
+                if trace is not None and trace.endpoint_end is not None:
+                    trace.record(
+                        "serialization",
+                        "serialization",
+                        trace.endpoint_end,
+                        time.perf_counter(),
+                    )
+                return response
+
+        return instrumented_handler
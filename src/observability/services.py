@@ -0,0 +1,72 @@
+import functools
+import inspect
+import threading
+from contextvars import ContextVar
+from types import ModuleType
+from typing import Dict, Optional
+
+from .tracing import span
+
+
+class ServiceStats:
+    """
+    DB time and statements of a service function. Fan-out threads record
+    statements of the same service concurrently, hence the lock.
+    """
+
+    __slots__ = ("name", "db_time", "statements", "_lock")
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.db_time = 0.0
+        self.statements = 0
+        self._lock = threading.Lock()
+
+    def record(self, duration: float) -> None:
+        with self._lock:
+            self.statements += 1
+            self.db_time += duration
+
+
+service_stats: Dict[str, ServiceStats] = {}
+
+_current_service: ContextVar[Optional[ServiceStats]] = ContextVar(
+    "current_service", default=None
+)
+
+
+def get_current_service() -> Optional[ServiceStats]:
+    return _current_service.get()
+
+
+def instrument_service(func):
+    stats = service_stats.setdefault(func.__name__, ServiceStats(func.__name__))
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with span(func.__name__, "service"):
+            if _current_service.get() is not None:
+                return func(*args, **kwargs)
+            token = _current_service.set(stats)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                _current_service.reset(token)
+
+    wrapper.__instrumented__ = True
+    return wrapper
+
+
+def instrument_services(module: ModuleType) -> None:
+    """
+    Replaces the public service functions re-exported by `module` with
+    wrappers that attribute the SQL they run to the outermost service call.
+    """
+    for name, member in vars(module).items():
+        if (
+            name.startswith("_")
+            or not inspect.isfunction(member)
+            or getattr(member, "__instrumented__", False)
+        ):
+            continue
+        setattr(module, name, instrument_service(member))
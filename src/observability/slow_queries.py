@@ -0,0 +1,135 @@
+import json
+import logging
+import random
+import re
+import sys
+import time
+from logging.handlers import RotatingFileHandler
+from typing import List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from .query_stats import get_query_stats
+from .services import get_current_service
+
+slow_query_logger = logging.getLogger("slow_queries")
+slow_query_logger.propagate = False
+
+# EXPLAIN ANALYZE runs the statement again, so selects that lock rows or call
+# functions with side effects are only planned.
+SIDE_EFFECTS = re.compile(
+    r"\bFOR\s+(NO\s+KEY\s+UPDATE|UPDATE|KEY\s+SHARE|SHARE)\b"
+    r"|\b(pg_notify|nextval|setval|pg_advisory_\w+)\s*\(",
+    re.IGNORECASE,
+)
+
+
+def find_service_caller() -> Optional[str]:
+    frame = sys._getframe(1)
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "")
+        if module.startswith("services."):
+            return f"{module}.{frame.f_code.co_name}:{frame.f_lineno}"
+        frame = frame.f_back
+    return None
+
+
+class SlowQueryLog:
+    """
+    Logs statements slower than `threshold_ms` together with their bound
+    parameters, the service function and route that issued them and,
+    optionally, the EXPLAIN (ANALYZE, BUFFERS) output of SELECT statements,
+    or the plain EXPLAIN output of those with side effects. Only
+    `sample_rate` of the slow statements are written. One log serves every
+    engine it is attached to, so their entries share one file handler.
+    """
+
+    def __init__(
+        self,
+        threshold_ms: float,
+        log_file: str,
+        sample_rate: float = 1.0,
+        explain: bool = False,
+        max_bytes: int = 10 * 1024 * 1024,
+        backup_count: int = 5,
+    ) -> None:
+        self.threshold = threshold_ms / 1000
+        self.sample_rate = sample_rate
+        self.explain = explain
+        self.handler = RotatingFileHandler(
+            log_file, maxBytes=max_bytes, backupCount=backup_count
+        )
+        self.engines: List[Engine] = []
+
+    def attach(self, engine: Engine) -> None:
+        if not self.engines:
+            slow_query_logger.addHandler(self.handler)
+            slow_query_logger.setLevel(logging.INFO)
+        self.engines.append(engine)
+        event.listen(engine, "before_cursor_execute", self.before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", self.after_cursor_execute)
+        event.listen(engine, "handle_error", self.handle_error)
+
+    def detach(self) -> None:
+        for engine in self.engines:
+            event.remove(engine, "before_cursor_execute", self.before_cursor_execute)
+            event.remove(engine, "after_cursor_execute", self.after_cursor_execute)
+            event.remove(engine, "handle_error", self.handle_error)
+        slow_query_logger.removeHandler(self.handler)
+        self.handler.close()
+        self.engines = []
+
+    def before_cursor_execute(
+        self, conn, cursor, statement, parameters, context, executemany
+    ):
+        conn.info.setdefault("slow_query_start_time", []).append(time.perf_counter())
+
+    def after_cursor_execute(
+        self, conn, cursor, statement, parameters, context, executemany
+    ):
+        duration = time.perf_counter() - conn.info["slow_query_start_time"].pop()
+        if duration < self.threshold or random.random() >= self.sample_rate:
+            return
+        stats = get_query_stats()
+        service = get_current_service()
+        entry = {
+            "duration_ms": round(duration * 1000, 2),
+            "statement": statement,
+            "parameters": parameters,
+            "route": stats.route if stats else None,
+            "service": service.name if service else None,
+            "caller": find_service_caller(),
+        }
+        if self.explain and not executemany:
+            entry["plan"] = self.explain_statement(conn, statement, parameters)
+        slow_query_logger.info(json.dumps(entry, default=str))
+
+    def handle_error(self, exception_context):
+        connection = exception_context.connection
+        if connection is not None and connection.info.get("slow_query_start_time"):
+            connection.info["slow_query_start_time"].pop()
+
+    def explain_statement(self, conn, statement, parameters) -> Optional[str]:
+        is_select = statement.lstrip().upper().startswith("SELECT")
+        if conn.dialect.name != "postgresql" or not is_select:
+            return None
+        cursor = conn.connection.dbapi_connection.cursor()
+        try:
+            cursor.execute("SAVEPOINT slow_query_explain")
+            try:
+                explain = (
+                    "EXPLAIN "
+                    if SIDE_EFFECTS.search(statement)
+                    else "EXPLAIN (ANALYZE, BUFFERS) "
+                )
+                cursor.execute(explain + statement, parameters)
+                return "\n".join(row[0] for row in cursor.fetchall())
+            except Exception as error:
+                cursor.execute("ROLLBACK TO SAVEPOINT slow_query_explain")
+                logging.warning(f"Could not explain slow query: {error}")
+                return None
+            finally:
+                cursor.execute("RELEASE SAVEPOINT slow_query_explain")
+        finally:
+            cursor.close()
@@ -0,0 +1,195 @@
+import json
+import os
+import re
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Deque, Dict, List, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}$")
+
+
+class Span:
+    __slots__ = ("id", "parent_id", "name", "category", "start", "end", "attributes")
+
+    def __init__(
+        self,
+        name: str,
+        category: str,
+        parent_id: Optional[str],
+        start: float,
+        attributes: Optional[Dict] = None,
+    ) -> None:
+        self.id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.name = name
+        self.category = category
+        self.start = start
+        self.end = start
+        self.attributes = attributes
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+
+class Trace:
+    def __init__(self, trace_id: str, parent_id: Optional[str] = None) -> None:
+        self.id = trace_id
+        self.parent_id = parent_id
+        self.start = time.perf_counter()
+        self.spans: List[Span] = []
+        self.endpoint_end: Optional[float] = None
+
+    def record(
+        self,
+        name: str,
+        category: str,
+        start: float,
+        end: float,
+        attributes: Optional[Dict] = None,
+    ) -> Span:
+        current = _current_span.get()
+        span = Span(
+            name,
+            category,
+            current.id if current else self.parent_id,
+            start,
+            attributes,
+        )
+        span.end = end
+        self.spans.append(span)
+        return span
+
+    def server_timing(self) -> str:
+        """
+        Sums the spans per category into a Server-Timing header value.
+        Nested spans of the same category are counted once.
+        """
+        durations: Dict[str, float] = {}
+        counts: Dict[str, int] = {}
+        categories = {span.id: span.category for span in self.spans}
+        for span in self.spans:
+            if categories.get(span.parent_id) == span.category:
+                continue
+            durations[span.category] = durations.get(span.category, 0.0) + span.duration
+            counts[span.category] = counts.get(span.category, 0) + 1
+        metrics = [
+            f'{category};dur={duration * 1000:.2f};desc="{counts[category]}"'
+            for category, duration in durations.items()
+        ]
+        metrics.append(f"total;dur={(time.perf_counter() - self.start) * 1000:.2f}")
+        return ", ".join(metrics)
+
+    def as_dict(self, scope: Scope, status_code: int) -> Dict:
+        return {
+            "trace_id": self.id,
+            "parent_id": self.parent_id,
+            "method": scope["method"],
+            "path": scope["path"],
+            "route": getattr(scope.get("route"), "path", None),
+            "status_code": status_code,
+            "duration_ms": round((time.perf_counter() - self.start) * 1000, 3),
+            "spans": [
+                {
+                    "id": span.id,
+                    "parent_id": span.parent_id,
+                    "name": span.name,
+                    "category": span.category,
+                    "start_ms": round((span.start - self.start) * 1000, 3),
+                    "duration_ms": round(span.duration * 1000, 3),
+                    "attributes": span.attributes,
+                }
+                for span in self.spans
+            ],
+        }
+
+
+_trace: ContextVar[Optional[Trace]] = ContextVar("trace", default=None)
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+def get_trace() -> Optional[Trace]:
+    return _trace.get()
+
+
+@contextmanager
+def span(name: str, category: str, attributes: Optional[Dict] = None):
+    trace = _trace.get()
+    if trace is None:
+        yield
+        return
+    current = trace.record(name, category, time.perf_counter(), 0.0, attributes)
+    token = _current_span.set(current)
+    try:
+        yield
+    finally:
+        current.end = time.perf_counter()
+        _current_span.reset(token)
+
+
+class InMemoryCollector:
+    def __init__(self, maxlen: int = 1000) -> None:
+        self.traces: Deque[Dict] = deque(maxlen=maxlen)
+
+    def export(self, trace: Dict) -> None:
+        self.traces.append(trace)
+
+
+class JsonFileExporter:
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, trace: Dict) -> None:
+        line = json.dumps(trace, default=str) + "\n"
+        with self._lock, open(self.path, "a") as trace_file:
+            trace_file.write(line)
+
+
+class TracingMiddleware:
+    """
+    Opens a trace per request, continuing the trace of an incoming W3C
+    `traceparent` header, summarizes its spans in a Server-Timing header
+    and hands the finished trace to `exporter`.
+    """
+
+    def __init__(self, app: ASGIApp, exporter) -> None:
+        self.app = app
+        self.exporter = exporter
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        match = TRACEPARENT.match(Headers(scope=scope).get("traceparent", ""))
+        if match:
+            trace = Trace(match.group(1), match.group(2))
+        else:
+            trace = Trace(uuid.uuid4().hex)
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", trace.server_timing())
+                headers.append("X-Trace-Id", trace.id)
+            await send(message)
+
+        token = _trace.set(trace)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _trace.reset(token)
+            self.exporter.export(trace.as_dict(scope, status_code))
+
+
+trace_collector = InMemoryCollector()
@@ -0,0 +1,77 @@
+from contextvars import ContextVar
+from typing import Any, Optional
+
+import msgpack
+import orjson
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+JSON = "application/json"
+MSGPACK = "application/msgpack"
+MSGPACK_TYPES = (MSGPACK, "application/x-msgpack")
+
+_accept: ContextVar[Optional[str]] = ContextVar("accept", default=None)
+
+
+def wants_msgpack(accept: Optional[str]) -> bool:
+    """
+    True when `accept` ranks MessagePack above JSON. Equal quality values
+    keep the client's order.
+    """
+    if not accept:
+        return False
+    best, best_quality = None, 0.0
+    for media_range in accept.split(","):
+        media_type, *params = (part.strip() for part in media_range.split(";"))
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if media_type in MSGPACK_TYPES or media_type in (JSON, "*/*"):
+            if quality > best_quality:
+                best, best_quality = media_type, quality
+    return best in MSGPACK_TYPES
+
+
+class NegotiatedResponse(JSONResponse):
+    """
+    Encodes with orjson, or with MessagePack when the request negotiated
+    it through ContentNegotiationMiddleware.
+    """
+
+    def render(self, content: Any) -> bytes:
+        if wants_msgpack(_accept.get()):
+            self.media_type = MSGPACK
+            return msgpack.packb(content)
+        return orjson.dumps(content)
+
+
+class ContentNegotiationMiddleware:
+    """
+    Makes the Accept header of the request visible to NegotiatedResponse
+    and marks responses as varying on it.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).add_vary_header("Accept")
+            await send(message)
+
+        token = _accept.set(Headers(scope=scope).get("accept"))
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _accept.reset(token)
@@ -0,0 +1,155 @@
+"""
+Rebuilds the group counters and the archived totals of the users from the
+raw rows, or verifies them and reports (or repairs) drift. Id ranges of
+`--chunk-size` groups or users are spread over a pool of `--workers`
+processes; each range is committed on its own.
+
+    PYTHONPATH=src python src/rollups.py rebuild --workers 4
+    PYTHONPATH=src python src/rollups.py verify --repair
+"""
+import argparse
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, List, Optional, Tuple, Type, Union
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from config import settings
+from database import engine_options
+from models import Group, User
+from services.counters import (
+    read_group_counter_drift,
+    read_user_archive_total_drift,
+    rebuild_group_counters,
+    rebuild_user_archive_totals,
+)
+
+_engine: Optional[Engine] = None
+
+
+def _init_worker(uri: str) -> None:
+    global _engine
+    _engine = create_engine(uri, **engine_options(uri))
+
+
+def rebuild_chunk(first_id: int, last_id: int) -> int:
+    with Session(_engine) as db:
+        rebuilt = rebuild_group_counters(db, first_id, last_id)
+        db.commit()
+    return rebuilt
+
+
+def verify_chunk(first_id: int, last_id: int, repair: bool) -> List[dict]:
+    with Session(_engine) as db:
+        drift = read_group_counter_drift(db, first_id, last_id)
+        for row in drift if repair else []:
+            rebuild_group_counters(db, row["group_id"], row["group_id"] + 1)
+        db.commit()
+    return drift
+
+
+def rebuild_user_chunk(first_id: int, last_id: int) -> int:
+    with Session(_engine) as db:
+        rebuilt = rebuild_user_archive_totals(db, first_id, last_id)
+        db.commit()
+    return rebuilt
+
+
+def verify_user_chunk(first_id: int, last_id: int, repair: bool) -> List[dict]:
+    with Session(_engine) as db:
+        drift = read_user_archive_total_drift(db, first_id, last_id)
+        for row in drift if repair else []:
+            rebuild_user_archive_totals(db, row["user_id"], row["user_id"] + 1)
+        db.commit()
+    return drift
+
+
+def chunks(
+    uri: str, model: Type[Union[Group, User]], chunk_size: int
+) -> Iterator[Tuple[int, int]]:
+    db_engine = create_engine(uri, **engine_options(uri))
+    with db_engine.connect() as connection:
+        first_id, last_id = connection.execute(
+            select(func.min(model.id), func.max(model.id))
+        ).one()
+    db_engine.dispose()
+    if first_id is None:
+        return
+    for start in range(first_id, last_id + 1, chunk_size):
+        yield start, start + chunk_size
+
+
+def run(
+    uri: str,
+    command: str,
+    workers: int = 4,
+    chunk_size: int = 1000,
+    repair: bool = False,
+) -> int:
+    """
+    Runs `command` over every chunk and prints what it found; returns the
+    exit status, 1 when unrepaired drift was found.
+    """
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker, initargs=(uri,)
+    ) as executor:
+        if command == "rebuild":
+            group_futures = [
+                executor.submit(rebuild_chunk, first_id, last_id)
+                for first_id, last_id in chunks(uri, Group, chunk_size)
+            ]
+            user_futures = [
+                executor.submit(rebuild_user_chunk, first_id, last_id)
+                for first_id, last_id in chunks(uri, User, chunk_size)
+            ]
+            rebuilt = sum(future.result() for future in group_futures)
+            print(f"Rebuilt the counters of {rebuilt} groups")
+            rebuilt = sum(future.result() for future in user_futures)
+            print(f"Rebuilt the archived totals of {rebuilt} users")
+            return 0
+        group_futures = [
+            executor.submit(verify_chunk, first_id, last_id, repair)
+            for first_id, last_id in chunks(uri, Group, chunk_size)
+        ]
+        user_futures = [
+            executor.submit(verify_user_chunk, first_id, last_id, repair)
+            for first_id, last_id in chunks(uri, User, chunk_size)
+        ]
+        drift = [row for future in group_futures for row in future.result()]
+        user_drift = [row for future in user_futures for row in future.result()]
+    for row in drift:
+        print(
+            f"group {row['group_id']}: "
+            f"members {row['stored_member_count']} != {row['member_count']}, "
+            f"expenses {row['stored_expense_count']} != {row['expense_count']}, "
+            f"amount {row['stored_total_amount']} != {row['total_amount']}"
+        )
+    for row in user_drift:
+        print(
+            f"user {row['user_id']}: "
+            f"expenses {row['stored_expense_amount']} != {row['expense_amount']}, "
+            f"replenishments {row['stored_replenishment_amount']} "
+            f"!= {row['replenishment_amount']}"
+        )
+    action = "Repaired" if repair else "Found"
+    print(f"{action} drift in {len(drift)} groups and {len(user_drift)} users")
+    return 1 if (drift or user_drift) and not repair else 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("command", choices=["rebuild", "verify"])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--repair", action="store_true")
+    parser.add_argument("--uri", default=settings.SQLALCHEMY_DATABASE_URI)
+    args = parser.parse_args(argv)
+    return run(args.uri, args.command, args.workers, args.chunk_size, args.repair)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
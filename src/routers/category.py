@@ -7,6 +7,8 @@ import services
 from database import get_db
 from dependencies import get_current_user
 from models import User
+from observability import InstrumentedRoute
+from responses import NegotiatedResponse
 from schemas import (
     CategoryModel,
     CategoryCreate,
@@ -18,6 +20,8 @@ from schemas import (
 router = APIRouter(
     prefix="/groups",
     tags=["categories"],
+    route_class=InstrumentedRoute,
+    default_response_class=NegotiatedResponse,
 )
 
 
@@ -15,12 +15,18 @@ from dependencies import (
     transform_exact_date_or_422,
     Page,
 )
+from enums import ExpenseSortEnum
 from models import User
+from observability import InstrumentedRoute
+from responses import NegotiatedResponse
 from schemas import ExpenseCreate, ExpenseModel, UserExpense, ExpenseUpdate
+from services.rows import to_user_expenses
 
 router = APIRouter(
     prefix="/groups",
     tags=["expenses"],
+    route_class=InstrumentedRoute,
+    default_response_class=NegotiatedResponse,
 )
 
 
@@ -67,6 +73,11 @@ def read_expenses_by_group(
     year_month: Optional[str] = None,
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
+    category_id: Optional[int] = None,
+    min_amount: Optional[float] = None,
+    max_amount: Optional[float] = None,
+    sort_by: Optional[ExpenseSortEnum] = None,
+    descending: bool = True,
 ) -> Page[UserExpense]:
     if year_month and (start_date or end_date):
         raise HTTPException(
@@ -87,7 +98,14 @@ def read_expenses_by_group(
                 user_id=current_user.id,
                 group_id=group_id,
                 filter_date=filter_date,
+                category_id=category_id,
+                min_amount=min_amount,
+                max_amount=max_amount,
+                sort_by=sort_by,
+                descending=descending,
             ),
+            transformer=to_user_expenses,
+            unique=False,
         )
     elif start_date and end_date:
         start_date = transform_exact_date_or_422(start_date)
@@ -100,12 +118,30 @@ def read_expenses_by_group(
                 group_id=group_id,
                 start_date=start_date,
                 end_date=end_date,
+                category_id=category_id,
+                min_amount=min_amount,
+                max_amount=max_amount,
+                sort_by=sort_by,
+                descending=descending,
             ),
+            transformer=to_user_expenses,
+            unique=False,
         )
     else:
         return paginate(
             db,
-            services.read_expenses(db=db, user_id=current_user.id, group_id=group_id),
+            services.read_expenses(
+                db=db,
+                user_id=current_user.id,
+                group_id=group_id,
+                category_id=category_id,
+                min_amount=min_amount,
+                max_amount=max_amount,
+                sort_by=sort_by,
+                descending=descending,
+            ),
+            transformer=to_user_expenses,
+            unique=False,
         )
 
 
@@ -117,6 +153,11 @@ def read_expenses(
     year_month: Optional[str] = None,
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
+    category_id: Optional[int] = None,
+    min_amount: Optional[float] = None,
+    max_amount: Optional[float] = None,
+    sort_by: Optional[ExpenseSortEnum] = None,
+    descending: bool = True,
 ) -> Page[UserExpense]:
     if year_month and (start_date or end_date):
         raise HTTPException(
@@ -133,8 +174,17 @@ def read_expenses(
         return paginate(
             db,
             services.read_expenses(
-                db=db, user_id=current_user.id, filter_date=filter_date
+                db=db,
+                user_id=current_user.id,
+                filter_date=filter_date,
+                category_id=category_id,
+                min_amount=min_amount,
+                max_amount=max_amount,
+                sort_by=sort_by,
+                descending=descending,
             ),
+            transformer=to_user_expenses,
+            unique=False,
         )
     elif start_date and end_date:
         start_date = transform_exact_date_or_422(start_date)
@@ -146,7 +196,27 @@ def read_expenses(
                 user_id=current_user.id,
                 start_date=start_date,
                 end_date=end_date,
+                category_id=category_id,
+                min_amount=min_amount,
+                max_amount=max_amount,
+                sort_by=sort_by,
+                descending=descending,
             ),
+            transformer=to_user_expenses,
+            unique=False,
         )
     else:
-        return paginate(db, services.read_expenses(db=db, user_id=current_user.id))
+        return paginate(
+            db,
+            services.read_expenses(
+                db=db,
+                user_id=current_user.id,
+                category_id=category_id,
+                min_amount=min_amount,
+                max_amount=max_amount,
+                sort_by=sort_by,
+                descending=descending,
+            ),
+            transformer=to_user_expenses,
+            unique=False,
+        )
@@ -9,7 +9,10 @@ from starlette.exceptions import HTTPException
 import services
 from database import get_db
 from dependencies import get_current_user
-from models import User
+from enums import ExpenseSortEnum
+from models import Expense, User
+from observability import InstrumentedRoute
+from responses import NegotiatedResponse
 from schemas import (
     AboutUser,
     GroupCreate,
@@ -33,6 +36,8 @@ from dependencies import Page, transform_date_or_422, transform_exact_date_or_42
 router = APIRouter(
     prefix="/groups",
     tags=["groups"],
+    route_class=InstrumentedRoute,
+    default_response_class=NegotiatedResponse,
 )
 
 
@@ -105,8 +110,30 @@ def read_group_history(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
     group_id: int,
+    category_id: Optional[int] = None,
+    user_id: Optional[int] = None,
+    min_amount: Optional[float] = None,
+    max_amount: Optional[float] = None,
+    sort_by: ExpenseSortEnum = ExpenseSortEnum.TIME,
+    descending: bool = True,
 ) -> Page[GroupHistory]:
-    return paginate(db, services.read_group_history(db, current_user.id, group_id))
+    return services.paginate_recent(
+        db,
+        lambda expenses: services.read_group_history(
+            db,
+            current_user.id,
+            group_id,
+            category_id=category_id,
+            member_id=user_id,
+            min_amount=min_amount,
+            max_amount=max_amount,
+            sort_by=sort_by,
+            descending=descending,
+            expenses=expenses,
+        ),
+        Expense,
+        newest_first=sort_by == ExpenseSortEnum.TIME and descending,
+    )
 
 
 @router.get("/{group_id}/info/", response_model=GroupInfo)
@@ -115,8 +142,11 @@ def read_group_info(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
     group_id: int,
+    wait_for_writes: bool = False,
 ) -> GroupInfo:
-    return services.read_group_info(db, current_user.id, group_id)
+    return services.read_group_info(
+        db, current_user.id, group_id, wait_for_writes=wait_for_writes
+    )
 
 
 @router.get("/{group_id}/total-expenses/", response_model=GroupTotalExpenses)
@@ -128,6 +158,7 @@ def read_group_total_expenses(
     year_month: Optional[str] = None,
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
+    wait_for_writes: bool = False,
 ) -> GroupTotalExpenses:
     if year_month and (start_date or end_date):
         raise HTTPException(
@@ -151,7 +182,9 @@ def read_group_total_expenses(
             db, current_user.id, group_id, start_date=start_date, end_date=end_date
         )
     else:
-        return services.read_group_total_expenses(db, current_user.id, group_id)
+        return services.read_group_total_expenses(
+            db, current_user.id, group_id, wait_for_writes=wait_for_writes
+        )
 
 
 @router.get("/{group_id}/my-total-expenses/", response_model=GroupUserTotalExpenses)
@@ -534,6 +567,10 @@ def read_group_member_history(
     group_id: int,
     member_id: int,
 ) -> Page[GroupHistory]:
-    return paginate(
-        db, services.read_group_member_history(db, current_user.id, group_id, member_id)
+    return services.paginate_recent(
+        db,
+        lambda expenses: services.read_group_member_history(
+            db, current_user.id, group_id, member_id, expenses
+        ),
+        Expense,
     )
@@ -7,12 +7,16 @@ import services
 from database import get_db
 from dependencies import get_current_user
 from models import User
+from observability import InstrumentedRoute
+from responses import NegotiatedResponse
 from enums import UserResponseEnum
 from schemas import BaseInvitation, InvitationCreate, InvitationModel
 
 router = APIRouter(
     prefix="/invitations",
     tags=["invitations"],
+    route_class=InstrumentedRoute,
+    default_response_class=NegotiatedResponse,
 )
 
 
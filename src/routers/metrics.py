@@ -0,0 +1,46 @@
+from secrets import compare_digest
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header
+from starlette import status
+from starlette.exceptions import HTTPException
+from starlette.responses import PlainTextResponse
+
+from config import settings
+from database import engine
+from observability import InstrumentedRoute, render_metrics
+
+router = APIRouter(
+    tags=["metrics"],
+    route_class=InstrumentedRoute,
+)
+
+
+def verify_metrics_token(authorization: Optional[str] = Header(None)) -> None:
+    """
+    Only a scraper holding METRICS_TOKEN as its bearer token reads the
+    metrics; without the setting they are not served at all.
+    """
+    if settings.METRICS_TOKEN is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+    expected = f"Bearer {settings.METRICS_TOKEN}"
+    if authorization is None or not compare_digest(
+        authorization.encode(), expected.encode()
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="The metrics token is invalid!",
+        )
+
+
+@router.get(
+    "/metrics",
+    response_class=PlainTextResponse,
+    include_in_schema=False,
+    dependencies=[Depends(verify_metrics_token)],
+)
+async def read_metrics() -> PlainTextResponse:
+    return PlainTextResponse(
+        render_metrics(engine),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
@@ -8,12 +8,15 @@ from starlette.responses import RedirectResponse
 
 from database import get_db
 from dependencies import oauth
-from models import User
-from services import get_user
+from observability import InstrumentedRoute
+from responses import NegotiatedResponse
+from services import register_user
 from config import settings
 
 router = APIRouter(
     tags=["registration"],
+    route_class=InstrumentedRoute,
+    default_response_class=NegotiatedResponse,
 )
 
 
@@ -31,31 +34,28 @@ async def auth(*, db: Session = Depends(get_db), request: Request):
         return error.error
     user = token["userinfo"]
     request.session["user"] = dict(user)
-    db_user = get_user(db, login=user["email"])
-    if not db_user:
-        try:
-            first_name = (user["given_name"],)
-        except KeyError:
-            first_name = ""
-        try:
-            last_name = (user["family_name"],)
-        except KeyError:
-            last_name = ""
-        db_user = User(
-            login=user["email"],
-            first_name=first_name,
-            last_name=last_name,
-            picture=user["picture"],
+    try:
+        first_name = user["given_name"]
+    except KeyError:
+        first_name = ""
+    try:
+        last_name = user["family_name"]
+    except KeyError:
+        last_name = ""
+    register_user(
+        db,
+        login=user["email"],
+        first_name=first_name,
+        last_name=last_name,
+        picture=user["picture"],
+    )
+    try:
+        db.commit()
+    except:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="An error occurred while create user",
         )
-        db.add(db_user)
-        db.flush()
-        try:
-            db.commit()
-        except:
-            raise HTTPException(
-                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-                detail="An error occurred while create category",
-            )
     return RedirectResponse(url="https://" + settings.DOMAIN_NAME)
 
 
@@ -16,6 +16,8 @@ from dependencies import (
     Page,
 )
 from models import User
+from observability import InstrumentedRoute
+from responses import NegotiatedResponse
 from schemas import (
     ReplenishmentCreate,
     ReplenishmentUpdate,
@@ -26,6 +28,8 @@ from schemas import (
 router = APIRouter(
     prefix="/replenishments",
     tags=["replenishments"],
+    route_class=InstrumentedRoute,
+    default_response_class=NegotiatedResponse,
 )
 
 
@@ -88,6 +92,7 @@ def read_replenishments(
             services.read_replenishments(
                 user_id=current_user.id, filter_date=filter_date
             ),
+            unique=False,
         )
     elif start_date and end_date:
         start_date = transform_exact_date_or_422(start_date)
@@ -99,6 +104,9 @@ def read_replenishments(
                 start_date=start_date,
                 end_date=end_date,
             ),
+            unique=False,
         )
     else:
-        return paginate(db, services.read_replenishments(user_id=current_user.id))
+        return paginate(
+            db, services.read_replenishments(user_id=current_user.id), unique=False
+        )
@@ -1,6 +1,6 @@
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
 from fastapi_pagination.ext.sqlalchemy import paginate
 from sqlalchemy.orm import Session
 from sqlalchemy import select
@@ -16,7 +16,9 @@ from dependencies import (
     Page,
     is_user_authenticated,
 )
-from models import User, Expense
+from models import User, Expense, Replenishment
+from observability import InstrumentedRoute
+from responses import NegotiatedResponse
 from schemas import (
     UserBalance,
     UserModel,
@@ -27,11 +29,14 @@ from schemas import (
     UserDailyExpenses,
     UserCategoryExpenses,
     UserGroupExpenses,
+    SearchPage,
 )
 
 router = APIRouter(
     prefix="/users",
     tags=["users"],
+    route_class=InstrumentedRoute,
+    default_response_class=NegotiatedResponse,
 )
 
 
@@ -69,7 +74,14 @@ def read_user_history(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ) -> Page[UserHistory]:
-    return paginate(db, services.read_user_history(current_user.id))
+    return services.paginate_recent(
+        db,
+        lambda expenses, replenishments: services.read_user_history(
+            current_user.id, expenses, replenishments
+        ),
+        Expense,
+        Replenishment,
+    )
 
 
 @router.get("/{group_id}/expenses/", response_model=UserGroupExpenses)
@@ -253,3 +265,31 @@ def read_user_total_replenishments(
         )
     else:
         return services.read_user_total_replenishments(db, current_user.id)
+
+
+@router.get("/search/", response_model=SearchPage)
+def search_history(
+    *,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    q: str = Query(..., min_length=1),
+    group_id: Optional[int] = None,
+    category_id: Optional[int] = None,
+    member_id: Optional[int] = None,
+    min_amount: Optional[float] = None,
+    max_amount: Optional[float] = None,
+    cursor: Optional[str] = None,
+    size: int = Query(20, ge=1, le=500),
+) -> SearchPage:
+    return services.search_history(
+        db,
+        current_user.id,
+        q,
+        group_id=group_id,
+        category_id=category_id,
+        member_id=member_id,
+        min_amount=min_amount,
+        max_amount=max_amount,
+        cursor=cursor,
+        size=size,
+    )
@@ -11,6 +11,8 @@ from .user import (
     CategoryExpenses,
     GroupMember,
     UserDailyExpensesDetail,
+    SearchResult,
+    SearchPage,
 )
 from .group import (
     AboutCategory,
@@ -80,3 +80,20 @@ class UserDailyExpensesDetail(BaseModel):
     date: datetime.date
     amount: float
     categories: List[CategoryExpenses]
+
+
+class SearchResult(BaseModel):
+    kind: str
+    id: int
+    descriptions: str
+    amount: float
+    time: datetime.datetime
+    group_id: Optional[int] = None
+    category_id: Optional[int] = None
+    user_id: int
+    rank: float
+
+
+class SearchPage(BaseModel):
+    items: List[SearchResult]
+    next_cursor: Optional[str] = None
@@ -7,6 +7,7 @@ from .expense import (
 )
 from .user import (
     get_user,
+    register_user,
     read_user_balance,
     read_user_total_expenses,
     read_user_total_replenishments,
@@ -40,6 +41,13 @@ from .group import (
     read_group_member_history,
     read_categories_group_detail,
 )
+from .counters import (
+    GroupCounterConsumer,
+    apply_group_counter_changes,
+    wait_for_group_counters,
+)
+from .archive import paginate_recent
+from .search import search_history
 from .invitation import create_invitation, read_invitations, response_invitation
 from .replenishment import (
     create_replenishment,
@@ -0,0 +1,191 @@
+import datetime
+from collections import defaultdict
+from decimal import Decimal
+from typing import Callable, Dict, Optional, Type, Union
+
+from dateutil.relativedelta import relativedelta
+from fastapi_pagination.api import create_page
+from fastapi_pagination.bases import AbstractPage, AbstractParams
+from fastapi_pagination.ext.sqlalchemy import count_query, paginate, paginate_query
+from fastapi_pagination.utils import verify_params
+from pydantic.schema import date
+from sqlalchemy import Select, delete, false, select
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy.orm.util import AliasedClass
+from starlette import status
+from starlette.exceptions import HTTPException
+
+from config import settings
+from database.dialect import as_datetime, insert
+from models import (
+    Expense,
+    ExpenseArchive,
+    Replenishment,
+    ReplenishmentArchive,
+    UserArchiveTotal,
+)
+
+ARCHIVES = {
+    Expense: (ExpenseArchive, "expense_amount"),
+    Replenishment: (ReplenishmentArchive, "replenishment_amount"),
+}
+
+
+def archive_cutoff(
+    today: Optional[datetime.date] = None,
+) -> Optional[datetime.datetime]:
+    """
+    Rows before the start of the month ARCHIVE_AFTER_MONTHS ago may be in
+    the archive. The cutoff only moves forward while the setting holds, so
+    a read starting after it never misses an archived row; lowering the
+    setting is safe, raising it is not.
+    """
+    if settings.ARCHIVE_AFTER_MONTHS is None:
+        return None
+    month = (today or datetime.date.today()).replace(day=1)
+    return as_datetime(month - relativedelta(months=settings.ARCHIVE_AFTER_MONTHS))
+
+
+def source(
+    model: Type[Union[Expense, Replenishment]], since: Optional[date] = None
+) -> Union[Type[Union[Expense, Replenishment]], AliasedClass]:
+    """
+    Returns `model` when a read of the rows from `since` on cannot reach the
+    archive, or else `model` aliased over its table and its archive. Reads
+    without `since` always reach it.
+    """
+    cutoff = archive_cutoff()
+    if cutoff is None or since is not None and as_datetime(since) >= cutoff:
+        return model
+    return _with_archive(model)
+
+
+def archived(
+    model: Type[Union[Expense, Replenishment]]
+) -> Union[Type[Union[Expense, Replenishment]], AliasedClass]:
+    """
+    Returns `model` aliased over its archive alone, for counting the rows
+    a read of `source(model)` gets from it.
+    """
+    return _with_archive(model, hot=False)
+
+
+def _with_archive(
+    model: Type[Union[Expense, Replenishment]], hot: bool = True
+) -> AliasedClass:
+    # The hot select stays in the union even when it reads nothing, so the
+    # columns of the alias keep their lineage to the columns of `model`.
+    archive = ARCHIVES[model][0]
+    rows = select(*model.__table__.c)
+    if not hot:
+        rows = rows.where(false())
+    rows = rows.union_all(select(*archive.__table__.c))
+    return aliased(model, rows.subquery(model.__tablename__))
+
+
+def paginate_recent(
+    db: Session,
+    build: Callable[..., Select],
+    *models: Type[Union[Expense, Replenishment]],
+    newest_first: bool = True,
+    params: Optional[AbstractParams] = None,
+) -> AbstractPage:
+    """
+    Pages through the statement `build` makes over the sources of `models`.
+    Every archived row is older than the cutoff, so when the statement is
+    ordered newest first a full page of hot rows ending after the cutoff is
+    the same page with the archive: only pages crossing it read the union.
+    The total adds the hot and the archived rows, counted apart.
+    """
+    cutoff = archive_cutoff()
+    if cutoff is None or not newest_first:
+        statement = build(*(source(model) for model in models))
+        return paginate(db, statement, params, unique=False)
+    params, raw_params = verify_params(params, "limit-offset")
+    hot = build(*models)
+    items = db.execute(paginate_query(hot, params)).all()
+    if len(items) < raw_params.limit or items[-1].time < cutoff:
+        statement = build(*(source(model) for model in models))
+        items = db.execute(paginate_query(statement, params)).all()
+    total = sum(
+        db.scalar(count_query(statement))
+        for statement in (hot, build(*(archived(model) for model in models)))
+    )
+    return create_page(items, total=total, params=params)
+
+
+def period_source(
+    model: Type[Union[Expense, Replenishment]],
+    filter_date: Optional[date] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+) -> Union[Type[Union[Expense, Replenishment]], AliasedClass]:
+    """
+    Returns the `source` of the rows a reader filtered by the month of
+    `filter_date`, or by the range from `start_date` to `end_date`, reads.
+    """
+    if filter_date:
+        return source(model, filter_date.replace(day=1))
+    return source(model, start_date if end_date else None)
+
+
+def validate_unarchived(
+    db: Session, model: Type[Union[Expense, Replenishment]], id_: int, user_id: int
+) -> None:
+    """
+    Archived rows are read-only: writes only reach the hot tables, so a
+    write that missed its row reports the row being archived instead of
+    it not being the user's.
+    """
+    archive = ARCHIVES[model][0]
+    if db.scalar(select(archive.id).filter_by(id=id_, user_id=user_id)) is not None:
+        raise HTTPException(
+            status_code=status.HTTP_405_METHOD_NOT_ALLOWED,
+            detail=f"The {model.__name__.lower()} is archived and cannot be changed!",
+        )
+
+
+def archive_rows(
+    db: Session,
+    model: Type[Union[Expense, Replenishment]],
+    cutoff: datetime.datetime,
+    limit: int = 1000,
+) -> int:
+    """
+    Moves up to `limit` rows of `model` older than `cutoff` to its archive
+    and adds their amounts to the archived totals of their users; returns
+    how many it moved. The caller commits.
+    """
+    archive, total = ARCHIVES[model]
+    ids = db.scalars(
+        select(model.id)
+        .where(model.time < cutoff)
+        .order_by(model.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    ).all()
+    if not ids:
+        return 0
+    rows = (
+        db.execute(
+            delete(model.__table__)
+            .where(model.id.in_(ids))
+            .returning(*model.__table__.c)
+        )
+        .mappings()
+        .all()
+    )
+    db.execute(insert(db, archive), [dict(row) for row in rows])
+    amounts: Dict[int, Decimal] = defaultdict(Decimal)
+    for row in rows:
+        amounts[row["user_id"]] += row["amount"]
+    statement = insert(db, UserArchiveTotal).values(
+        [{"user_id": user_id, total: amount} for user_id, amount in amounts.items()]
+    )
+    db.execute(
+        statement.on_conflict_do_update(
+            index_elements=[UserArchiveTotal.user_id],
+            set_={total: getattr(UserArchiveTotal, total) + statement.excluded[total]},
+        )
+    )
+    return len(rows)
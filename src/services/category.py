@@ -1,8 +1,9 @@
-from sqlalchemy import exc
+from sqlalchemy import exc, select, update
 from sqlalchemy.orm import Session
 from starlette import status
 from starlette.exceptions import HTTPException
 
+from database.dialect import insert
 from models import Category, CategoryGroup, Group
 from enums import GroupStatusEnum
 from schemas import CategoryModel, CategoryCreate, IconColor
@@ -31,34 +32,31 @@ def create_category(
     db: Session, user_id: int, group_id: int, category: CategoryCreate
 ) -> CategoryModel:
     validate_input_data(db, user_id, group_id)
-    db_category = (
-        db.query(Category).filter_by(title=category.title.lower()).one_or_none()
-    )
-    if db_category is None:
-        db_category = Category(title=category.title.lower())
-        db.add(db_category)
-        db.flush()
-    else:
-        db_category_group = (
-            db.query(CategoryGroup)
-            .filter_by(
-                group_id=group_id,
-                category_id=db_category.id,
-            )
-            .one_or_none()
+    title = category.title.lower()
+    db_category = db.scalars(
+        insert(db, Category)
+        .values(title=title)
+        .on_conflict_do_update(index_elements=[Category.title], set_={"title": title})
+        .returning(Category)
+    ).one()
+    db_category_group = db.scalars(
+        insert(db, CategoryGroup)
+        .values(
+            category_id=db_category.id,
+            group_id=group_id,
+            icon_url=category.icon_url,
+            color_code=category.color_code,
+        )
+        .on_conflict_do_nothing(
+            index_elements=[CategoryGroup.category_id, CategoryGroup.group_id]
+        )
+        .returning(CategoryGroup)
+    ).one_or_none()
+    if db_category_group is None:
+        raise HTTPException(
+            status_code=status.HTTP_405_METHOD_NOT_ALLOWED,
+            detail="The category is already in this group!",
         )
-        if db_category_group:
-            raise HTTPException(
-                status_code=status.HTTP_405_METHOD_NOT_ALLOWED,
-                detail="The category is already in this group!",
-            )
-    db_category_group = CategoryGroup(
-        category_id=db_category.id,
-        group_id=group_id,
-        icon_url=category.icon_url,
-        color_code=category.color_code,
-    )
-    db.add(db_category_group)
     try:
         db.commit()
     except:
@@ -73,32 +71,25 @@ def create_category(
 def update_category(
     db: Session, user_id: int, group_id: int, icon_color: IconColor, category_id: int
 ) -> CategoryModel:
-    validate_input_data(db, user_id, group_id)
-    try:
-        (
-            db.query(CategoryGroup)
-            .filter_by(
-                group_id=group_id,
-                category_id=category_id,
-            )
-            .one()
+    db_category_group = db.scalars(
+        update(CategoryGroup)
+        .where(
+            CategoryGroup.group_id == group_id,
+            CategoryGroup.category_id == category_id,
+            select(Group)
+            .filter_by(id=group_id, admin_id=user_id, status=GroupStatusEnum.ACTIVE)
+            .exists(),
         )
-    except exc.NoResultFound:
+        .values(**icon_color.dict())
+        .returning(CategoryGroup)
+    ).one_or_none()
+    if db_category_group is None:
+        validate_input_data(db, user_id, group_id)
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="You do not have this category!",
         )
-    db.query(CategoryGroup).filter_by(
-        group_id=group_id,
-        category_id=category_id,
-    ).update(values={**icon_color.dict()})
-    db_category_group = (
-        db.query(Category)
-        .filter_by(
-            id=category_id,
-        )
-        .one()
-    )
+    db_category = db.get(Category, category_id)
     try:
         db.commit()
     except:
@@ -107,4 +98,4 @@ def update_category(
             detail="An error occurred while update category",
         )
     else:
-        return db_category_group
+        return db_category
@@ -0,0 +1,361 @@
+import logging
+import threading
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import Select, delete, func, or_, select
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.functions import coalesce
+
+from cache import cache, namespace
+from config import settings
+from database.dialect import insert
+from enums import GroupStatusEnum
+from models import (
+    Expense,
+    ExpenseArchive,
+    Group,
+    GroupCounter,
+    GroupCounterChange,
+    ReplenishmentArchive,
+    User,
+    UserArchiveTotal,
+    UserGroup,
+)
+from .totals import Amount
+
+logger = logging.getLogger(__name__)
+
+
+def upsert_group_counters(db: Session, rows: List[dict]) -> None:
+    """
+    Adds the deltas of `rows` to the counters of their groups in one atomic
+    upsert, so concurrent writers never lose an update.
+    """
+    statement = insert(db, GroupCounter).values(rows)
+    db.execute(
+        statement.on_conflict_do_update(
+            index_elements=[GroupCounter.group_id],
+            set_={
+                "member_count": GroupCounter.member_count
+                + statement.excluded.member_count,
+                "expense_count": GroupCounter.expense_count
+                + statement.excluded.expense_count,
+                "total_amount": GroupCounter.total_amount
+                + statement.excluded.total_amount,
+            },
+        )
+    )
+
+
+def add_group_counters(
+    db: Session,
+    group_id: int,
+    members: int = 0,
+    expenses: int = 0,
+    amount: Amount = 0,
+) -> None:
+    """
+    Adds the deltas to the counters of the group. In write-behind mode they
+    are queued in the same transaction instead, and applied later by
+    `apply_group_counter_changes`.
+    """
+    if settings.COUNTERS_WRITE_BEHIND:
+        db.execute(
+            insert(db, GroupCounterChange).values(
+                group_id=group_id,
+                member_delta=members,
+                expense_delta=expenses,
+                amount_delta=amount,
+            )
+        )
+        return
+    upsert_group_counters(
+        db,
+        [
+            dict(
+                group_id=group_id,
+                member_count=members,
+                expense_count=expenses,
+                total_amount=amount,
+            )
+        ],
+    )
+
+
+def apply_group_counter_changes(
+    db: Session,
+    group_id: Optional[int] = None,
+    limit: Optional[int] = None,
+) -> List[GroupCounterChange]:
+    """
+    Folds up to `limit` queued changes, of one group or of all, into the
+    counters with one bulk upsert, deletes and returns them. Draining all
+    groups skips rows another drainer holds; draining one group waits for
+    it, so its changes are applied on return. The caller calls
+    `invalidate_groups`, then commits.
+    """
+    query = select(GroupCounterChange).order_by(GroupCounterChange.id)
+    if group_id is None:
+        query = query.with_for_update(skip_locked=True)
+    else:
+        query = query.filter_by(group_id=group_id).with_for_update()
+    changes = db.scalars(query.limit(limit or settings.COUNTERS_BATCH_SIZE)).all()
+    if not changes:
+        return changes
+    totals: Dict[int, dict] = defaultdict(
+        lambda: dict(member_count=0, expense_count=0, total_amount=0)
+    )
+    for change in changes:
+        row = totals[change.group_id]
+        row["member_count"] += change.member_delta
+        row["expense_count"] += change.expense_delta
+        row["total_amount"] += change.amount_delta
+    upsert_group_counters(
+        db, [dict(group_id=key, **row) for key, row in totals.items()]
+    )
+    db.execute(
+        delete(GroupCounterChange).where(
+            GroupCounterChange.id.in_([change.id for change in changes])
+        )
+    )
+    return changes
+
+
+def invalidate_groups(db: Session, changes: List[GroupCounterChange]) -> None:
+    for group_id in {change.group_id for change in changes}:
+        cache.invalidate(namespace("group", group_id), db)
+
+
+def wait_for_group_counters(db: Session, group_id: int) -> None:
+    """
+    Applies the changes of the group still queued, so a request sees the
+    counters of its own writes.
+    """
+    if not settings.COUNTERS_WRITE_BEHIND:
+        return
+    changes = apply_group_counter_changes(db, group_id)
+    if changes:
+        invalidate_groups(db, changes)
+        db.commit()
+
+
+def expected_group_counters(first_id: int, last_id: int) -> Select:
+    """
+    Counters of the groups with ids in [`first_id`, `last_id`) recomputed
+    from the raw rows, archived ones included, less the changes still
+    queued for them.
+    """
+
+    def pending(delta) -> Select:
+        return (
+            select(coalesce(func.sum(delta), 0))
+            .where(GroupCounterChange.group_id == Group.id)
+            .scalar_subquery()
+        )
+
+    def expenses(table) -> Select:
+        return select(func.count()).where(table.group_id == Group.id).scalar_subquery()
+
+    def amount(table) -> Select:
+        return (
+            select(coalesce(func.sum(table.amount), 0))
+            .where(table.group_id == Group.id)
+            .scalar_subquery()
+        )
+
+    members = (
+        select(func.count())
+        .where(
+            UserGroup.group_id == Group.id,
+            UserGroup.status == GroupStatusEnum.ACTIVE,
+        )
+        .scalar_subquery()
+    )
+    return select(
+        Group.id.label("group_id"),
+        (members - pending(GroupCounterChange.member_delta)).label("member_count"),
+        (
+            expenses(Expense)
+            + expenses(ExpenseArchive)
+            - pending(GroupCounterChange.expense_delta)
+        ).label("expense_count"),
+        (
+            amount(Expense)
+            + amount(ExpenseArchive)
+            - pending(GroupCounterChange.amount_delta)
+        ).label("total_amount"),
+    ).where(Group.id >= first_id, Group.id < last_id)
+
+
+def rebuild_group_counters(db: Session, first_id: int, last_id: int) -> int:
+    """
+    Overwrites the counters of the groups with ids in [`first_id`,
+    `last_id`) with their recomputed values; returns how many it wrote.
+    """
+    expected = expected_group_counters(first_id, last_id)
+    statement = insert(db, GroupCounter).from_select(
+        ["group_id", "member_count", "expense_count", "total_amount"], expected
+    )
+    result = db.execute(
+        statement.on_conflict_do_update(
+            index_elements=[GroupCounter.group_id],
+            set_={
+                "member_count": statement.excluded.member_count,
+                "expense_count": statement.excluded.expense_count,
+                "total_amount": statement.excluded.total_amount,
+            },
+        )
+    )
+    return result.rowcount
+
+
+def read_group_counter_drift(db: Session, first_id: int, last_id: int) -> List[dict]:
+    """
+    Compares the counters of the groups with ids in [`first_id`, `last_id`)
+    with their recomputed values in one plain SELECT, which takes no locks
+    writers wait on, and returns the groups that differ.
+    """
+    expected = expected_group_counters(first_id, last_id).subquery()
+    rows = db.execute(
+        select(
+            expected,
+            GroupCounter.member_count.label("stored_member_count"),
+            GroupCounter.expense_count.label("stored_expense_count"),
+            GroupCounter.total_amount.label("stored_total_amount"),
+        )
+        .outerjoin(GroupCounter, GroupCounter.group_id == expected.c.group_id)
+        .where(
+            or_(
+                GroupCounter.group_id.is_(None),
+                GroupCounter.member_count != expected.c.member_count,
+                GroupCounter.expense_count != expected.c.expense_count,
+                GroupCounter.total_amount != expected.c.total_amount,
+            )
+        )
+        .order_by(expected.c.group_id)
+    )
+    return [dict(row._mapping) for row in rows]
+
+
+def expected_user_archive_totals(first_id: int, last_id: int) -> Select:
+    """
+    Archived totals of the users with ids in [`first_id`, `last_id`)
+    recomputed from the archived rows.
+    """
+
+    def amount(table) -> Select:
+        return (
+            select(coalesce(func.sum(table.amount), 0))
+            .where(table.user_id == User.id)
+            .scalar_subquery()
+        )
+
+    return select(
+        User.id.label("user_id"),
+        amount(ExpenseArchive).label("expense_amount"),
+        amount(ReplenishmentArchive).label("replenishment_amount"),
+    ).where(User.id >= first_id, User.id < last_id)
+
+
+def rebuild_user_archive_totals(db: Session, first_id: int, last_id: int) -> int:
+    """
+    Overwrites the archived totals of the users with ids in [`first_id`,
+    `last_id`) with their recomputed values; returns how many it wrote.
+    """
+    expected = expected_user_archive_totals(first_id, last_id)
+    statement = insert(db, UserArchiveTotal).from_select(
+        ["user_id", "expense_amount", "replenishment_amount"], expected
+    )
+    result = db.execute(
+        statement.on_conflict_do_update(
+            index_elements=[UserArchiveTotal.user_id],
+            set_={
+                "expense_amount": statement.excluded.expense_amount,
+                "replenishment_amount": statement.excluded.replenishment_amount,
+            },
+        )
+    )
+    return result.rowcount
+
+
+def read_user_archive_total_drift(
+    db: Session, first_id: int, last_id: int
+) -> List[dict]:
+    """
+    Compares the archived totals of the users with ids in [`first_id`,
+    `last_id`) with their recomputed values and returns the users that
+    differ. A user without a row has archived nothing.
+    """
+    expected = expected_user_archive_totals(first_id, last_id).subquery()
+    stored_expense_amount = coalesce(UserArchiveTotal.expense_amount, 0)
+    stored_replenishment_amount = coalesce(UserArchiveTotal.replenishment_amount, 0)
+    rows = db.execute(
+        select(
+            expected,
+            stored_expense_amount.label("stored_expense_amount"),
+            stored_replenishment_amount.label("stored_replenishment_amount"),
+        )
+        .outerjoin(UserArchiveTotal, UserArchiveTotal.user_id == expected.c.user_id)
+        .where(
+            or_(
+                stored_expense_amount != expected.c.expense_amount,
+                stored_replenishment_amount != expected.c.replenishment_amount,
+            )
+        )
+        .order_by(expected.c.user_id)
+    )
+    return [dict(row._mapping) for row in rows]
+
+
+class GroupCounterConsumer:
+    """
+    Drains the queued counter changes in the background, every half of
+    `max_staleness` seconds, so no change waits longer than that to be
+    applied.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        max_staleness: float = 1.0,
+    ) -> None:
+        self.session_factory = session_factory
+        self.interval = max_staleness / 2
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def drain(self) -> int:
+        applied = 0
+        with self.session_factory() as db:
+            while True:
+                changes = apply_group_counter_changes(db)
+                invalidate_groups(db, changes)
+                db.commit()
+                applied += len(changes)
+                if len(changes) < settings.COUNTERS_BATCH_SIZE:
+                    return applied
+
+    def start(self) -> None:
+        self._stopped.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="group-counters", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        try:
+            self.drain()
+        except Exception:
+            logger.exception("Could not apply group counter changes")
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            try:
+                self.drain()
+            except Exception:
+                logger.exception("Could not apply group counter changes")
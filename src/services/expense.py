@@ -2,15 +2,21 @@ import datetime
 from typing import List, Optional, Union
 
 from pydantic.schema import date
-from sqlalchemy import and_, exc, extract
-from sqlalchemy.orm import Session
-from sqlalchemy import select
+from sqlalchemy import and_, exc
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import delete, inspect, select, update
 from starlette import status
 from starlette.exceptions import HTTPException
 
+from cache import cache, namespace
+from database.dialect import between_dates, in_month
 from models import CategoryGroup, Expense, UserGroup
-from enums import GroupStatusEnum
+from enums import ExpenseSortEnum, GroupStatusEnum
 from schemas import ExpenseCreate, ExpenseModel, UserExpense, ExpenseUpdate
+from .counters import add_group_counters
+from .archive import period_source, validate_unarchived
+from .filters import expense_order, filter_expenses
+from .rows import user_expense_columns
 
 
 def validate_user_group(db: Session, user_id: int, group_id: int) -> UserGroup:
@@ -35,6 +41,7 @@ def validate_expense(
     try:
         db.query(Expense).filter_by(id=expense_id, user_id=user_id).one()
     except exc.NoResultFound:
+        validate_unarchived(db, Expense, expense_id, user_id)
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="It's not your expense!",
@@ -84,6 +91,22 @@ def validate_expense_update(
         )
 
 
+def read_expense_model(db: Session, expense_id: int) -> Expense:
+    """
+    Loads an expense together with everything ExpenseModel nests, in one
+    query, so serializing it fires no lazy loads.
+    """
+    return db.execute(
+        select(Expense)
+        .options(
+            joinedload(Expense.user),
+            joinedload(Expense.category_group).joinedload(CategoryGroup.group),
+            joinedload(Expense.category_group).joinedload(CategoryGroup.category),
+        )
+        .filter_by(id=expense_id)
+    ).scalar_one()
+
+
 def create_expense(
     db: Session, user_id: int, group_id: int, expense: ExpenseCreate
 ) -> ExpenseModel:
@@ -109,6 +132,8 @@ def create_expense(
     db_expense.time = datetime.datetime.utcnow()
     db.add(db_expense)
     try:
+        add_group_counters(db, group_id, expenses=1, amount=expense.amount)
+        cache.invalidate(namespace("group", group_id), db)
         db.commit()
     except:
         raise HTTPException(
@@ -116,18 +141,61 @@ def create_expense(
             detail="An error occurred while create expense",
         )
     else:
-        return db_expense
+        (expense_id,) = inspect(db_expense).identity
+        return read_expense_model(db, expense_id)
 
 
 def update_expense(
     db: Session, user_id: int, group_id: int, expense: ExpenseUpdate, expense_id: int
 ) -> ExpenseModel:
-    validate_user_group(db=db, user_id=user_id, group_id=group_id)
-    validate_expense(db=db, user_id=user_id, group_id=group_id, expense_id=expense_id)
-    validate_expense_update(db=db, user_id=user_id, group_id=group_id, expense=expense)
-    db.query(Expense).filter_by(id=expense_id).update(values={**expense.dict()})
-    db_expense = db.query(Expense).filter_by(id=expense_id).one()
+    # Locks the row so the amount replaced is the one the counters hold.
+    old_amount = db.scalar(
+        select(Expense.amount)
+        .filter_by(id=expense_id, user_id=user_id, group_id=group_id)
+        .with_for_update()
+    )
+    updated_amount = db.execute(
+        update(Expense)
+        .where(
+            Expense.id == expense_id,
+            Expense.user_id == user_id,
+            Expense.group_id == group_id,
+            select(UserGroup).filter_by(group_id=group_id, user_id=user_id).exists(),
+            select(UserGroup)
+            .filter_by(
+                group_id=expense.group_id,
+                user_id=user_id,
+                status=GroupStatusEnum.ACTIVE,
+            )
+            .exists(),
+            select(CategoryGroup)
+            .filter_by(category_id=expense.category_id, group_id=expense.group_id)
+            .exists(),
+        )
+        .values(**expense.dict())
+        .returning(Expense.amount)
+    ).scalar_one_or_none()
+    if updated_amount is None:
+        # Nothing matched: find out which check failed to report it.
+        validate_user_group(db=db, user_id=user_id, group_id=group_id)
+        validate_expense(
+            db=db, user_id=user_id, group_id=group_id, expense_id=expense_id
+        )
+        validate_expense_update(
+            db=db, user_id=user_id, group_id=group_id, expense=expense
+        )
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="It's not your expense!",
+        )
+    if expense.group_id == group_id:
+        add_group_counters(db, group_id, amount=updated_amount - old_amount)
+    else:
+        add_group_counters(db, group_id, expenses=-1, amount=-old_amount)
+        add_group_counters(db, expense.group_id, expenses=1, amount=updated_amount)
     try:
+        cache.invalidate(namespace("group", group_id), db)
+        cache.invalidate(namespace("group", expense.group_id), db)
         db.commit()
     except:
         raise HTTPException(
@@ -135,14 +203,18 @@ def update_expense(
             detail="An error occurred while update expense",
         )
     else:
-        return db_expense
+        return read_expense_model(db, expense_id)
 
 
 def delete_expense(db: Session, user_id: int, group_id: int, expense_id: int) -> None:
     validate_user_group(db=db, user_id=user_id, group_id=group_id)
     validate_expense(db=db, user_id=user_id, group_id=group_id, expense_id=expense_id)
-    db.query(Expense).filter_by(id=expense_id).delete()
+    amount = db.execute(
+        delete(Expense).filter_by(id=expense_id).returning(Expense.amount)
+    ).scalar_one()
     try:
+        add_group_counters(db, group_id, expenses=-1, amount=-amount)
+        cache.invalidate(namespace("group", group_id), db)
         db.commit()
     except:
         raise HTTPException(
@@ -158,12 +230,24 @@ def read_expenses(
     filter_date: Optional[date] = None,
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
+    category_id: Optional[int] = None,
+    min_amount: Optional[float] = None,
+    max_amount: Optional[float] = None,
+    sort_by: Optional[ExpenseSortEnum] = None,
+    descending: bool = True,
 ) -> List[UserExpense]:
     if filter_date and start_date or filter_date and end_date:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Too many arguments! It is necessary to select either a month or a start date and an end date!",
         )
+    expense_source = period_source(Expense, filter_date, start_date, end_date)
+    expense_rows = (
+        select(*user_expense_columns(expense_source))
+        .join(expense_source.category_group)
+        .join(CategoryGroup.group)
+        .join(CategoryGroup.category)
+    )
     if group_id:
         try:
             db.query(UserGroup).filter_by(
@@ -175,17 +259,16 @@ def read_expenses(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="You are not a user of this group!",
             )
-        expenses = select(Expense).filter_by(user_id=user_id, group_id=group_id)
-    else:
-        expenses = select(Expense).filter_by(
-            user_id=user_id,
+        expenses = expense_rows.where(
+            expense_source.user_id == user_id, expense_source.group_id == group_id
         )
+    else:
+        expenses = expense_rows.where(expense_source.user_id == user_id)
     if filter_date:
         expenses = expenses.filter(
             and_(
-                Expense.user_id == user_id,
-                extract("year", Expense.time) == filter_date.year,
-                extract("month", Expense.time) == filter_date.month,
+                expense_source.user_id == user_id,
+                in_month(expense_source.time, filter_date.year, filter_date.month),
             )
         )
     elif start_date and end_date:
@@ -195,8 +278,16 @@ def read_expenses(
                 detail="The start date cannot be older than the end date!",
             )
         expenses = expenses.filter(
-            Expense.user_id == user_id,
-            Expense.time >= start_date,
-            Expense.time <= end_date,
+            expense_source.user_id == user_id,
+            between_dates(expense_source.time, start_date, end_date),
         )
-    return expenses
+    expenses = filter_expenses(
+        expenses,
+        expense_source,
+        category_id=category_id,
+        min_amount=min_amount,
+        max_amount=max_amount,
+    )
+    if sort_by is None:
+        return expenses.order_by(expense_source.id)
+    return expenses.order_by(*expense_order(expense_source, sort_by, descending))
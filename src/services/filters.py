@@ -0,0 +1,31 @@
+from typing import Optional, Tuple
+
+from sqlalchemy import Select
+
+from enums import ExpenseSortEnum
+
+
+def filter_expenses(
+    statement: Select,
+    expenses,
+    category_id: Optional[int] = None,
+    member_id: Optional[int] = None,
+    min_amount: Optional[float] = None,
+    max_amount: Optional[float] = None,
+) -> Select:
+    if category_id is not None:
+        statement = statement.where(expenses.category_id == category_id)
+    if member_id is not None:
+        statement = statement.where(expenses.user_id == member_id)
+    if min_amount is not None:
+        statement = statement.where(expenses.amount >= min_amount)
+    if max_amount is not None:
+        statement = statement.where(expenses.amount <= max_amount)
+    return statement
+
+
+def expense_order(expenses, sort_by: ExpenseSortEnum, descending: bool = True) -> Tuple:
+    column = expenses.amount if sort_by == ExpenseSortEnum.AMOUNT else expenses.time
+    if descending:
+        return column.desc(), expenses.id.desc()
+    return column.asc(), expenses.id.asc()
@@ -1,17 +1,28 @@
 import datetime
-from dateutil.relativedelta import relativedelta
-from typing import Union, List, Optional
+from typing import Union, List, Optional, Type
 
-from sqlalchemy import exc, func, select, desc, and_, extract
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy.sql.functions import coalesce, sum, count
+from sqlalchemy import exc, exists, func, select, desc, and_, true, update
+from sqlalchemy.orm import Session, joinedload, selectinload
+from sqlalchemy.orm.util import AliasedClass
+from sqlalchemy.sql.functions import coalesce, count
 from starlette import status
 from starlette.exceptions import HTTPException
 from pydantic.schema import date
 
-from models import Group, User, UserGroup, Expense, CategoryGroup, Category
+from cache import cache, namespace
+from database import fan_out
+from database.dialect import between_dates, date_bucket, in_month, insert
+from models import (
+    Group,
+    GroupCounter,
+    User,
+    UserGroup,
+    Expense,
+    CategoryGroup,
+    Category,
+)
 from services import read_user_daily_expenses
-from enums import GroupStatusEnum
+from enums import ExpenseSortEnum, GroupStatusEnum
 from schemas import (
     AboutUser,
     CategoriesGroup,
@@ -32,6 +43,10 @@ from schemas import (
     CategoriesGroupDetail,
 )
 from enums import GroupStatusEnum
+from .archive import period_source, source
+from .counters import add_group_counters, wait_for_group_counters
+from .filters import expense_order, filter_expenses
+from .totals import read_period_totals, sum_amount
 
 
 def user_validate_input_date(
@@ -39,16 +54,19 @@ def user_validate_input_date(
     user_id: int,
     group_id: int,
 ) -> None:
-    try:
-        (
-            db.query(UserGroup)
-            .filter_by(
-                user_id=user_id,
-                group_id=group_id,
+    is_member = cache.get_or_load(
+        namespace("group", group_id),
+        f"member:{user_id}",
+        lambda: db.scalar(
+            select(
+                exists().where(
+                    UserGroup.user_id == user_id, UserGroup.group_id == group_id
+                )
             )
-            .one()
         )
-    except:
+        or None,
+    )
+    if not is_member:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="You are not in this group!",
@@ -91,7 +109,18 @@ def group_member_validate_input_data(
         )
 
 
-def read_group_history(db: Session, user_id: int, group_id: int) -> List[GroupHistory]:
+def read_group_history(
+    db: Session,
+    user_id: int,
+    group_id: int,
+    category_id: Optional[int] = None,
+    member_id: Optional[int] = None,
+    min_amount: Optional[float] = None,
+    max_amount: Optional[float] = None,
+    sort_by: ExpenseSortEnum = ExpenseSortEnum.TIME,
+    descending: bool = True,
+    expenses: Optional[Union[Type[Expense], AliasedClass]] = None,
+) -> List[GroupHistory]:
     user_validate_input_date(db, user_id, group_id)
     try:
         (
@@ -108,13 +137,14 @@ def read_group_history(db: Session, user_id: int, group_id: int) -> List[GroupHi
             status_code=status.HTTP_405_METHOD_NOT_ALLOWED,
             detail="The user is not active in this group!",
         )
+    expenses = expenses or source(Expense)
     history = (
         select(
-            Expense.id,
-            Expense.descriptions,
-            Expense.amount,
-            Expense.time,
-            Expense.category_id,
+            expenses.id,
+            expenses.descriptions,
+            expenses.amount,
+            expenses.time,
+            expenses.category_id,
             CategoryGroup.color_code.label("color_code_category"),
             Category.title.label("title_category"),
             User.id.label("user_id"),
@@ -126,36 +156,44 @@ def read_group_history(db: Session, user_id: int, group_id: int) -> List[GroupHi
         .join(
             CategoryGroup,
             and_(
-                Expense.category_id == CategoryGroup.category_id,
-                Expense.group_id == CategoryGroup.group_id,
+                expenses.category_id == CategoryGroup.category_id,
+                expenses.group_id == CategoryGroup.group_id,
             ),
         )
-        .join(Category, Expense.category_id == Category.id)
-        .join(User, User.id == Expense.user_id)
-        .filter(Expense.group_id == group_id)
-        .order_by(desc(Expense.time))
+        .join(Category, expenses.category_id == Category.id)
+        .join(User, User.id == expenses.user_id)
+        .filter(expenses.group_id == group_id)
+        .order_by(*expense_order(expenses, sort_by, descending))
+    )
+    return filter_expenses(
+        history, expenses, category_id, member_id, min_amount, max_amount
     )
-    return history
 
 
-def read_group_info(db: Session, user_id: int, group_id: int) -> GroupInfo:
+def read_group_info(
+    db: Session, user_id: int, group_id: int, wait_for_writes: bool = False
+) -> GroupInfo:
     user_validate_input_date(db, user_id, group_id)
-    group = (
-        db.query(Group).options(joinedload(Group.admin)).filter_by(id=group_id).one()
+    if wait_for_writes:
+        wait_for_group_counters(db, group_id)
+    return cache.get_or_load(
+        namespace("group", group_id),
+        "info",
+        lambda: load_group_info(db, group_id),
     )
-    group_users_count = (
-        db.query(func.count(UserGroup.user_id))
-        .filter(
-            and_(
-                UserGroup.group_id == group_id,
-                UserGroup.status == GroupStatusEnum.ACTIVE,
-            )
+
+
+def load_group_info(db: Session, group_id: int) -> GroupInfo:
+    group, members, expenses = db.execute(
+        select(
+            Group,
+            coalesce(GroupCounter.member_count, 0),
+            coalesce(GroupCounter.expense_count, 0),
         )
-        .scalar()
-    )
-    group_expenses_count = (
-        db.query(func.count(Expense.id)).filter_by(group_id=group_id).scalar()
-    )
+        .options(joinedload(Group.admin))
+        .outerjoin(GroupCounter, GroupCounter.group_id == Group.id)
+        .filter(Group.id == group_id)
+    ).one()
     group_info = GroupInfo(
         id=group.id,
         title=group.title,
@@ -164,8 +202,8 @@ def read_group_info(db: Session, user_id: int, group_id: int) -> GroupInfo:
         icon_url=group.icon_url,
         color_code=group.color_code,
         admin=group.admin,
-        members=group_users_count,
-        expenses=group_expenses_count,
+        members=members,
+        expenses=expenses,
     )
     return group_info
 
@@ -198,6 +236,7 @@ def remove_user(
     if admin_id == user_id:
         try:
             db_users_group = disband_group(db, group_id)
+            cache.invalidate(namespace("group", group_id), db)
             db.commit()
         except:
             raise HTTPException(
@@ -209,7 +248,6 @@ def remove_user(
     else:
         try:
             db_user_group = leave_group(db, user_id, group_id)
-            db.commit()
         except:
             raise HTTPException(
                 status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
@@ -222,9 +260,12 @@ def remove_user(
 def disband_group(db: Session, group_id: int) -> UsersGroup:
     db_group = db.query(Group).filter_by(id=group_id).one()
     db_group.status = GroupStatusEnum.INACTIVE
-    db.query(UserGroup).filter_by(group_id=group_id).update(
-        {UserGroup.status: GroupStatusEnum.INACTIVE}
+    left = (
+        db.query(UserGroup)
+        .filter_by(group_id=group_id, status=GroupStatusEnum.ACTIVE)
+        .update({UserGroup.status: GroupStatusEnum.INACTIVE})
     )
+    add_group_counters(db, group_id, members=-left)
     db_users_group = (
         db.query(Group)
         .options(joinedload(Group.users_group))
@@ -243,6 +284,7 @@ def leave_group(
     if db_admin_group:
         try:
             db_users_group = disband_group(db, group_id)
+            cache.invalidate(namespace("group", group_id), db)
             db.commit()
         except:
             raise HTTPException(
@@ -251,22 +293,35 @@ def leave_group(
             )
         else:
             return db_users_group
-    try:
-        db_user_group = (
-            db.query(UserGroup)
-            .filter_by(
-                group_id=group_id,
-                user_id=user_id,
+    db_user_group = db.scalars(
+        update(UserGroup)
+        .where(
+            UserGroup.group_id == group_id,
+            UserGroup.user_id == user_id,
+            UserGroup.status == GroupStatusEnum.ACTIVE,
+        )
+        .values(status=GroupStatusEnum.INACTIVE)
+        .returning(UserGroup)
+    ).one_or_none()
+    if db_user_group is not None:
+        add_group_counters(db, group_id, members=-1)
+    else:
+        try:
+            db_user_group = (
+                db.query(UserGroup)
+                .filter_by(
+                    group_id=group_id,
+                    user_id=user_id,
+                )
+                .one()
+            )
+        except exc.NoResultFound:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Group is not found",
             )
-            .one()
-        )
-    except exc.NoResultFound:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Group is not found",
-        )
-    db_user_group.status = GroupStatusEnum.INACTIVE
     try:
+        cache.invalidate(namespace("group", group_id), db)
         db.commit()
     except:
         raise HTTPException(
@@ -300,16 +355,19 @@ def create_group(db: Session, user_id: int, group: GroupCreate) -> GroupModel:
 def update_group(
     db: Session, user_id: int, group: GroupCreate, group_id: int
 ) -> GroupModel:
-    try:
-        db.query(Group).filter_by(id=group_id, admin_id=user_id).one()
-    except exc.NoResultFound:
+    db_group = db.scalars(
+        update(Group)
+        .where(Group.id == group_id, Group.admin_id == user_id)
+        .values(**group.dict())
+        .returning(Group)
+    ).one_or_none()
+    if db_group is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="You are not an admin of this group!",
         )
-    db.query(Group).filter_by(id=group_id).update(values={**group.dict()})
-    db_group = db.query(Group).filter_by(id=group_id).one()
     try:
+        cache.invalidate(namespace("group", group_id), db)
         db.commit()
     except:
         raise HTTPException(
@@ -321,25 +379,23 @@ def update_group(
 
 
 def add_user_in_group(db: Session, user_id: int, group_id: int) -> None:
-    db_user_group = (
-        db.query(UserGroup)
-        .filter_by(
-            user_id=user_id,
-            group_id=group_id,
-            status=GroupStatusEnum.INACTIVE,
-        )
-        .one_or_none()
-    )
-    if db_user_group:
-        db_user_group.status = GroupStatusEnum.ACTIVE
-    else:
-        db_user_group = UserGroup(
+    joined = db.execute(
+        insert(db, UserGroup)
+        .values(
             user_id=user_id,
             group_id=group_id,
             date_join=datetime.date.today(),
             status=GroupStatusEnum.ACTIVE,
         )
-        db.add(db_user_group)
+        .on_conflict_do_update(
+            index_elements=[UserGroup.user_id, UserGroup.group_id],
+            set_={"status": GroupStatusEnum.ACTIVE},
+            where=UserGroup.status == GroupStatusEnum.INACTIVE,
+        )
+        .returning(UserGroup.user_id)
+    ).scalar_one_or_none()
+    if joined is not None:
+        add_group_counters(db, group_id, members=1)
 
 
 def read_users_group(db: Session, user_id: int, group_id: int) -> List[AboutUser]:
@@ -359,7 +415,14 @@ def read_users_group(db: Session, user_id: int, group_id: int) -> List[AboutUser
 
 def read_user_groups(db: Session, user_id: int) -> UserGroups:
     db_query = (
-        db.query(User).options(joinedload(User.user_groups)).filter_by(id=user_id).one()
+        db.query(User)
+        .options(
+            selectinload(User.user_groups)
+            .joinedload(UserGroup.group)
+            .joinedload(Group.admin)
+        )
+        .filter_by(id=user_id)
+        .one()
     )
     return db_query
 
@@ -369,7 +432,9 @@ def read_categories_group_detail(
 ) -> List[CategoriesGroupDetail]:
     db_query = (
         db.query(Group)
-        .options(joinedload(Group.categories_group))
+        .options(
+            selectinload(Group.categories_group).joinedload(CategoryGroup.category)
+        )
         .join(UserGroup)
         .filter(
             and_(
@@ -396,53 +461,15 @@ def read_categories_group(db: Session, user_id: int, group_id: int) -> Categorie
         )
     db_query = (
         db.query(Group)
-        .options(joinedload(Group.categories_group))
+        .options(
+            selectinload(Group.categories_group).joinedload(CategoryGroup.category)
+        )
         .filter_by(id=group_id)
         .one()
     )
     return db_query
 
 
-def get_group_expenses_for_month(
-    db: Session,
-    group_id: int,
-    year: date,
-    month: date,
-) -> float:
-    return db.query(
-        coalesce(
-            sum(Expense.amount).filter(
-                and_(
-                    Expense.group_id == group_id,
-                    extract("year", Expense.time) == year,
-                    extract("month", Expense.time) == month,
-                )
-            ),
-            0,
-        )
-    ).one()[0]
-
-
-def get_group_expenses_for_time_range(
-    db: Session,
-    group_id: int,
-    start_date: date,
-    end_date: date,
-) -> float:
-    return db.query(
-        coalesce(
-            sum(Expense.amount).filter(
-                and_(
-                    Expense.group_id == group_id,
-                    Expense.time >= start_date,
-                    Expense.time <= end_date,
-                )
-            ),
-            0,
-        )
-    ).one()[0]
-
-
 def read_group_total_expenses(
     db: Session,
     user_id: int,
@@ -450,6 +477,7 @@ def read_group_total_expenses(
     filter_date: Optional[date] = None,
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
+    wait_for_writes: bool = False,
 ) -> GroupTotalExpenses:
     user_validate_input_date(db, user_id, group_id)
     if filter_date and start_date or filter_date and end_date:
@@ -457,86 +485,34 @@ def read_group_total_expenses(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Too many arguments! It is necessary to select either a month or a start date and an end date!",
         )
-    (amount,) = db.query(
-        coalesce(sum(Expense.amount).filter(Expense.group_id == group_id), 0)
-    ).one()
-    percentage_increase = 0
-
-    if filter_date:
-        year, month = filter_date.year, filter_date.month
-        amount = get_group_expenses_for_month(db, group_id, year, month)
+    if wait_for_writes:
+        wait_for_group_counters(db, group_id)
 
-        filter_date = filter_date - relativedelta(months=1)
-        previous_year, previous_month = filter_date.year, filter_date.month
-        previous_month_amount = get_group_expenses_for_month(
-            db, group_id, previous_year, previous_month
+    def load() -> GroupTotalExpenses:
+        if not (filter_date or start_date and end_date):
+            amount = db.scalar(
+                select(GroupCounter.total_amount).filter_by(group_id=group_id)
+            )
+            return GroupTotalExpenses(amount=amount or 0, percentage_increase=0)
+        amount, percentage_increase = read_period_totals(
+            db,
+            Expense,
+            lambda expenses, *period: sum_amount(
+                expenses.amount, expenses.group_id == group_id, *period
+            ),
+            filter_date=filter_date,
+            start_date=start_date,
+            end_date=end_date,
         )
-
-        if previous_month_amount != 0:
-            percentage_increase = (
-                amount - previous_month_amount
-            ) / previous_month_amount
-
-    elif start_date and end_date:
-        amount = get_group_expenses_for_time_range(db, group_id, start_date, end_date)
-
-        days_difference = (end_date - start_date).days
-        zero_date = start_date - relativedelta(days=days_difference)
-        previous_days_amount = get_group_expenses_for_time_range(
-            db, group_id, zero_date, start_date
+        return GroupTotalExpenses(
+            amount=amount, percentage_increase=percentage_increase
         )
 
-        if previous_days_amount != 0:
-            percentage_increase = (amount - previous_days_amount) / previous_days_amount
-
-    total_expenses = GroupTotalExpenses(
-        amount=amount, percentage_increase=percentage_increase
+    return cache.get_or_load(
+        namespace("group", group_id),
+        f"total-expenses:{filter_date}:{start_date}:{end_date}",
+        load,
     )
-    return total_expenses
-
-
-def get_group_user_expenses_for_month(
-    db: Session,
-    user_id: int,
-    group_id: int,
-    year: date,
-    month: date,
-) -> float:
-    return db.query(
-        coalesce(
-            sum(Expense.amount).filter(
-                and_(
-                    Expense.user_id == user_id,
-                    Expense.group_id == group_id,
-                    extract("year", Expense.time) == year,
-                    extract("month", Expense.time) == month,
-                )
-            ),
-            0,
-        )
-    ).one()[0]
-
-
-def get_group_user_expenses_for_time_range(
-    db: Session,
-    user_id: int,
-    group_id: int,
-    start_date: date,
-    end_date: date,
-) -> float:
-    return db.query(
-        coalesce(
-            sum(Expense.amount).filter(
-                and_(
-                    Expense.user_id == user_id,
-                    Expense.group_id == group_id,
-                    Expense.time >= start_date,
-                    Expense.time <= end_date,
-                )
-            ),
-            0,
-        )
-    ).one()[0]
 
 
 def read_group_user_total_expenses(
@@ -553,45 +529,19 @@ def read_group_user_total_expenses(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Too many arguments! It is necessary to select either a month or a start date and an end date!",
         )
-    (amount,) = db.query(
-        coalesce(
-            sum(Expense.amount).filter(
-                and_(Expense.group_id == group_id, Expense.user_id == user_id)
-            ),
-            0,
-        )
-    ).one()
-    percentage_increase = 0
-
-    if filter_date:
-        year, month = filter_date.year, filter_date.month
-        amount = get_group_user_expenses_for_month(db, user_id, group_id, year, month)
-
-        filter_date = filter_date - relativedelta(months=1)
-        previous_year, previous_month = filter_date.year, filter_date.month
-        previous_month_amount = get_group_user_expenses_for_month(
-            db, user_id, group_id, previous_year, previous_month
-        )
-
-        if previous_month_amount != 0:
-            percentage_increase = (
-                amount - previous_month_amount
-            ) / previous_month_amount
-
-    elif start_date and end_date:
-        amount = get_group_user_expenses_for_time_range(
-            db, user_id, group_id, start_date, end_date
-        )
-
-        days_difference = (end_date - start_date).days
-        zero_date = start_date - relativedelta(days=days_difference)
-        previous_days_amount = get_group_user_expenses_for_time_range(
-            db, user_id, group_id, zero_date, start_date
-        )
-
-        if previous_days_amount != 0:
-            percentage_increase = (amount - previous_days_amount) / previous_days_amount
-
+    amount, percentage_increase = read_period_totals(
+        db,
+        Expense,
+        lambda expenses, *period: sum_amount(
+            expenses.amount,
+            expenses.group_id == group_id,
+            expenses.user_id == user_id,
+            *period,
+        ),
+        filter_date=filter_date,
+        start_date=start_date,
+        end_date=end_date,
+    )
     total_expenses = GroupUserTotalExpenses(
         amount=amount, percentage_increase=percentage_increase
     )
@@ -612,38 +562,37 @@ def read_group_users_spenders(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Too many arguments! It is necessary to select either a month or a start date and an end date!",
         )
+    expenses = period_source(Expense, filter_date, start_date, end_date)
     users_spenders = (
         db.query(
             User.id.label("id"),
             User.first_name.label("first_name"),
             User.last_name.label("last_name"),
             User.picture.label("picture"),
-            func.coalesce(func.sum(Expense.amount), 0).label("amount"),
+            func.coalesce(func.sum(expenses.amount), 0).label("amount"),
         )
         .join(UserGroup, User.id == UserGroup.user_id)
         .outerjoin(
-            Expense,
+            expenses,
             and_(
-                Expense.user_id == User.id,
-                Expense.group_id == group_id,
+                expenses.user_id == User.id,
+                expenses.group_id == group_id,
             ),
         )
         .filter(UserGroup.group_id == group_id)
         .group_by(User.id)
-        .order_by(func.coalesce(func.sum(Expense.amount), 0).desc())
+        .order_by(func.coalesce(func.sum(expenses.amount), 0).desc())
     )
     if filter_date:
         users_spenders = users_spenders.filter(
             and_(
-                extract("year", Expense.time) == filter_date.year,
-                extract("month", Expense.time) == filter_date.month,
+                in_month(expenses.time, filter_date.year, filter_date.month),
             )
         )
     elif start_date and end_date:
         users_spenders = users_spenders.filter(
             and_(
-                Expense.time >= start_date,
-                Expense.time <= end_date,
+                between_dates(expenses.time, start_date, end_date),
             )
         )
     users_spenders = users_spenders.all()
@@ -664,28 +613,27 @@ def read_group_category_expenses(
             detail="Too many arguments! It is necessary to select either a month or a start date and an end date!",
         )
     user_validate_input_date(db, user_id, group_id)
+    expenses = period_source(Expense, filter_date, start_date, end_date)
     categories_expenses_subquery = (
         db.query(
-            Expense.category_id.label("id"),
-            func.coalesce(func.sum(Expense.amount), 0).label("amount"),
+            expenses.category_id.label("id"),
+            func.coalesce(func.sum(expenses.amount), 0).label("amount"),
         )
         .filter(
-            Expense.group_id == group_id,
+            expenses.group_id == group_id,
         )
-        .group_by(Expense.category_id)
+        .group_by(expenses.category_id)
     )
     if filter_date:
         categories_expenses_subquery = categories_expenses_subquery.filter(
             and_(
-                extract("year", Expense.time) == filter_date.year,
-                extract("month", Expense.time) == filter_date.month,
+                in_month(expenses.time, filter_date.year, filter_date.month),
             )
         )
     elif start_date and end_date:
         categories_expenses_subquery = categories_expenses_subquery.filter(
             and_(
-                Expense.time >= start_date,
-                Expense.time <= end_date,
+                between_dates(expenses.time, start_date, end_date),
             ),
         )
     categories_expenses_subquery = categories_expenses_subquery.subquery()
@@ -728,26 +676,25 @@ def read_group_daily_expenses(
             detail="Too many arguments! It is necessary to select either a month or a start date and an end date!",
         )
     user_validate_input_date(db, user_id, group_id)
+    expenses = period_source(Expense, filter_date, start_date, end_date)
     daily_expenses = (
         db.query(
-            func.date(Expense.time).label("date"),
-            func.sum(Expense.amount).label("amount"),
+            date_bucket(expenses.time).label("date"),
+            func.sum(expenses.amount).label("amount"),
         )
-        .filter_by(group_id=group_id)
-        .group_by(func.date(Expense.time))
+        .filter(expenses.group_id == group_id)
+        .group_by(date_bucket(expenses.time))
     )
     if filter_date:
         daily_expenses = daily_expenses.filter(
             and_(
-                extract("year", Expense.time) == filter_date.year,
-                extract("month", Expense.time) == filter_date.month,
+                in_month(expenses.time, filter_date.year, filter_date.month),
             )
         )
     elif start_date and end_date:
         daily_expenses = daily_expenses.filter(
             and_(
-                Expense.time >= start_date,
-                Expense.time <= end_date,
+                between_dates(expenses.time, start_date, end_date),
             )
         )
     daily_expenses = daily_expenses.all()
@@ -771,27 +718,26 @@ def read_group_daily_expenses_detail(
     group_users = (
         db.query(User).join(UserGroup).filter(UserGroup.group_id == group_id).all()
     )
+    expenses = period_source(Expense, filter_date, start_date, end_date)
     possible_dates = (
         db.query(
-            func.date(Expense.time),
-            func.sum(Expense.amount).label("amount"),
+            date_bucket(expenses.time),
+            func.sum(expenses.amount).label("amount"),
         )
-        .filter(Expense.group_id == group_id)
-        .group_by(func.date(Expense.time))
+        .filter(expenses.group_id == group_id)
+        .group_by(date_bucket(expenses.time))
         .distinct()
     )
     if filter_date:
         possible_dates = possible_dates.filter(
             and_(
-                extract("year", Expense.time) == filter_date.year,
-                extract("month", Expense.time) == filter_date.month,
+                in_month(expenses.time, filter_date.year, filter_date.month),
             )
         )
     elif start_date and end_date:
         possible_dates = possible_dates.filter(
             and_(
-                Expense.time >= start_date,
-                Expense.time <= end_date,
+                between_dates(expenses.time, start_date, end_date),
             )
         )
     possible_dates = possible_dates.all()
@@ -804,11 +750,11 @@ def read_group_daily_expenses_detail(
 
         for user in group_users:
             user_expense = (
-                db.query(coalesce(func.sum(Expense.amount), 0).label("amount"))
+                db.query(coalesce(func.sum(expenses.amount), 0).label("amount"))
                 .filter(
-                    Expense.user_id == user.id,
-                    func.date(Expense.time) == date,
-                    Expense.group_id == group_id,
+                    expenses.user_id == user.id,
+                    date_bucket(expenses.time) == date,
+                    expenses.group_id == group_id,
                 )
                 .scalar()
             )
@@ -838,176 +784,67 @@ def read_group_member_info(
             detail="Too many arguments! It is necessary to select either a month or a start date and an end date!",
         )
     group_member_validate_input_data(db, current_user, member_id, group_id)
-    user_info = db.query(User).filter_by(id=member_id).one()
+    expenses = period_source(Expense, filter_date, start_date, end_date)
     if filter_date:
-        total_expenses = read_group_user_total_expenses(
-            db, member_id, group_id, filter_date=filter_date
-        )
-        try:
-            (count_expenses,) = (
-                db.query(count(Expense.id))
-                .filter(
-                    and_(
-                        Expense.group_id == group_id,
-                        Expense.user_id == member_id,
-                        extract("year", Expense.time) == filter_date.year,
-                        extract("month", Expense.time) == filter_date.month,
-                    )
-                )
-                .one()
-            )
-        except:
-            count_expenses = 0
-        try:
-            best_category = (
-                db.query(
-                    Category.id,
-                    Category.title,
-                    CategoryGroup.color_code,
-                    CategoryGroup.icon_url,
-                    func.coalesce(func.sum(Expense.amount), 0).label("amount"),
-                )
-                .join(Category, Category.id == Expense.category_id)
-                .join(
-                    CategoryGroup,
-                    and_(
-                        CategoryGroup.group_id == group_id,
-                        CategoryGroup.category_id == Expense.category_id,
-                    ),
-                )
-                .filter(
-                    and_(
-                        Expense.group_id == group_id,
-                        Expense.user_id == member_id,
-                        extract("year", Expense.time) == filter_date.year,
-                        extract("month", Expense.time) == filter_date.month,
-                    )
-                )
-                .group_by(
-                    Category.id,
-                    Category.title,
-                    CategoryGroup.color_code,
-                    CategoryGroup.icon_url,
-                )
-                .order_by(
-                    func.sum(Expense.amount).desc(),
-                )
-                .limit(1)
-            ).first()
-        except:
-            best_category = None
+        period = in_month(expenses.time, filter_date.year, filter_date.month)
     elif start_date and end_date:
-        total_expenses = read_group_user_total_expenses(
-            db,
+        period = between_dates(expenses.time, start_date, end_date)
+    else:
+        period = true()
+    user_info, total_expenses, (count_expenses,), best_category = fan_out(
+        db,
+        lambda session: session.query(User).filter_by(id=member_id).one(),
+        lambda session: read_group_user_total_expenses(
+            session,
             member_id,
             group_id,
+            filter_date=filter_date,
             start_date=start_date,
             end_date=end_date,
-        )
-        try:
-            (count_expenses,) = (
-                db.query(count(Expense.id))
-                .filter(
-                    and_(
-                        Expense.group_id == group_id,
-                        Expense.user_id == member_id,
-                        Expense.time >= start_date,
-                        Expense.time <= end_date,
-                    )
-                )
-                .one()
+        ),
+        lambda session: session.query(count(expenses.id))
+        .filter(
+            and_(
+                expenses.group_id == group_id,
+                expenses.user_id == member_id,
+                period,
             )
-        except:
-            count_expenses = 0
-        try:
-            best_category = (
-                db.query(
-                    Category.id,
-                    Category.title,
-                    CategoryGroup.color_code,
-                    CategoryGroup.icon_url,
-                    func.coalesce(func.sum(Expense.amount), 0).label("amount"),
-                )
-                .join(Category, Category.id == Expense.category_id)
-                .join(
-                    CategoryGroup,
-                    and_(
-                        CategoryGroup.group_id == group_id,
-                        CategoryGroup.category_id == Expense.category_id,
-                    ),
-                )
-                .filter(
-                    and_(
-                        Expense.group_id == group_id,
-                        Expense.user_id == member_id,
-                        Expense.time >= start_date,
-                        Expense.time <= end_date,
-                    )
-                )
-                .group_by(
-                    Category.id,
-                    Category.title,
-                    CategoryGroup.color_code,
-                    CategoryGroup.icon_url,
-                )
-                .order_by(
-                    func.sum(Expense.amount).desc(),
-                )
-                .limit(1)
-            ).first()
-        except:
-            best_category = None
-    else:
-        total_expenses = read_group_user_total_expenses(db, member_id, group_id)
-        try:
-            (count_expenses,) = (
-                db.query(count(Expense.id))
-                .filter(
-                    and_(
-                        Expense.group_id == group_id,
-                        Expense.user_id == member_id,
-                    )
-                )
-                .one()
+        )
+        .one(),
+        lambda session: session.query(
+            Category.id,
+            Category.title,
+            CategoryGroup.color_code,
+            CategoryGroup.icon_url,
+            func.coalesce(func.sum(expenses.amount), 0).label("amount"),
+        )
+        .join(Category, Category.id == expenses.category_id)
+        .join(
+            CategoryGroup,
+            and_(
+                CategoryGroup.group_id == group_id,
+                CategoryGroup.category_id == expenses.category_id,
+            ),
+        )
+        .filter(
+            and_(
+                expenses.group_id == group_id,
+                expenses.user_id == member_id,
+                period,
             )
-        except:
-            count_expenses = 0
-        try:
-            best_category = (
-                db.query(
-                    Category.id,
-                    Category.title,
-                    CategoryGroup.color_code,
-                    CategoryGroup.icon_url,
-                    func.coalesce(func.sum(Expense.amount), 0).label("amount"),
-                )
-                .join(Category, Category.id == Expense.category_id)
-                .join(
-                    CategoryGroup,
-                    and_(
-                        CategoryGroup.group_id == group_id,
-                        CategoryGroup.category_id == Expense.category_id,
-                    ),
-                )
-                .filter(
-                    and_(
-                        Expense.group_id == group_id,
-                        Expense.user_id == member_id,
-                    )
-                )
-                .group_by(
-                    Category.id,
-                    Category.title,
-                    CategoryGroup.color_code,
-                    CategoryGroup.icon_url,
-                )
-                .order_by(
-                    func.sum(Expense.amount).desc(),
-                )
-                .limit(1)
-            ).first()
-        except:
-            best_category = None
+        )
+        .group_by(
+            Category.id,
+            Category.title,
+            CategoryGroup.color_code,
+            CategoryGroup.icon_url,
+        )
+        .order_by(
+            func.sum(expenses.amount).desc(),
+        )
+        .limit(1)
+        .first(),
+    )
     group_member = GroupMember(
         id=user_info.id,
         login=user_info.login,
@@ -1036,31 +873,30 @@ def read_group_member_category_expenses(
             detail="Too many arguments! It is necessary to select either a month or a start date and an end date!",
         )
     group_member_validate_input_data(db, current_user, member_id, group_id)
+    expenses = period_source(Expense, filter_date, start_date, end_date)
     categories_expenses_subquery = (
         db.query(
-            Expense.category_id.label("id"),
-            func.coalesce(func.sum(Expense.amount), 0).label("amount"),
+            expenses.category_id.label("id"),
+            func.coalesce(func.sum(expenses.amount), 0).label("amount"),
         )
         .filter(
             and_(
-                Expense.group_id == group_id,
-                Expense.user_id == member_id,
+                expenses.group_id == group_id,
+                expenses.user_id == member_id,
             )
         )
-        .group_by(Expense.category_id)
+        .group_by(expenses.category_id)
     )
     if filter_date:
         categories_expenses_subquery = categories_expenses_subquery.filter(
             and_(
-                extract("year", Expense.time) == filter_date.year,
-                extract("month", Expense.time) == filter_date.month,
+                in_month(expenses.time, filter_date.year, filter_date.month),
             )
         )
     elif start_date and end_date:
         categories_expenses_subquery = categories_expenses_subquery.filter(
             and_(
-                Expense.time >= start_date,
-                Expense.time <= end_date,
+                between_dates(expenses.time, start_date, end_date),
             ),
         )
     categories_expenses_subquery = categories_expenses_subquery.subquery()
@@ -1104,33 +940,32 @@ def read_group_member_daily_expenses(
             detail="Too many arguments! It is necessary to select either a month or a start date and an end date!",
         )
     group_member_validate_input_data(db, current_user, member_id, group_id)
+    expenses = period_source(Expense, filter_date, start_date, end_date)
     member_daily_expenses = (
         db.query(
-            func.date(Expense.time).label("date"),
-            func.sum(Expense.amount).label("amount"),
+            date_bucket(expenses.time).label("date"),
+            func.sum(expenses.amount).label("amount"),
         )
         .filter(
             and_(
-                Expense.user_id == member_id,
-                Expense.group_id == group_id,
+                expenses.user_id == member_id,
+                expenses.group_id == group_id,
             )
         )
-        .group_by(func.date(Expense.time))
+        .group_by(date_bucket(expenses.time))
     )
     if filter_date:
         member_daily_expenses = member_daily_expenses.filter(
             and_(
-                extract("year", Expense.time) == filter_date.year,
-                extract("month", Expense.time) == filter_date.month,
+                in_month(expenses.time, filter_date.year, filter_date.month),
             )
         )
     elif start_date and end_date:
         member_daily_expenses = member_daily_expenses.filter(
             and_(
-                Expense.user_id == member_id,
-                Expense.group_id == group_id,
-                Expense.time >= start_date,
-                Expense.time <= end_date,
+                expenses.user_id == member_id,
+                expenses.group_id == group_id,
+                between_dates(expenses.time, start_date, end_date),
             )
         )
     member_daily_expenses = member_daily_expenses.all()
@@ -1152,34 +987,35 @@ def read_group_member_daily_expenses_detail(
             detail="Too many arguments! It is necessary to select either a month or a start date and an end date!",
         )
     group_member_validate_input_data(db, current_user, member_id, group_id)
+    expenses = period_source(Expense, filter_date, start_date, end_date)
     result_structure = (
         db.query(
-            func.date(Expense.time).label("date"),
+            date_bucket(expenses.time).label("date"),
             Category.id.label("category_id"),
             Category.title.label("category_title"),
             CategoryGroup.color_code.label("color_code"),
             CategoryGroup.icon_url.label("icon_url"),
-            func.sum(Expense.amount).label("category_amount"),
+            func.sum(expenses.amount).label("category_amount"),
         )
         .join(
             CategoryGroup,
             and_(
-                CategoryGroup.category_id == Expense.category_id,
-                CategoryGroup.group_id == Expense.group_id,
+                CategoryGroup.category_id == expenses.category_id,
+                CategoryGroup.group_id == expenses.group_id,
             ),
         )
         .join(
             Category,
-            Category.id == Expense.category_id,
+            Category.id == expenses.category_id,
         )
         .filter(
             and_(
-                Expense.user_id == member_id,
-                Expense.group_id == group_id,
+                expenses.user_id == member_id,
+                expenses.group_id == group_id,
             )
         )
         .group_by(
-            func.date(Expense.time),
+            date_bucket(expenses.time),
             Category.id,
             CategoryGroup.color_code,
             CategoryGroup.icon_url,
@@ -1190,15 +1026,13 @@ def read_group_member_daily_expenses_detail(
     if filter_date:
         result_structure = result_structure.filter(
             and_(
-                extract("year", Expense.time) == filter_date.year,
-                extract("month", Expense.time) == filter_date.month,
+                in_month(expenses.time, filter_date.year, filter_date.month),
             )
         )
     elif start_date and end_date:
         result_structure = result_structure.filter(
             and_(
-                Expense.time >= start_date,
-                Expense.time <= end_date,
+                between_dates(expenses.time, start_date, end_date),
             )
         )
 
@@ -1233,15 +1067,17 @@ def read_group_member_history(
     current_user: int,
     group_id: int,
     member_id: int,
+    expenses: Optional[Union[Type[Expense], AliasedClass]] = None,
 ) -> List[GroupHistory]:
     group_member_validate_input_data(db, current_user, member_id, group_id)
+    expenses = expenses or source(Expense)
     member_history = (
         select(
-            Expense.id,
-            Expense.descriptions,
-            Expense.amount,
-            Expense.time,
-            Expense.category_id,
+            expenses.id,
+            expenses.descriptions,
+            expenses.amount,
+            expenses.time,
+            expenses.category_id,
             CategoryGroup.color_code.label("color_code_category"),
             Category.title.label("title_category"),
             User.id.label("user_id"),
@@ -1253,13 +1089,13 @@ def read_group_member_history(
         .join(
             CategoryGroup,
             and_(
-                Expense.category_id == CategoryGroup.category_id,
-                Expense.group_id == CategoryGroup.group_id,
+                expenses.category_id == CategoryGroup.category_id,
+                expenses.group_id == CategoryGroup.group_id,
             ),
         )
-        .join(Category, Expense.category_id == Category.id)
-        .join(User, User.id == Expense.user_id)
-        .filter(and_(Expense.group_id == group_id, Expense.user_id == member_id))
-        .order_by(desc(Expense.time))
+        .join(Category, expenses.category_id == Category.id)
+        .join(User, User.id == expenses.user_id)
+        .filter(and_(expenses.group_id == group_id, expenses.user_id == member_id))
+        .order_by(desc(expenses.time))
     )
     return member_history
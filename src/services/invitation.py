@@ -1,11 +1,14 @@
 import datetime
 from typing import List
 
-from sqlalchemy import and_, exc
-from sqlalchemy.orm import Session
+from sqlalchemy import and_, exc, select
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm.attributes import set_committed_value
 from starlette import status
 from starlette.exceptions import HTTPException
 
+from cache import cache, namespace
+from database.dialect import insert
 from models import (
     Group,
     Invitation,
@@ -22,8 +25,8 @@ def update_invitation_info(db: Session, user_id: int) -> None:
         and_(
             Invitation.recipient_id == user_id,
             Invitation.status == ResponseStatusEnum.PENDING,
-            Invitation.creation_time + datetime.timedelta(hours=24)
-            < datetime.datetime.utcnow(),
+            Invitation.creation_time
+            < datetime.datetime.utcnow() - datetime.timedelta(hours=24),
         )
     ).update({Invitation.status: ResponseStatusEnum.OVERDUE})
     groups = db.query(Group.id).filter_by(status=GroupStatusEnum.INACTIVE)
@@ -65,6 +68,8 @@ def response_invitation(
                 detail="An error occurred while add user in group",
             )
     try:
+        if response == ResponseStatusEnum.ACCEPTED:
+            cache.invalidate(namespace("group", db_invitation.group_id), db)
         db.commit()
     except:
         raise HTTPException(
@@ -79,6 +84,7 @@ def read_invitations(db: Session, user_id: int) -> List[BaseInvitation]:
     update_invitation_info(db, user_id)
     db_invitations = (
         db.query(Invitation)
+        .options(joinedload(Invitation.group).joinedload(Group.admin))
         .filter_by(
             recipient_id=user_id,
             status=ResponseStatusEnum.PENDING,
@@ -91,68 +97,71 @@ def read_invitations(db: Session, user_id: int) -> List[BaseInvitation]:
 def create_invitation(
     db: Session, user_id: int, data: InvitationCreate
 ) -> InvitationModel:
-    try:
-        db_group = db.query(Group).filter_by(admin_id=user_id, id=data.group_id).one()
-    except exc.NoResultFound:
+    checks = db.execute(
+        select(
+            Group,
+            User,
+            select(UserGroup)
+            .filter_by(
+                user_id=data.recipient_id,
+                group_id=data.group_id,
+                status=GroupStatusEnum.ACTIVE,
+            )
+            .exists()
+            .label("recipient_in_group"),
+        )
+        .outerjoin(User, User.id == data.recipient_id)
+        .where(Group.id == data.group_id, Group.admin_id == user_id)
+    ).one_or_none()
+    if checks is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="You are not admin of this group!",
         )
-    if db_group.status == GroupStatusEnum.INACTIVE:
+    if checks.Group.status == GroupStatusEnum.INACTIVE:
         raise HTTPException(
             status_code=status.HTTP_405_METHOD_NOT_ALLOWED,
             detail="The group is inactive",
         )
-    try:
-        db.query(User).filter_by(id=data.recipient_id).one()
-    except exc.NoResultFound:
+    if checks.User is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User is not found!",
         )
-    db_user = (
-        db.query(UserGroup)
-        .filter_by(
-            user_id=data.recipient_id,
-            group_id=data.group_id,
-            status=GroupStatusEnum.ACTIVE,
-        )
-        .one_or_none()
-    )
-    if db_user:
+    if checks.recipient_in_group:
         raise HTTPException(
             status_code=status.HTTP_405_METHOD_NOT_ALLOWED,
             detail="The recipient is already in this group!",
         )
-    db_invitation = (
-        db.query(Invitation)
-        .filter_by(
+    db.query(Invitation).filter(
+        Invitation.recipient_id == data.recipient_id,
+        Invitation.group_id == data.group_id,
+        Invitation.status == ResponseStatusEnum.PENDING,
+        Invitation.creation_time
+        < datetime.datetime.utcnow() - datetime.timedelta(hours=24),
+    ).update({Invitation.status: ResponseStatusEnum.OVERDUE})
+    db_invitation = db.scalars(
+        insert(db, Invitation)
+        .values(
             status=ResponseStatusEnum.PENDING,
+            sender_id=user_id,
             recipient_id=data.recipient_id,
             group_id=data.group_id,
+            creation_time=datetime.datetime.utcnow(),
         )
-        .one_or_none()
-    )
-    if db_invitation:
-        if (
-            db_invitation.creation_time + datetime.timedelta(hours=24)
-            < datetime.datetime.utcnow()
-        ):
-            db_invitation.status = ResponseStatusEnum.OVERDUE
-            db.commit()
-        else:
-            raise HTTPException(
-                status_code=status.HTTP_405_METHOD_NOT_ALLOWED,
-                detail="The invitation has already been sent. Wait for a reply!",
-            )
-    db_invitation = Invitation(
-        status=ResponseStatusEnum.PENDING,
-        sender_id=user_id,
-        recipient_id=data.recipient_id,
-        group_id=data.group_id,
-        creation_time=datetime.datetime.utcnow(),
-    )
-    db.add(db_invitation)
+        .on_conflict_do_nothing(
+            index_elements=[Invitation.recipient_id, Invitation.group_id],
+            index_where=Invitation.status == ResponseStatusEnum.PENDING,
+        )
+        .returning(Invitation)
+    ).one_or_none()
+    if db_invitation is None:
+        raise HTTPException(
+            status_code=status.HTTP_405_METHOD_NOT_ALLOWED,
+            detail="The invitation has already been sent. Wait for a reply!",
+        )
+    set_committed_value(db_invitation, "group", checks.Group)
+    set_committed_value(db_invitation, "recipient", checks.User)
     try:
         db.commit()
     except:
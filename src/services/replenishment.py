@@ -2,12 +2,13 @@ import datetime
 from typing import List, Optional
 
 from pydantic.schema import date
-from sqlalchemy import and_, extract, exc
-from sqlalchemy import select
+from sqlalchemy import and_, exc
+from sqlalchemy import select, update
 from sqlalchemy.orm import Session
 from starlette import status
 from starlette.exceptions import HTTPException
 
+from database.dialect import between_dates, in_month
 from models import Replenishment
 from schemas import (
     ReplenishmentCreate,
@@ -15,6 +16,7 @@ from schemas import (
     ReplenishmentModel,
     UserReplenishment,
 )
+from .archive import period_source, validate_unarchived
 
 
 def create_replenishment(
@@ -38,17 +40,21 @@ def create_replenishment(
 def update_replenishment(
     db: Session, user_id: int, replenishment: ReplenishmentUpdate, replenishment_id: int
 ) -> ReplenishmentModel:
-    try:
-        db.query(Replenishment).filter_by(id=replenishment_id, user_id=user_id).one()
-    except exc.NoResultFound:
+    db_replenishment = db.scalars(
+        update(Replenishment)
+        .where(
+            Replenishment.id == replenishment_id,
+            Replenishment.user_id == user_id,
+        )
+        .values(**replenishment.dict())
+        .returning(Replenishment)
+    ).one_or_none()
+    if db_replenishment is None:
+        validate_unarchived(db, Replenishment, replenishment_id, user_id)
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="It's not your replenishment!",
         )
-    db.query(Replenishment).filter_by(id=replenishment_id).update(
-        values={**replenishment.dict()}
-    )
-    db_replenishment = db.query(Replenishment).filter_by(id=replenishment_id).one()
     try:
         db.commit()
     except:
@@ -64,6 +70,7 @@ def delete_replenishment(db: Session, user_id: int, replenishment_id: int):
     try:
         db.query(Replenishment).filter_by(id=replenishment_id, user_id=user_id).one()
     except exc.NoResultFound:
+        validate_unarchived(db, Replenishment, replenishment_id, user_id)
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="It's not your replenishment!",
@@ -84,15 +91,18 @@ def read_replenishments(
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
 ) -> List[UserReplenishment]:
-    replenishments = select(Replenishment).filter_by(
-        user_id=user_id,
-    )
+    rows = period_source(Replenishment, filter_date, start_date, end_date)
+    replenishments = select(
+        rows.id,
+        rows.amount,
+        rows.descriptions,
+        rows.time,
+    ).where(rows.user_id == user_id)
     if filter_date:
         replenishments = replenishments.filter(
             and_(
-                Replenishment.user_id == user_id,
-                extract("year", Replenishment.time) == filter_date.year,
-                extract("month", Replenishment.time) == filter_date.month,
+                rows.user_id == user_id,
+                in_month(rows.time, filter_date.year, filter_date.month),
             )
         )
     elif start_date and end_date:
@@ -102,8 +112,7 @@ def read_replenishments(
                 detail="The start date cannot be older than the end date!",
             )
         replenishments = replenishments.filter(
-            Replenishment.user_id == user_id,
-            Replenishment.time >= start_date,
-            Replenishment.time <= end_date,
+            rows.user_id == user_id,
+            between_dates(rows.time, start_date, end_date),
         )
-    return replenishments
+    return replenishments.order_by(rows.id)
@@ -0,0 +1,81 @@
+from typing import Iterable, List
+
+from sqlalchemy import Row
+
+from models import Category, CategoryGroup, Expense, Group
+
+
+class ShortGroupRow:
+    __slots__ = ("id", "title", "color_code")
+
+    def __init__(self, id: int, title: str, color_code: str) -> None:
+        self.id = id
+        self.title = title
+        self.color_code = color_code
+
+
+class CategoryRow:
+    __slots__ = ("id", "title")
+
+    def __init__(self, id: int, title: str) -> None:
+        self.id = id
+        self.title = title
+
+
+class CategoryGroupRow:
+    __slots__ = ("group", "category", "color_code", "icon_url")
+
+    def __init__(
+        self,
+        group: ShortGroupRow,
+        category: CategoryRow,
+        color_code: str,
+        icon_url: str,
+    ) -> None:
+        self.group = group
+        self.category = category
+        self.color_code = color_code
+        self.icon_url = icon_url
+
+
+class UserExpenseRow:
+    __slots__ = ("id", "descriptions", "amount", "time", "category_group")
+
+    def __init__(self, row: Row) -> None:
+        self.id = row.id
+        self.descriptions = row.descriptions
+        self.amount = row.amount
+        self.time = row.time
+        self.category_group = CategoryGroupRow(
+            group=ShortGroupRow(row.group_id, row.group_title, row.group_color_code),
+            category=CategoryRow(row.category_id, row.category_title),
+            color_code=row.color_code,
+            icon_url=row.icon_url,
+        )
+
+
+def user_expense_columns(expenses=Expense) -> tuple:
+    return (
+        expenses.id,
+        expenses.descriptions,
+        expenses.amount,
+        expenses.time,
+        expenses.group_id,
+        Group.title.label("group_title"),
+        Group.color_code.label("group_color_code"),
+        expenses.category_id,
+        Category.title.label("category_title"),
+        CategoryGroup.color_code,
+        CategoryGroup.icon_url,
+    )
+
+
+USER_EXPENSE_COLUMNS = user_expense_columns()
+
+
+def to_user_expenses(rows: Iterable[Row]) -> List[UserExpenseRow]:
+    """
+    Maps rows selected with USER_EXPENSE_COLUMNS to the nested shape of
+    the UserExpense schema without building ORM instances.
+    """
+    return [UserExpenseRow(row) for row in rows]
@@ -0,0 +1,128 @@
+import base64
+import binascii
+import datetime
+import json
+from decimal import Decimal
+from typing import Optional, Tuple
+
+from sqlalchemy import literal, null, select, tuple_, union_all
+from sqlalchemy.orm import Session
+from starlette import status
+from starlette.exceptions import HTTPException
+
+from database.dialect import search_words, text_search
+from enums import GroupStatusEnum
+from models import Expense, Replenishment, UserGroup
+from schemas import SearchPage, SearchResult
+from .archive import source
+
+Cursor = Tuple[Decimal, datetime.datetime, str, int]
+
+
+def encode_cursor(row) -> str:
+    key = [str(row.rank), row.time.isoformat(), row.kind, row.id]
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Cursor:
+    try:
+        rank, time, kind, id_ = json.loads(base64.urlsafe_b64decode(cursor))
+        return Decimal(rank), datetime.datetime.fromisoformat(time), kind, int(id_)
+    except (binascii.Error, ArithmeticError, TypeError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="The cursor is invalid!",
+        )
+
+
+def search_history(
+    db: Session,
+    user_id: int,
+    query: str,
+    group_id: Optional[int] = None,
+    category_id: Optional[int] = None,
+    member_id: Optional[int] = None,
+    min_amount: Optional[float] = None,
+    max_amount: Optional[float] = None,
+    cursor: Optional[str] = None,
+    size: int = 20,
+) -> SearchPage:
+    """
+    Finds the expenses in the user's active groups and the user's own
+    replenishments whose descriptions hold every word of `query`, best
+    ranked and newest first. Pages are keyset: `cursor` is the
+    `next_cursor` of the page before.
+    """
+    words = search_words(query)
+    if not words:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="The search query has no words!",
+        )
+    expenses = source(Expense)
+    match, rank = text_search(db, expenses.descriptions, words)
+    expense_rows = select(
+        literal("expense").label("kind"),
+        expenses.id,
+        expenses.descriptions,
+        expenses.amount,
+        expenses.time,
+        expenses.group_id,
+        expenses.category_id,
+        expenses.user_id,
+        rank.label("rank"),
+    ).where(
+        match,
+        expenses.group_id.in_(
+            select(UserGroup.group_id).where(
+                UserGroup.user_id == user_id,
+                UserGroup.status == GroupStatusEnum.ACTIVE,
+            )
+        ),
+    )
+    if group_id is not None:
+        expense_rows = expense_rows.where(expenses.group_id == group_id)
+    if category_id is not None:
+        expense_rows = expense_rows.where(expenses.category_id == category_id)
+    if member_id is not None:
+        expense_rows = expense_rows.where(expenses.user_id == member_id)
+    if min_amount is not None:
+        expense_rows = expense_rows.where(expenses.amount >= min_amount)
+    if max_amount is not None:
+        expense_rows = expense_rows.where(expenses.amount <= max_amount)
+    rows = expense_rows
+    if group_id is None and category_id is None and member_id in (None, user_id):
+        replenishments = source(Replenishment)
+        match, rank = text_search(db, replenishments.descriptions, words)
+        replenishment_rows = select(
+            literal("replenishment"),
+            replenishments.id,
+            replenishments.descriptions,
+            replenishments.amount,
+            replenishments.time,
+            null(),
+            null(),
+            replenishments.user_id,
+            rank,
+        ).where(match, replenishments.user_id == user_id)
+        if min_amount is not None:
+            replenishment_rows = replenishment_rows.where(
+                replenishments.amount >= min_amount
+            )
+        if max_amount is not None:
+            replenishment_rows = replenishment_rows.where(
+                replenishments.amount <= max_amount
+            )
+        rows = union_all(expense_rows, replenishment_rows)
+    results = rows.subquery("results")
+    key = (results.c.rank, results.c.time, results.c.kind, results.c.id)
+    statement = (
+        select(results).order_by(*(column.desc() for column in key)).limit(size + 1)
+    )
+    if cursor is not None:
+        statement = statement.where(tuple_(*key) < decode_cursor(cursor))
+    found = db.execute(statement).all()
+    return SearchPage(
+        items=[SearchResult.from_orm(row) for row in found[:size]],
+        next_cursor=encode_cursor(found[size - 1]) if len(found) > size else None,
+    )
@@ -0,0 +1,59 @@
+from decimal import Decimal
+from typing import Callable, Optional, Tuple, Type, Union
+
+from dateutil.relativedelta import relativedelta
+from pydantic.schema import date
+from sqlalchemy import Select, func, select
+from sqlalchemy.orm import InstrumentedAttribute, Session
+from sqlalchemy.sql.functions import coalesce
+
+from database import select_scalars
+from database.dialect import between_dates, in_month
+from models import Expense, Replenishment
+from .archive import source
+
+Amount = Union[Decimal, float]
+
+
+def sum_amount(amount: InstrumentedAttribute, *conditions) -> Select:
+    return select(coalesce(func.sum(amount), 0)).where(*conditions)
+
+
+def read_period_totals(
+    db: Session,
+    model: Type[Union[Expense, Replenishment]],
+    total: Callable[..., Select],
+    filter_date: Optional[date] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+) -> Tuple[Amount, Amount]:
+    """
+    Returns the `total` of the month of `filter_date` or of the range from
+    `start_date` to `end_date`, and its increase over the period before,
+    in a single round trip. `total` builds the sum query over the rows of
+    `model`, or of `model` and its archive when the periods reach it, for
+    extra conditions on their time.
+    """
+    if filter_date:
+        previous_date = filter_date - relativedelta(months=1)
+        rows = source(model, previous_date.replace(day=1))
+        amount, previous_amount = select_scalars(
+            db,
+            total(rows, in_month(rows.time, filter_date.year, filter_date.month)),
+            total(rows, in_month(rows.time, previous_date.year, previous_date.month)),
+        )
+    elif start_date and end_date:
+        days_difference = (end_date - start_date).days
+        zero_date = start_date - relativedelta(days=days_difference)
+        rows = source(model, zero_date)
+        amount, previous_amount = select_scalars(
+            db,
+            total(rows, between_dates(rows.time, start_date, end_date)),
+            total(rows, between_dates(rows.time, zero_date, start_date)),
+        )
+    else:
+        (amount,) = select_scalars(db, total(source(model)))
+        return amount, 0
+    if previous_amount != 0:
+        return amount, (amount - previous_amount) / previous_amount
+    return amount, 0
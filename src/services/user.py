@@ -1,14 +1,16 @@
-from typing import Optional, Union, List
-from dateutil.relativedelta import relativedelta
+from typing import Optional, List, Type, Union
 
 from starlette import status
 from starlette.exceptions import HTTPException
 from sqlalchemy import select, union, literal, desc, func, outerjoin
 from sqlalchemy.orm import Session
-from sqlalchemy.sql.functions import coalesce, sum
-from sqlalchemy import and_, exc, extract
+from sqlalchemy.orm.util import AliasedClass
+from sqlalchemy import and_, exc
 from pydantic.schema import date
 
+from cache import cache, namespace
+from database import select_scalars
+from database.dialect import between_dates, date_bucket, in_month, insert
 from models import (
     Expense,
     Replenishment,
@@ -16,6 +18,7 @@ from models import (
     CategoryGroup,
     Category,
     Group,
+    UserArchiveTotal,
     UserGroup,
 )
 from schemas import (
@@ -27,21 +30,53 @@ from schemas import (
     UserCategoryExpenses,
     UserGroupExpenses,
 )
+from .archive import period_source, source
+from .totals import read_period_totals, sum_amount
 
 
 def get_user(db: Session, login: str) -> Optional[User]:
-    return db.query(User).filter_by(login=login).one_or_none()
+    user = cache.get_or_load(
+        namespace("user", login),
+        "user",
+        lambda: db.query(User).filter_by(login=login).one_or_none(),
+    )
+    if user is None or user in db:
+        return user
+    return db.merge(user, load=False)
+
+
+def register_user(
+    db: Session, login: str, first_name: str, last_name: str, picture: Optional[str]
+) -> None:
+    if get_user(db, login) is not None:
+        return
+    user_id = db.scalar(
+        insert(db, User)
+        .values(
+            login=login,
+            first_name=first_name,
+            last_name=last_name,
+            picture=picture,
+        )
+        .on_conflict_do_nothing(index_elements=[User.login])
+        .returning(User.id)
+    )
+    if user_id is not None:
+        cache.invalidate(namespace("user", login), db)
 
 
 def read_user_balance(db: Session, user_id: int) -> UserBalance:
-    (replenishments,) = db.query(
-        coalesce(sum(Replenishment.amount).filter(Replenishment.user_id == user_id), 0)
-    ).one()
-    (expenses,) = db.query(
-        coalesce(sum(Expense.amount).filter(Expense.user_id == user_id), 0)
-    ).one()
+    replenishments, expenses, archived = select_scalars(
+        db,
+        sum_amount(Replenishment.amount, Replenishment.user_id == user_id),
+        sum_amount(Expense.amount, Expense.user_id == user_id),
+        sum_amount(
+            UserArchiveTotal.replenishment_amount - UserArchiveTotal.expense_amount,
+            UserArchiveTotal.user_id == user_id,
+        ),
+    )
 
-    user_balance = replenishments - expenses
+    user_balance = replenishments - expenses + archived
     user_balance = UserBalance(balance=user_balance)
     return user_balance
 
@@ -74,26 +109,25 @@ def read_group_expenses(
             detail="You are not in this group!",
         )
     group_info = db.query(Group.id, Group.title).filter_by(id=group_id).one()
+    expenses = period_source(Expense, filter_date, start_date, end_date)
     categories_expenses_subquery = (
         db.query(
-            Expense.category_id.label("id"),
-            func.coalesce(func.sum(Expense.amount), 0).label("amount"),
+            expenses.category_id.label("id"),
+            func.coalesce(func.sum(expenses.amount), 0).label("amount"),
         )
         .filter(
-            Expense.group_id == group_id,
-            Expense.user_id == user_id,
+            expenses.group_id == group_id,
+            expenses.user_id == user_id,
         )
-        .group_by(Expense.category_id)
+        .group_by(expenses.category_id)
     )
     if filter_date:
         categories_expenses_subquery = categories_expenses_subquery.filter(
-            extract("year", Expense.time) == filter_date.year,
-            extract("month", Expense.time) == filter_date.month,
+            in_month(expenses.time, filter_date.year, filter_date.month),
         )
     elif start_date and end_date:
         categories_expenses_subquery = categories_expenses_subquery.filter(
-            Expense.time >= start_date,
-            Expense.time <= end_date,
+            between_dates(expenses.time, start_date, end_date),
         )
     categories_expenses_subquery = categories_expenses_subquery.subquery()
     categories_group = (
@@ -137,40 +171,45 @@ def read_category_expenses(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Too many arguments! It is necessary to select either a month or a start date and an end date!",
         )
+    expenses = period_source(Expense, filter_date, start_date, end_date)
     category_expenses = (
         db.query(
             Category.id.label("id"),
             Category.title.label("title"),
-            func.sum(Expense.amount).label("amount"),
+            func.sum(expenses.amount).label("amount"),
         )
-        .join(Category, Expense.category_id == Category.id)
-        .filter(Expense.user_id == user_id)
+        .join(Category, expenses.category_id == Category.id)
+        .filter(expenses.user_id == user_id)
         .group_by(Category.id, Category.title)
-        .order_by(func.sum(Expense.amount).desc())
+        .order_by(func.sum(expenses.amount).desc())
     )
     if filter_date:
         category_expenses = category_expenses.filter(
-            extract("year", Expense.time) == filter_date.year,
-            extract("month", Expense.time) == filter_date.month,
+            in_month(expenses.time, filter_date.year, filter_date.month),
         )
     elif start_date and end_date:
         category_expenses = category_expenses.filter(
-            Expense.time >= start_date,
-            Expense.time <= end_date,
+            between_dates(expenses.time, start_date, end_date),
         )
     category_expenses = category_expenses.all()
     return category_expenses
 
 
-def read_user_history(user_id: int) -> List[UserHistory]:
+def read_user_history(
+    user_id: int,
+    expenses: Optional[Union[Type[Expense], AliasedClass]] = None,
+    replenishments: Optional[Union[Type[Replenishment], AliasedClass]] = None,
+) -> List[UserHistory]:
+    expenses = expenses or source(Expense)
+    replenishments = replenishments or source(Replenishment)
     history = (
         select(
-            Expense.id,
-            Expense.descriptions,
-            Expense.amount,
-            Expense.time,
-            Expense.category_id,
-            Expense.group_id,
+            expenses.id,
+            expenses.descriptions,
+            expenses.amount,
+            expenses.time,
+            expenses.category_id,
+            expenses.group_id,
             CategoryGroup.color_code.label("color_code_category"),
             Category.title.label("title_category"),
             Group.title.label("title_group"),
@@ -179,28 +218,28 @@ def read_user_history(user_id: int) -> List[UserHistory]:
         .join(
             CategoryGroup,
             and_(
-                Expense.category_id == CategoryGroup.category_id,
-                Expense.group_id == CategoryGroup.group_id,
+                expenses.category_id == CategoryGroup.category_id,
+                expenses.group_id == CategoryGroup.group_id,
             ),
         )
-        .join(Group, Expense.group_id == Group.id)
-        .join(Category, Expense.category_id == Category.id)
-        .filter(Expense.user_id == user_id)
+        .join(Group, expenses.group_id == Group.id)
+        .join(Category, expenses.category_id == Category.id)
+        .filter(expenses.user_id == user_id)
         .union(
             select(
-                Replenishment.id,
-                Replenishment.descriptions,
-                Replenishment.amount,
-                Replenishment.time,
+                replenishments.id,
+                replenishments.descriptions,
+                replenishments.amount,
+                replenishments.time,
                 None,
                 None,
                 None,
                 None,
                 None,
                 None,
-            ).filter(Replenishment.user_id == user_id)
+            ).filter(replenishments.user_id == user_id)
         )
-        .order_by(desc(Replenishment.time))
+        .order_by(desc(replenishments.time))
     )
     return history
 
@@ -217,70 +256,27 @@ def read_user_daily_expenses(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Too many arguments! It is necessary to select either a month or a start date and an end date!",
         )
+    expenses = period_source(Expense, filter_date, start_date, end_date)
     daily_expenses = (
         db.query(
-            func.date(Expense.time).label("date"),
-            func.sum(Expense.amount).label("amount"),
+            date_bucket(expenses.time).label("date"),
+            func.sum(expenses.amount).label("amount"),
         )
-        .filter_by(user_id=user_id)
-        .group_by(func.date(Expense.time))
+        .filter(expenses.user_id == user_id)
+        .group_by(date_bucket(expenses.time))
     )
     if filter_date:
         daily_expenses = daily_expenses.filter(
-            extract("year", Expense.time) == filter_date.year,
-            extract("month", Expense.time) == filter_date.month,
+            in_month(expenses.time, filter_date.year, filter_date.month),
         )
     elif start_date and end_date:
         daily_expenses = daily_expenses.filter(
-            Expense.time >= start_date,
-            Expense.time <= end_date,
+            between_dates(expenses.time, start_date, end_date),
         )
     daily_expenses = daily_expenses.all()
     return daily_expenses
 
 
-def get_total_actions_for_month(
-    db: Session,
-    user_id: int,
-    year: date,
-    month: date,
-    model: Union[Expense, Replenishment],
-) -> float:
-    return db.query(
-        coalesce(
-            sum(model.amount).filter(
-                and_(
-                    model.user_id == user_id,
-                    extract("year", model.time) == year,
-                    extract("month", model.time) == month,
-                )
-            ),
-            0,
-        )
-    ).one()[0]
-
-
-def get_total_actions_for_time_range(
-    db: Session,
-    user_id: int,
-    start_date: date,
-    end_date: date,
-    model: Union[Expense, Replenishment],
-) -> float:
-    return db.query(
-        coalesce(
-            sum(model.amount).filter(
-                and_(
-                    model.user_id == user_id,
-                    model.time >= start_date,
-                    model.time <= end_date,
-                )
-            ),
-            0,
-        )
-    ).one()[0]
-
-
 def read_user_total_expenses(
     db: Session,
     user_id: int,
@@ -293,40 +289,16 @@ def read_user_total_expenses(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Too many arguments! It is necessary to select either a month or a start date and an end date!",
         )
-    (amount,) = db.query(
-        coalesce(sum(Expense.amount).filter(Expense.user_id == user_id), 0)
-    ).one()
-    percentage_increase = 0
-
-    if filter_date:
-        year, month = filter_date.year, filter_date.month
-        amount = get_total_actions_for_month(db, user_id, year, month, Expense)
-
-        filter_date = filter_date - relativedelta(months=1)
-        previous_year, previous_month = filter_date.year, filter_date.month
-        previous_month_amount = get_total_actions_for_month(
-            db, user_id, previous_year, previous_month, Expense
-        )
-
-        if previous_month_amount != 0:
-            percentage_increase = (
-                amount - previous_month_amount
-            ) / previous_month_amount
-
-    elif start_date and end_date:
-        amount = get_total_actions_for_time_range(
-            db, user_id, start_date, end_date, Expense
-        )
-
-        days_difference = (end_date - start_date).days
-        zero_date = start_date - relativedelta(days=days_difference)
-        previous_days_amount = get_total_actions_for_time_range(
-            db, user_id, zero_date, start_date, Expense
-        )
-
-        if previous_days_amount != 0:
-            percentage_increase = (amount - previous_days_amount) / previous_days_amount
-
+    amount, percentage_increase = read_period_totals(
+        db,
+        Expense,
+        lambda expenses, *period: sum_amount(
+            expenses.amount, expenses.user_id == user_id, *period
+        ),
+        filter_date=filter_date,
+        start_date=start_date,
+        end_date=end_date,
+    )
     total_expenses = UserTotalExpenses(
         amount=amount, percentage_increase=percentage_increase
     )
@@ -345,40 +317,16 @@ def read_user_total_replenishments(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Too many arguments! It is necessary to select either a month or a start date and an end date!",
         )
-    (amount,) = db.query(
-        coalesce(sum(Replenishment.amount).filter(Replenishment.user_id == user_id), 0)
-    ).one()
-    percentage_increase = 0
-
-    if filter_date:
-        year, month = filter_date.year, filter_date.month
-        amount = get_total_actions_for_month(db, user_id, year, month, Replenishment)
-
-        filter_date = filter_date - relativedelta(months=1)
-        previous_year, previous_month = filter_date.year, filter_date.month
-        previous_month_amount = get_total_actions_for_month(
-            db, user_id, previous_year, previous_month, Replenishment
-        )
-
-        if previous_month_amount != 0:
-            percentage_increase = (
-                amount - previous_month_amount
-            ) / previous_month_amount
-
-    elif start_date and end_date:
-        amount = get_total_actions_for_time_range(
-            db, user_id, start_date, end_date, Replenishment
-        )
-
-        days_difference = (end_date - start_date).days
-        zero_date = start_date - relativedelta(days=days_difference)
-        previous_days_amount = get_total_actions_for_time_range(
-            db, user_id, zero_date, start_date, Replenishment
-        )
-
-        if previous_days_amount != 0:
-            percentage_increase = (amount - previous_days_amount) / previous_days_amount
-
+    amount, percentage_increase = read_period_totals(
+        db,
+        Replenishment,
+        lambda replenishments, *period: sum_amount(
+            replenishments.amount, replenishments.user_id == user_id, *period
+        ),
+        filter_date=filter_date,
+        start_date=start_date,
+        end_date=end_date,
+    )
     total_replenishments = UserTotalReplenishments(
         amount=amount, percentage_increase=percentage_increase
     )
@@ -1,18 +1,25 @@
 import asyncio
 import datetime
+from contextlib import contextmanager
 
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.orm import Session, sessionmaker
 from sqlalchemy_utils import create_database, database_exists, drop_database
 
 from config import settings
-from database import Base, get_db
+from database import Base, engine_options, get_db
 from main import app as main_app
 
-engine = create_engine(settings.SQLALCHEMY_DATABASE_URI)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+engine = create_engine(
+    settings.SQLALCHEMY_DATABASE_URI,
+    **engine_options(settings.SQLALCHEMY_DATABASE_URI),
+)
+SessionLocal = sessionmaker(
+    autocommit=False, autoflush=False, expire_on_commit=False, bind=engine
+)
 
 from tests.factories import (
     UserFactory,
@@ -68,6 +75,9 @@ def session():
 
 @pytest.fixture(scope="session", autouse=True)
 def create_test_database():
+    if engine.url.database in (None, "", ":memory:"):
+        yield
+        return
     if not "test" in settings.SQLALCHEMY_DATABASE_URI:
         raise ValueError("Please connect the test database!")
     try:
@@ -81,6 +91,52 @@ def create_test_database():
 
 client = TestClient(main_app)
 
+postgres_only = pytest.mark.skipif(
+    engine.dialect.name != "postgresql", reason="requires PostgreSQL"
+)
+
+
+@contextmanager
+def assert_max_queries(max_queries: int):
+    statements = []
+
+    def count_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "after_cursor_execute", count_statement)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "after_cursor_execute", count_statement)
+    queries = "\n".join(statements)
+    assert (
+        len(statements) <= max_queries
+    ), f"Expected at most {max_queries} queries, got {len(statements)}:\n{queries}"
+
+
+@contextmanager
+def forbid_lazy_loads():
+    """
+    Makes any relationship lazy load raise, so an N+1 introduced on the
+    code under the block fails the test instead of going unnoticed.
+    """
+
+    def check_lazy_load(orm_execute_state):
+        if not orm_execute_state.is_select:
+            return
+        state = orm_execute_state.lazy_loaded_from
+        if state is not None:
+            raise InvalidRequestError(
+                f"Lazy load from {state.class_.__name__} "
+                f"via {orm_execute_state.loader_strategy_path}"
+            )
+
+    event.listen(Session, "do_orm_execute", check_lazy_load)
+    try:
+        yield
+    finally:
+        event.remove(Session, "do_orm_execute", check_lazy_load)
+
 
 def async_return(result):
     as_res = asyncio.Future()
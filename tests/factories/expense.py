@@ -1,17 +1,18 @@
 import datetime
 
 import factory
-from factory.fuzzy import FuzzyFloat
+from factory.fuzzy import FuzzyDecimal
 
 from models import Expense
 
+from services.counters import add_group_counters
 from .base_factory import BaseFactory
 
 
 class ExpenseFactory(BaseFactory):
     id = factory.Sequence(lambda n: n)
     descriptions = factory.Faker("word")
-    amount = FuzzyFloat(50.0, 1000.0)
+    amount = FuzzyDecimal(50, 1000)
     time = datetime.datetime.utcnow()
     user_id = factory.Faker("id")
     group_id = factory.Faker("id")
@@ -19,3 +20,13 @@ class ExpenseFactory(BaseFactory):
 
     class Meta:
         model = Expense
+
+    @factory.post_generation
+    def counters(obj, create, extracted, **kwargs):
+        if create:
+            add_group_counters(
+                ExpenseFactory._meta.sqlalchemy_session,
+                obj.group_id,
+                expenses=1,
+                amount=obj.amount,
+            )
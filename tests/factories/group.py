@@ -5,6 +5,7 @@ import factory
 from models import Group, UserGroup
 from enums import GroupStatusEnum
 
+from services.counters import add_group_counters
 from .base_factory import BaseFactory
 
 
@@ -29,3 +30,10 @@ class UserGroupFactory(BaseFactory):
 
     class Meta:
         model = UserGroup
+
+    @factory.post_generation
+    def counters(obj, create, extracted, **kwargs):
+        if create and obj.status == GroupStatusEnum.ACTIVE:
+            add_group_counters(
+                UserGroupFactory._meta.sqlalchemy_session, obj.group_id, members=1
+            )
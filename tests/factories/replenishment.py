@@ -1,7 +1,7 @@
 import datetime
 
 import factory
-from factory.fuzzy import FuzzyFloat
+from factory.fuzzy import FuzzyDecimal
 
 from models import Replenishment
 
@@ -11,7 +11,7 @@ from .base_factory import BaseFactory
 class ReplenishmentFactory(BaseFactory):
     id = factory.Sequence(lambda n: n)
     descriptions = factory.Faker("word")
-    amount = FuzzyFloat(50.0, 1000.0)
+    amount = FuzzyDecimal(50, 1000)
     time = datetime.datetime.utcnow()
     user_id = factory.Faker("id")
 
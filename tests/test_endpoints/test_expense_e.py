@@ -623,3 +623,32 @@ class ExpensesTestCase(unittest.TestCase):
             params={"start_date": "2022-12-31", "end_date": "2022-12-09"},
         )
         assert data.status_code == 404
+
+    def test_read_expenses_by_group_filters(self) -> None:
+        expenses = [
+            ExpenseFactory(
+                user_id=self.user.id,
+                group_id=self.first_group.id,
+                category_id=self.category.id,
+                amount=amount,
+            )
+            for amount in (5, 50, 20, 500)
+        ]
+        data = client.get(
+            f"/groups/{self.first_group.id}/expenses/",
+            params={
+                "category_id": self.category.id,
+                "min_amount": 10,
+                "max_amount": 100,
+                "sort_by": "amount",
+            },
+        )
+        assert data.status_code == 200
+        assert [item["id"] for item in data.json()["items"]] == [
+            expenses[1].id,
+            expenses[2].id,
+        ]
+        data = client.get(
+            f"/groups/{self.first_group.id}/expenses/", params={"sort_by": "size"}
+        )
+        assert data.status_code == 422
@@ -0,0 +1,93 @@
+import threading
+import unittest
+from unittest.mock import Mock, patch
+
+from config import settings
+from dependencies import oauth
+from observability import metrics
+from observability.services import ServiceStats
+from tests.conftest import async_return, client
+from tests.factories import GroupFactory, UserFactory, UserGroupFactory
+
+
+def read_sample(text: str, sample: str) -> float:
+    for line in text.splitlines():
+        if line.startswith(sample + " "):
+            return float(line.rsplit(" ", 1)[1])
+    raise AssertionError(f"{sample} is not exported")
+
+
+class MetricsTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.user = UserFactory()
+        self.user_dict = {
+            "userinfo": {
+                "email": self.user.login,
+                "given_name": self.user.first_name,
+                "family_name": self.user.last_name,
+                "picture": self.user.picture,
+            }
+        }
+        oauth.google.authorize_access_token = Mock(
+            return_value=async_return(self.user_dict)
+        )
+        client.get("/auth/")
+        self.group = GroupFactory(admin_id=self.user.id)
+        UserGroupFactory(user_id=self.user.id, group_id=self.group.id)
+        token = patch.object(settings, "METRICS_TOKEN", "metrics-token")
+        token.start()
+        self.addCleanup(token.stop)
+        self.headers = {"Authorization": "Bearer metrics-token"}
+
+    def test_read_metrics(self) -> None:
+        sample = 'http_requests_total{method="GET",route="/groups/{group_id}/info/"}'
+        before = read_sample(client.get("/metrics", headers=self.headers).text, sample)
+        client.get(f"/groups/{self.group.id}/info/")
+        client.get(f"/groups/{self.group.id}/info/")
+        data = client.get("/metrics", headers=self.headers)
+        assert data.status_code == 200
+        assert data.headers["content-type"].startswith("text/plain")
+        assert read_sample(data.text, sample) == before + 2
+        assert (
+            read_sample(
+                data.text,
+                'http_request_duration_seconds_count{method="GET",'
+                'route="/groups/{group_id}/info/"}',
+            )
+            == before + 2
+        )
+        assert read_sample(data.text, "http_requests_in_flight") == 1
+        assert read_sample(data.text, "threadpool_tokens") > 0
+        assert (
+            read_sample(
+                data.text, 'db_service_statements_total{service="read_group_info"}'
+            )
+            > 0
+        )
+        assert "db_pool_wait_seconds_count" in data.text
+
+    def test_unmatched_route(self) -> None:
+        client.get("/not-found/")
+        assert metrics.unmatched.latency.count > 0
+
+    def test_metrics_need_the_token(self) -> None:
+        assert client.get("/metrics").status_code == 401
+        wrong = {"Authorization": "Bearer other-token"}
+        assert client.get("/metrics", headers=wrong).status_code == 401
+        with patch.object(settings, "METRICS_TOKEN", None):
+            assert client.get("/metrics", headers=self.headers).status_code == 404
+
+    def test_service_stats_from_threads(self) -> None:
+        stats = ServiceStats("service")
+
+        def record() -> None:
+            for _ in range(10_000):
+                stats.record(0.5)
+
+        threads = [threading.Thread(target=record) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert stats.statements == 40_000
+        assert stats.db_time == 20_000
@@ -0,0 +1,78 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import Mock
+
+from fastapi.testclient import TestClient
+
+from dependencies import oauth
+from main import app as main_app
+from observability import ProfileStore, ProfilingMiddleware
+from tests.conftest import async_return
+from tests.factories import GroupFactory, UserFactory, UserGroupFactory
+
+
+class ProfilingTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.profile_dir = tempfile.TemporaryDirectory()
+        self.client = TestClient(
+            ProfilingMiddleware(
+                main_app,
+                store=ProfileStore(self.profile_dir.name),
+                token="secret",
+                interval_ms=0.5,
+            )
+        )
+        self.user = UserFactory()
+        self.user_dict = {
+            "userinfo": {
+                "email": self.user.login,
+                "given_name": self.user.first_name,
+                "family_name": self.user.last_name,
+                "picture": self.user.picture,
+            }
+        }
+        oauth.google.authorize_access_token = Mock(
+            return_value=async_return(self.user_dict)
+        )
+        self.client.get("/auth/")
+        self.group = GroupFactory(admin_id=self.user.id)
+        UserGroupFactory(user_id=self.user.id, group_id=self.group.id)
+
+    def tearDown(self) -> None:
+        self.profile_dir.cleanup()
+
+    def test_profile_request(self) -> None:
+        data = self.client.get(
+            f"/groups/{self.group.id}/info/", headers={"X-Profile": "secret"}
+        )
+        assert data.status_code == 200
+        profile_id = data.headers["x-profile-id"]
+        phases = dict(
+            phase.split("=") for phase in data.headers["x-profile-phases"].split(";")
+        )
+        assert set(phases) == {"auth", "db", "service", "serialization"}
+        assert float(phases["auth"]) > 0
+        assert float(phases["db"]) > 0
+
+        with open(os.path.join(self.profile_dir.name, f"{profile_id}.json")) as file:
+            summary = json.load(file)
+        assert summary["route"] == "/groups/{group_id}/info/"
+        assert summary["phases_ms"].keys() == phases.keys()
+        with open(os.path.join(self.profile_dir.name, f"{profile_id}.folded")) as file:
+            for line in file:
+                stack, count = line.rsplit(" ", 1)
+                assert int(count) > 0
+                assert stack
+
+    def test_skip_request_without_token(self) -> None:
+        data = self.client.get(
+            f"/groups/{self.group.id}/info/", headers={"X-Profile": "wrong"}
+        )
+        assert data.status_code == 200
+        assert "x-profile-id" not in data.headers
+        data = self.client.get(f"/groups/{self.group.id}/info/")
+        assert data.status_code == 200
+        assert "x-profile-id" not in data.headers
+        assert os.listdir(self.profile_dir.name) == []
@@ -0,0 +1,245 @@
+import unittest
+from unittest.mock import Mock, patch
+
+from config import settings
+from dependencies import oauth
+from tests.conftest import (
+    assert_max_queries,
+    async_return,
+    client,
+    forbid_lazy_loads,
+)
+from tests.factories import (
+    CategoryFactory,
+    CategoryGroupFactory,
+    ExpenseFactory,
+    GroupFactory,
+    InvitationFactory,
+    UserFactory,
+    UserGroupFactory,
+)
+
+
+class QueryStatsTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.user = UserFactory()
+        self.user_dict = {
+            "userinfo": {
+                "email": self.user.login,
+                "given_name": self.user.first_name,
+                "family_name": self.user.last_name,
+                "picture": self.user.picture,
+            }
+        }
+        oauth.google.authorize_access_token = Mock(
+            return_value=async_return(self.user_dict)
+        )
+        client.get("/auth/")
+        self.second_user = UserFactory()
+        self.group = GroupFactory(admin_id=self.user.id)
+        UserGroupFactory(user_id=self.user.id, group_id=self.group.id)
+        UserGroupFactory(user_id=self.second_user.id, group_id=self.group.id)
+        self.categories = [CategoryFactory() for _ in range(3)]
+        for category in self.categories:
+            CategoryGroupFactory(category_id=category.id, group_id=self.group.id)
+            ExpenseFactory(
+                user_id=self.user.id,
+                group_id=self.group.id,
+                category_id=category.id,
+            )
+            ExpenseFactory(
+                user_id=self.second_user.id,
+                group_id=self.group.id,
+                category_id=category.id,
+            )
+
+    def test_debug_headers(self) -> None:
+        with patch.object(settings, "DEBUG_QUERY_HEADERS", True):
+            data = client.get(f"/groups/{self.group.id}/info/")
+        assert data.status_code == 200
+        assert int(data.headers["x-db-query-count"]) > 0
+        assert float(data.headers["x-db-time-ms"]) >= 0
+
+    def test_debug_headers_disabled(self) -> None:
+        data = client.get(f"/groups/{self.group.id}/info/")
+        assert "x-db-query-count" not in data.headers
+        assert "x-db-time-ms" not in data.headers
+
+    def test_read_expenses_queries(self) -> None:
+        with assert_max_queries(3):
+            data = client.get("/groups/expenses/")
+        assert data.status_code == 200
+
+    def test_read_user_groups_queries(self) -> None:
+        with assert_max_queries(3), forbid_lazy_loads():
+            data = client.get("/groups/")
+        assert data.status_code == 200
+
+    def test_read_categories_group_queries(self) -> None:
+        with assert_max_queries(5), forbid_lazy_loads():
+            data = client.get(f"/groups/{self.group.id}/categories/")
+        assert data.status_code == 200
+
+    def test_read_categories_group_detail_queries(self) -> None:
+        second_group = GroupFactory(admin_id=self.user.id)
+        UserGroupFactory(user_id=self.user.id, group_id=second_group.id)
+        for category in self.categories:
+            CategoryGroupFactory(category_id=category.id, group_id=second_group.id)
+        with assert_max_queries(3), forbid_lazy_loads():
+            data = client.get("/groups/categories/")
+        assert data.status_code == 200
+        assert len(data.json()) == 2
+
+    def test_read_invitations_queries(self) -> None:
+        for _ in range(3):
+            group = GroupFactory(admin_id=self.second_user.id)
+            InvitationFactory(
+                sender_id=self.second_user.id,
+                recipient_id=self.user.id,
+                group_id=group.id,
+            )
+        with assert_max_queries(4), forbid_lazy_loads():
+            data = client.get("/invitations/")
+        assert data.status_code == 200
+        assert len(data.json()) == 3
+
+    def test_read_total_expenses_queries(self) -> None:
+        with assert_max_queries(2):
+            data = client.get("/users/total-expenses/?year_month=2023-01")
+        assert data.status_code == 200
+        with assert_max_queries(3):
+            data = client.get(
+                f"/groups/{self.group.id}/total-expenses/?year_month=2023-01"
+            )
+        assert data.status_code == 200
+
+    def test_read_group_info_queries(self) -> None:
+        with assert_max_queries(3):
+            data = client.get(f"/groups/{self.group.id}/info/")
+        assert data.status_code == 200
+
+    def test_read_user_balance_queries(self) -> None:
+        with assert_max_queries(2):
+            data = client.get("/users/user-balance/")
+        assert data.status_code == 200
+
+    def test_read_group_daily_expenses_detail_queries(self) -> None:
+        with assert_max_queries(7):
+            data = client.get(f"/groups/{self.group.id}/group-daily-expenses-detail/")
+        assert data.status_code == 200
+
+
+class WriteQueriesTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.user = UserFactory()
+        self.user_dict = {
+            "userinfo": {
+                "email": self.user.login,
+                "given_name": self.user.first_name,
+                "family_name": self.user.last_name,
+                "picture": self.user.picture,
+            }
+        }
+        oauth.google.authorize_access_token = Mock(
+            return_value=async_return(self.user_dict)
+        )
+        client.get("/auth/")
+        self.group_id = GroupFactory(admin_id=self.user.id).id
+        UserGroupFactory(user_id=self.user.id, group_id=self.group_id)
+        self.category_ids = [CategoryFactory().id for _ in range(2)]
+        for category_id in self.category_ids:
+            CategoryGroupFactory(category_id=category_id, group_id=self.group_id)
+
+    def test_create_expense_queries(self) -> None:
+        with assert_max_queries(6):
+            data = client.post(
+                f"/groups/{self.group_id}/expenses/",
+                json={
+                    "descriptions": "descriptions",
+                    "amount": 10,
+                    "category_id": self.category_ids[0],
+                },
+            )
+        assert data.status_code == 200
+        assert data.json()["category_group"]["group"]["id"] == self.group_id
+
+    def test_update_expense_queries(self) -> None:
+        expense_id = client.post(
+            f"/groups/{self.group_id}/expenses/",
+            json={
+                "descriptions": "descriptions",
+                "amount": 10,
+                "category_id": self.category_ids[0],
+            },
+        ).json()["id"]
+        with assert_max_queries(5):
+            data = client.put(
+                f"/groups/{self.group_id}/expenses/{expense_id}/",
+                json={
+                    "descriptions": "descriptions",
+                    "amount": 20,
+                    "category_id": self.category_ids[1],
+                    "group_id": self.group_id,
+                    "time": "2023-01-01T00:00:00",
+                },
+            )
+        assert data.status_code == 200
+        assert data.json()["category_group"]["category"]["id"] == self.category_ids[1]
+
+    def test_update_replenishment_queries(self) -> None:
+        replenishment_id = client.post(
+            "/replenishments/", json={"amount": 10, "descriptions": "descriptions"}
+        ).json()["id"]
+        with assert_max_queries(2):
+            data = client.put(
+                f"/replenishments/{replenishment_id}/",
+                json={
+                    "amount": 20,
+                    "descriptions": "descriptions",
+                    "time": "2023-01-01T00:00:00",
+                },
+            )
+        assert data.status_code == 200
+        assert data.json()["user"]["id"] == self.user.id
+
+    def test_update_group_queries(self) -> None:
+        with assert_max_queries(2):
+            data = client.put(
+                f"/groups/{self.group_id}/",
+                json={
+                    "title": "title",
+                    "description": "description",
+                    "icon_url": "icon_url",
+                    "color_code": "color_code",
+                },
+            )
+        assert data.status_code == 200
+        assert data.json()["admin"]["id"] == self.user.id
+
+    def test_update_category_queries(self) -> None:
+        with assert_max_queries(3):
+            data = client.put(
+                f"/groups/{self.group_id}/categories/{self.category_ids[0]}",
+                json={"icon_url": "icon_url", "color_code": "color_code"},
+            )
+        assert data.status_code == 200
+        assert data.json()["id"] == self.category_ids[0]
+
+    def test_create_category_queries(self) -> None:
+        with assert_max_queries(4):
+            data = client.post(
+                f"/groups/{self.group_id}/categories/",
+                json={"title": "Title", "icon_url": "icon_url", "color_code": "color"},
+            )
+        assert data.status_code == 200
+        assert data.json()["title"] == "title"
+
+    def test_create_invitation_queries(self) -> None:
+        recipient_id = UserFactory().id
+        with assert_max_queries(4), forbid_lazy_loads():
+            data = client.post(
+                "/invitations/",
+                json={"group_id": self.group_id, "recipient_id": recipient_id},
+            )
+        assert data.status_code == 200
+        assert data.json()["recipient"]["id"] == recipient_id
@@ -0,0 +1,78 @@
+import datetime
+import unittest
+from unittest.mock import Mock
+
+import msgpack
+
+from dependencies import oauth
+from responses import wants_msgpack
+from tests.conftest import async_return, client
+from tests.factories import (
+    CategoryFactory,
+    CategoryGroupFactory,
+    ExpenseFactory,
+    GroupFactory,
+    ReplenishmentFactory,
+    UserFactory,
+    UserGroupFactory,
+)
+
+
+class ResponsesTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.user = UserFactory()
+        self.user_dict = {
+            "userinfo": {
+                "email": self.user.login,
+                "given_name": self.user.first_name,
+                "family_name": self.user.last_name,
+                "picture": self.user.picture,
+            }
+        }
+        oauth.google.authorize_access_token = Mock(
+            return_value=async_return(self.user_dict)
+        )
+        client.get("/auth/")
+        group = GroupFactory(admin_id=self.user.id)
+        UserGroupFactory(user_id=self.user.id, group_id=group.id)
+        category = CategoryFactory()
+        CategoryGroupFactory(category_id=category.id, group_id=group.id)
+        for day in range(1, 4):
+            ExpenseFactory(
+                user_id=self.user.id,
+                group_id=group.id,
+                category_id=category.id,
+                time=datetime.datetime(2022, 12, day),
+            )
+        ReplenishmentFactory(user_id=self.user.id)
+
+    def test_json_by_default(self) -> None:
+        data = client.get("/users/history/")
+        assert data.status_code == 200
+        assert data.headers["content-type"] == "application/json"
+        assert "Accept" in data.headers["vary"]
+        assert data.json()["total"] == 4
+
+    def test_msgpack(self) -> None:
+        json_data = client.get("/users/history/").json()
+        data = client.get("/users/history/", headers={"Accept": "application/msgpack"})
+        assert data.status_code == 200
+        assert data.headers["content-type"] == "application/msgpack"
+        assert msgpack.unpackb(data.content) == json_data
+
+    def test_errors_stay_json(self) -> None:
+        data = client.get(
+            "/groups/1000000/info/", headers={"Accept": "application/msgpack"}
+        )
+        assert data.status_code == 404
+        assert data.json() == {"detail": "You are not in this group!"}
+
+
+def test_wants_msgpack() -> None:
+    assert not wants_msgpack(None)
+    assert not wants_msgpack("*/*")
+    assert not wants_msgpack("application/json, application/msgpack")
+    assert wants_msgpack("application/msgpack, application/json")
+    assert wants_msgpack("application/x-msgpack")
+    assert wants_msgpack("application/json;q=0.5, application/msgpack")
+    assert not wants_msgpack("application/msgpack;q=0, */*")
@@ -0,0 +1,163 @@
+import itertools
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import Mock, patch
+
+from sqlalchemy import event, text
+
+from config import settings
+from database.database import make_engine
+from dependencies import oauth
+from observability import SlowQueryLog
+from tests.conftest import async_return, client, engine, postgres_only
+from tests.factories import GroupFactory, UserFactory, UserGroupFactory
+
+
+def parameter_values(parameters) -> list:
+    if isinstance(parameters, dict):
+        return list(parameters.values())
+    return list(parameters)
+
+
+class SlowQueriesTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.user = UserFactory()
+        self.user_dict = {
+            "userinfo": {
+                "email": self.user.login,
+                "given_name": self.user.first_name,
+                "family_name": self.user.last_name,
+                "picture": self.user.picture,
+            }
+        }
+        oauth.google.authorize_access_token = Mock(
+            return_value=async_return(self.user_dict)
+        )
+        client.get("/auth/")
+        self.group = GroupFactory(admin_id=self.user.id)
+        UserGroupFactory(user_id=self.user.id, group_id=self.group.id)
+        self.log_dir = tempfile.TemporaryDirectory()
+        self.log_file = os.path.join(self.log_dir.name, "slow_queries.log")
+
+    def tearDown(self) -> None:
+        self.log_dir.cleanup()
+
+    def read_entries(self) -> list:
+        with open(self.log_file) as log_file:
+            return [json.loads(line) for line in log_file]
+
+    def test_log_slow_queries(self) -> None:
+        slow_query_log = SlowQueryLog(threshold_ms=0, log_file=self.log_file)
+        slow_query_log.attach(engine)
+        try:
+            data = client.get(f"/groups/{self.group.id}/info/")
+        finally:
+            slow_query_log.detach()
+        assert data.status_code == 200
+        entries = [
+            entry for entry in self.read_entries() if entry["service"] is not None
+        ]
+        assert entries
+        for entry in entries:
+            assert entry["route"] == "/groups/{group_id}/info/"
+            assert entry["service"] == "read_group_info"
+            assert entry["caller"].startswith("services.group.")
+            assert entry["duration_ms"] >= 0
+            assert "plan" not in entry
+        assert any(
+            self.group.id in parameter_values(entry["parameters"]) for entry in entries
+        )
+
+    @postgres_only
+    def test_log_slow_queries_with_explain(self) -> None:
+        slow_query_log = SlowQueryLog(
+            threshold_ms=0, log_file=self.log_file, explain=True
+        )
+        slow_query_log.attach(engine)
+        try:
+            data = client.get(f"/groups/{self.group.id}/info/")
+        finally:
+            slow_query_log.detach()
+        assert data.status_code == 200
+        plans = [entry["plan"] for entry in self.read_entries() if entry["plan"]]
+        assert plans
+        assert all("actual time" in plan for plan in plans)
+
+    def test_one_entry_per_statement_across_engines(self) -> None:
+        slow_query_log = SlowQueryLog(threshold_ms=0, log_file=self.log_file)
+        with patch("database.database.slow_query_log", slow_query_log):
+            primary = make_engine(settings.SQLALCHEMY_DATABASE_URI)
+            replica = make_engine(settings.SQLALCHEMY_DATABASE_URI)
+        try:
+            with replica.connect() as connection:
+                connection.execute(text("select 1"))
+        finally:
+            slow_query_log.detach()
+            primary.dispose()
+            replica.dispose()
+        statements = [entry["statement"] for entry in self.read_entries()]
+        assert statements == ["select 1"]
+
+    def test_threshold_and_sampling(self) -> None:
+        slow_query_log = SlowQueryLog(
+            threshold_ms=0, log_file=self.log_file, sample_rate=0
+        )
+        slow_query_log.attach(engine)
+        try:
+            client.get(f"/groups/{self.group.id}/info/")
+        finally:
+            slow_query_log.detach()
+        assert self.read_entries() == []
+
+    def test_threshold_exceeded_and_sampled(self) -> None:
+        statements = []
+        count = lambda *args: statements.append(args[2])
+        slow_query_log = SlowQueryLog(
+            threshold_ms=0, log_file=self.log_file, sample_rate=0.5
+        )
+        slow_query_log.attach(engine)
+        event.listen(engine, "after_cursor_execute", count)
+        try:
+            with patch(
+                "observability.slow_queries.random.random",
+                side_effect=itertools.cycle([0.2, 0.8]),
+            ):
+                client.get(f"/groups/{self.group.id}/info/")
+        finally:
+            event.remove(engine, "after_cursor_execute", count)
+            slow_query_log.detach()
+        entries = self.read_entries()
+        assert statements
+        assert [entry["statement"] for entry in entries] == statements[::2]
+
+    def test_statements_under_threshold_are_skipped(self) -> None:
+        slow_query_log = SlowQueryLog(threshold_ms=60_000, log_file=self.log_file)
+        slow_query_log.attach(engine)
+        try:
+            client.get(f"/groups/{self.group.id}/info/")
+        finally:
+            slow_query_log.detach()
+        assert self.read_entries() == []
+
+    @postgres_only
+    def test_explain_does_not_rerun_side_effects(self) -> None:
+        slow_query_log = SlowQueryLog(
+            threshold_ms=0, log_file=self.log_file, explain=True
+        )
+        with engine.connect() as connection:
+            plain = slow_query_log.explain_statement(
+                connection, "SELECT id FROM users WHERE id = %(id)s", {"id": 1}
+            )
+            locking = slow_query_log.explain_statement(
+                connection,
+                "SELECT id FROM users WHERE id = %(id)s FOR UPDATE",
+                {"id": 1},
+            )
+            notifying = slow_query_log.explain_statement(
+                connection, "SELECT pg_notify('slow_queries', 'explained')", {}
+            )
+        assert "actual time" in plain
+        assert locking and "actual time" not in locking
+        assert notifying and "actual time" not in notifying
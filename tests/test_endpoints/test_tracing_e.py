@@ -0,0 +1,83 @@
+import json
+import tempfile
+import unittest
+from unittest.mock import Mock
+
+from fastapi.testclient import TestClient
+
+from dependencies import oauth
+from main import app as main_app
+from observability import InMemoryCollector, JsonFileExporter, TracingMiddleware
+from tests.conftest import async_return
+from tests.factories import GroupFactory, UserFactory, UserGroupFactory
+
+
+class TracingTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.collector = InMemoryCollector()
+        self.client = TestClient(TracingMiddleware(main_app, self.collector))
+        self.user = UserFactory()
+        self.user_dict = {
+            "userinfo": {
+                "email": self.user.login,
+                "given_name": self.user.first_name,
+                "family_name": self.user.last_name,
+                "picture": self.user.picture,
+            }
+        }
+        oauth.google.authorize_access_token = Mock(
+            return_value=async_return(self.user_dict)
+        )
+        self.client.get("/auth/")
+        self.group = GroupFactory(admin_id=self.user.id)
+        UserGroupFactory(user_id=self.user.id, group_id=self.group.id)
+
+    def test_server_timing(self) -> None:
+        data = self.client.get(f"/groups/{self.group.id}/info/")
+        assert data.status_code == 200
+        timings = {
+            metric.split(";")[0]: metric
+            for metric in data.headers["server-timing"].split(", ")
+        }
+        assert {"auth", "service", "db", "serialization", "total"} <= set(timings)
+        assert data.headers["x-trace-id"] == self.collector.traces[-1]["trace_id"]
+
+    def test_span_tree(self) -> None:
+        self.client.get(f"/groups/{self.group.id}/info/")
+        trace = self.collector.traces[-1]
+        assert trace["route"] == "/groups/{group_id}/info/"
+        assert trace["status_code"] == 200
+        spans = {span["id"]: span for span in trace["spans"]}
+        services = [span for span in spans.values() if span["category"] == "service"]
+        assert [span["name"] for span in services] == ["read_group_info"]
+        queries = [span for span in spans.values() if span["category"] == "db"]
+        assert queries
+        assert any(span["parent_id"] == services[0]["id"] for span in queries)
+        assert all(span["attributes"]["statement"] for span in queries)
+        auth = [span for span in spans.values() if span["category"] == "auth"]
+        assert len(auth) == 1
+        assert spans[auth[0]["parent_id"]]["name"] == "handler"
+
+    def test_continue_traceparent(self) -> None:
+        trace_id = "4bf92f3577b34da6a3ce929d0e0e4736"
+        data = self.client.get(
+            f"/groups/{self.group.id}/info/",
+            headers={"traceparent": f"00-{trace_id}-00f067aa0ba902b7-01"},
+        )
+        assert data.headers["x-trace-id"] == trace_id
+        assert self.collector.traces[-1]["parent_id"] == "00f067aa0ba902b7"
+
+    def test_file_exporter(self) -> None:
+        with tempfile.NamedTemporaryFile(suffix=".jsonl") as trace_file:
+            client = TestClient(
+                TracingMiddleware(main_app, JsonFileExporter(trace_file.name))
+            )
+            client.cookies = self.client.cookies
+            client.get(f"/groups/{self.group.id}/info/")
+            client.get("/groups/")
+            with open(trace_file.name) as file:
+                traces = [json.loads(line) for line in file]
+        assert [trace["route"] for trace in traces] == [
+            "/groups/{group_id}/info/",
+            "/groups/",
+        ]
@@ -79,3 +79,31 @@ class UserTestCase(unittest.TestCase):
         data = client.get("/users/user-balance/")
         assert data.status_code == 200
         assert data.json() == {"balance": float(balance)}
+
+    def test_search_history(self) -> None:
+        oauth.google.authorize_access_token = Mock(
+            return_value=async_return(self.user_dict)
+        )
+        client.get("/auth/")
+        group = GroupFactory(admin_id=self.first_user.id)
+        UserGroupFactory(user_id=self.first_user.id, group_id=group.id)
+        category = CategoryFactory()
+        CategoryGroupFactory(category_id=category.id, group_id=group.id)
+        expense = ExpenseFactory(
+            descriptions="Train tickets",
+            user_id=self.first_user.id,
+            group_id=group.id,
+            category_id=category.id,
+        )
+        ExpenseFactory(
+            descriptions="Dinner",
+            user_id=self.first_user.id,
+            group_id=group.id,
+            category_id=category.id,
+        )
+        data = client.get("/users/search/", params={"q": "train"})
+        assert data.status_code == 200
+        assert [item["id"] for item in data.json()["items"]] == [expense.id]
+        assert data.json()["next_cursor"] is None
+        data = client.get("/users/search/", params={"q": ""})
+        assert data.status_code == 422
@@ -0,0 +1,194 @@
+import datetime
+
+import pytest
+from fastapi_pagination import Page, Params
+from fastapi_pagination.api import set_page
+from sqlalchemy import event, select
+from starlette.exceptions import HTTPException
+
+from config import settings
+from models import Expense, Replenishment, UserArchiveTotal
+from services import (
+    delete_expense,
+    delete_replenishment,
+    paginate_recent,
+    read_category_expenses,
+    read_group_category_expenses,
+    read_group_daily_expenses,
+    read_group_member_info,
+    read_group_users_spenders,
+    read_replenishments,
+    read_user_balance,
+    read_user_daily_expenses,
+    read_user_total_expenses,
+)
+from services.archive import archive_cutoff, archive_rows, source
+from services.counters import (
+    read_group_counter_drift,
+    read_user_archive_total_drift,
+)
+from services.expense import read_expenses
+from services.group import read_group_total_expenses
+from services.rows import to_user_expenses
+from services.user import read_user_history
+from schemas import UserHistory
+from tests.factories import ExpenseFactory, ReplenishmentFactory
+
+
+def test_archived_rows_are_still_read(
+    session, dependence_factory, activity, monkeypatch
+) -> None:
+    monkeypatch.setattr(settings, "ARCHIVE_AFTER_MONTHS", 1)
+    factories = dependence_factory
+    user_id = factories["first_user"].id
+    group_id = factories["first_group"].id
+    expense = activity["first_expense"]
+    replenishment = ReplenishmentFactory(
+        user_id=user_id, time=datetime.datetime(2022, 11, 5)
+    )
+    balance = read_user_balance(session, user_id).balance
+    month_total = read_user_total_expenses(
+        session, user_id, filter_date=activity["filter_date"]
+    ).amount
+
+    cutoff = archive_cutoff()
+    assert archive_rows(session, Expense, cutoff) == 1
+    assert archive_rows(session, Replenishment, cutoff) == 1
+    assert archive_rows(session, Expense, cutoff) == 0
+    assert session.scalars(select(Expense.id)).all() == []
+    assert session.scalars(select(Replenishment.id)).all() == []
+    archived = session.get(UserArchiveTotal, user_id)
+    assert archived.expense_amount == expense.amount
+    assert archived.replenishment_amount == replenishment.amount
+
+    assert read_user_balance(session, user_id).balance == balance
+    assert (
+        read_user_total_expenses(
+            session, user_id, filter_date=activity["filter_date"]
+        ).amount
+        == month_total
+    )
+    assert (
+        read_group_total_expenses(
+            session, user_id, group_id, filter_date=activity["filter_date"]
+        ).amount
+        == month_total
+    )
+    rows = to_user_expenses(
+        session.execute(
+            read_expenses(session, user_id, filter_date=activity["filter_date"])
+        )
+    )
+    assert [row.id for row in rows] == [expense.id]
+    history = session.execute(read_user_history(user_id)).all()
+    assert {row.id for row in history} == {expense.id, replenishment.id}
+    assert read_group_counter_drift(session, group_id, group_id + 1) == []
+    assert read_user_archive_total_drift(session, user_id, user_id + 1) == []
+
+
+def test_recent_reads_skip_the_archive(monkeypatch) -> None:
+    monkeypatch.setattr(settings, "ARCHIVE_AFTER_MONTHS", None)
+    assert source(Expense) is Expense
+    monkeypatch.setattr(settings, "ARCHIVE_AFTER_MONTHS", 1)
+    assert source(Expense, datetime.date.today()) is Expense
+    assert source(Expense) is not Expense
+    assert source(Replenishment, datetime.date(2022, 11, 1)) is not Replenishment
+
+
+def test_archived_rows_are_in_breakdowns(
+    session, dependence_factory, activity, monkeypatch
+) -> None:
+    monkeypatch.setattr(settings, "ARCHIVE_AFTER_MONTHS", 1)
+    factories = dependence_factory
+    user_id = factories["first_user"].id
+    group_id = factories["first_group"].id
+    expense = activity["first_expense"]
+    replenishment = ReplenishmentFactory(
+        user_id=user_id, time=datetime.datetime(2022, 11, 5)
+    )
+    month = {"filter_date": activity["filter_date"]}
+    readers = [
+        lambda: read_category_expenses(session, user_id, **month),
+        lambda: read_user_daily_expenses(session, user_id, **month),
+        lambda: read_group_category_expenses(session, user_id, group_id, **month),
+        lambda: read_group_daily_expenses(session, user_id, group_id, **month),
+        lambda: read_group_users_spenders(session, user_id, group_id, **month),
+        lambda: read_group_member_info(session, user_id, group_id, user_id, **month),
+        lambda: session.execute(read_replenishments(user_id, **month)).all(),
+    ]
+    before = [reader() for reader in readers]
+    assert before[-1] == [
+        (
+            replenishment.id,
+            replenishment.amount,
+            replenishment.descriptions,
+            replenishment.time,
+        )
+    ]
+
+    cutoff = archive_cutoff()
+    archive_rows(session, Expense, cutoff)
+    archive_rows(session, Replenishment, cutoff)
+    assert [reader() for reader in readers] == before
+
+    with pytest.raises(HTTPException) as error:
+        delete_expense(session, user_id, group_id, expense.id)
+    assert error.value.status_code == 405
+    with pytest.raises(HTTPException) as error:
+        delete_replenishment(session, user_id, replenishment.id)
+    assert error.value.status_code == 405
+
+
+def test_recent_pages_skip_the_archive(
+    session, dependence_factory, activity, monkeypatch
+) -> None:
+    monkeypatch.setattr(settings, "ARCHIVE_AFTER_MONTHS", 1)
+    factories = dependence_factory
+    user_id = factories["first_user"].id
+    now = datetime.datetime.utcnow()
+    recent = [
+        ExpenseFactory(
+            user_id=user_id,
+            group_id=factories["first_group"].id,
+            category_id=activity["category"].id,
+            time=now - datetime.timedelta(hours=hours),
+        )
+        for hours in range(3)
+    ]
+    archive_rows(session, Expense, archive_cutoff())
+    statements = []
+
+    def read_page(page: int) -> Page[UserHistory]:
+        statements.clear()
+        with set_page(Page[UserHistory]):
+            return paginate_recent(
+                session,
+                lambda expenses, replenishments: read_user_history(
+                    user_id, expenses, replenishments
+                ),
+                Expense,
+                Replenishment,
+                params=Params(page=page, size=2),
+            )
+
+    def reads_archived_page() -> bool:
+        return any(
+            "LIMIT" in statement.upper() and "expenses_archive" in statement
+            for statement in statements
+        )
+
+    record = lambda *args: statements.append(args[2])
+    event.listen(session.get_bind(), "before_cursor_execute", record)
+    try:
+        first = read_page(1)
+        assert not reads_archived_page()
+        second = read_page(2)
+        assert reads_archived_page()
+    finally:
+        event.remove(session.get_bind(), "before_cursor_execute", record)
+    assert [item.id for item in first.items] == [expense.id for expense in recent[:2]]
+    assert [item.id for item in second.items] == [
+        recent[2].id,
+        activity["first_expense"].id,
+    ]
+    assert first.total == second.total == 4
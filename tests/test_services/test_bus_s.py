@@ -0,0 +1,66 @@
+import threading
+
+from sqlalchemy.orm import Session
+
+from cache import InvalidationBus, MemoryCache, TieredCache, namespace
+from tests.conftest import engine, postgres_only
+
+
+def test_bus_ignores_own_events() -> None:
+    received = []
+    bus = InvalidationBus(engine)
+    bus.on_invalidate = lambda space, event: received.append((space, event))
+    bus.receive(f"{bus.origin} first group:1")
+    bus.receive("other-host:1 second group:2")
+    assert received == [("group:2", "second")]
+
+
+@postgres_only
+def test_invalidation_reaches_other_worker() -> None:
+    space = namespace("group", 42)
+    first = TieredCache(MemoryCache(), bus=InvalidationBus(engine))
+    second = TieredCache(MemoryCache(), bus=InvalidationBus(engine))
+    second.bus.origin = "other-worker"
+    evicted = threading.Event()
+
+    def evict(invalidated: str, event: str) -> None:
+        second.evict(invalidated, event)
+        evicted.set()
+
+    first.set(space, "info", 1)
+    second.set(space, "info", 1)
+    second.bus.start(evict)
+    try:
+        assert second.bus.listening.wait(5)
+        first.invalidate(space)
+        assert evicted.wait(5)
+    finally:
+        second.bus.stop()
+    assert first.get(space, "info") is None
+    assert second.get(space, "info") is None
+
+
+@postgres_only
+def test_invalidation_is_sent_when_the_write_commits() -> None:
+    space = namespace("group", 43)
+    publisher = TieredCache(MemoryCache(), bus=InvalidationBus(engine))
+    listener = InvalidationBus(engine)
+    listener.origin = "other-worker"
+    received = []
+    delivered = threading.Event()
+
+    def evict(invalidated: str, event: str) -> None:
+        received.append(invalidated)
+        delivered.set()
+
+    listener.start(evict)
+    try:
+        assert listener.listening.wait(5)
+        with Session(engine) as db:
+            publisher.invalidate(space, db)
+            assert not delivered.wait(0.5)
+            db.commit()
+        assert delivered.wait(5)
+    finally:
+        listener.stop()
+    assert received == [space]
@@ -0,0 +1,192 @@
+import pytest
+from sqlalchemy import create_engine, func, select, update
+from sqlalchemy.orm import Session
+
+from cache import MemoryCache, SQLiteCache, TieredCache, cache, namespace
+from database import Base, RoutingSession, primary_reads
+from models import User
+from schemas import ExpenseCreate
+from services import (
+    create_expense,
+    get_user,
+    read_group_info,
+    register_user,
+    remove_user,
+)
+from tests.conftest import assert_max_queries
+
+
+@pytest.fixture()
+def shared_cache(tmp_path):
+    cache.configure(MemoryCache(), SQLiteCache(str(tmp_path / "cache.sqlite3")))
+    yield cache
+    cache.configure()
+
+
+def test_memory_cache_evicts_least_recently_used() -> None:
+    memory = MemoryCache(maxsize=2)
+    memory.set("a", b"1")
+    memory.set("b", b"2")
+    assert memory.get("a") == b"1"
+    memory.set("c", b"3")
+    assert memory.get("b") is None
+    assert memory.get("a") == b"1"
+    assert memory.get("c") == b"3"
+
+
+def test_memory_cache_expires_entries() -> None:
+    memory = MemoryCache(ttl=0.0)
+    memory.set("a", b"1")
+    assert memory.get("a") is None
+
+
+def test_sqlite_cache_is_shared_between_instances(tmp_path) -> None:
+    path = str(tmp_path / "cache.sqlite3")
+    first, second = SQLiteCache(path), SQLiteCache(path)
+    first.set("a", b"1")
+    first.bump("group:1")
+    assert second.get("a") == b"1"
+    assert second.version("group:1") == 1
+    second.delete("a")
+    assert first.get("a") is None
+
+
+def test_invalidate_reaches_other_workers(tmp_path) -> None:
+    path = str(tmp_path / "cache.sqlite3")
+    first = TieredCache(MemoryCache(version_ttl=0.0), SQLiteCache(path))
+    second = TieredCache(MemoryCache(version_ttl=0.0), SQLiteCache(path))
+    space = namespace("group", 1)
+    first.set(space, "info", {"members": 1})
+    assert second.get(space, "info") == {"members": 1}
+    second.invalidate(space)
+    assert first.get(space, "info") is None
+    assert first.get_or_load(space, "info", lambda: {"members": 2}) == {"members": 2}
+    assert second.get(space, "info") == {"members": 2}
+
+
+def test_versions_are_kept_in_memory(tmp_path) -> None:
+    path = str(tmp_path / "cache.sqlite3")
+    first = TieredCache(MemoryCache(version_ttl=60.0), SQLiteCache(path))
+    second = TieredCache(MemoryCache(version_ttl=60.0), SQLiteCache(path))
+    space = namespace("group", 1)
+    first.set(space, "info", 1)
+    assert first.get(space, "info") == 1
+    second.invalidate(space)
+    assert first.get(space, "info") == 1
+    first.evict(space)
+    assert first.get(space, "info") is None
+
+
+def test_events_are_applied_once_per_host(tmp_path) -> None:
+    path = str(tmp_path / "cache.sqlite3")
+    publisher = TieredCache(MemoryCache(), SQLiteCache(path))
+    worker = TieredCache(MemoryCache(), SQLiteCache(path))
+    other_host = TieredCache(MemoryCache(), SQLiteCache(str(tmp_path / "other")))
+    space = namespace("group", 1)
+    publisher.evict(space, "event")
+    publisher.set(space, "info", 1)
+    worker.evict(space, "event")
+    other_host.evict(space, "event")
+    other_host.set(space, "info", 1)
+    other_host.evict(space, "event")
+    assert worker.get(space, "info") == 1
+    assert other_host.get(space, "info") == 1
+    assert worker.tiers[-1].version(space) == other_host.tiers[-1].version(space) == 1
+
+
+def test_invalidate_evicts_again_on_commit(session) -> None:
+    tiered = TieredCache(MemoryCache())
+    space = namespace("group", 1)
+    tiered.invalidate(space, session)
+    tiered.set(space, "info", "read before the commit")
+    session.commit()
+    assert tiered.get(space, "info") is None
+
+
+def test_get_or_load_does_not_cache_none(tmp_path) -> None:
+    tiered = TieredCache(MemoryCache(), SQLiteCache(str(tmp_path / "cache.sqlite3")))
+    assert tiered.get_or_load("users", "missing", lambda: None) is None
+    assert tiered.get_or_load("users", "missing", lambda: 1) == 1
+
+
+def test_cached_user(session, dependence_factory, shared_cache) -> None:
+    factories = dependence_factory
+    login = factories["first_user"].login
+    assert get_user(session, login).id == factories["first_user"].id
+    session.expunge_all()
+    with assert_max_queries(0):
+        user = get_user(session, login)
+    assert user.id == factories["first_user"].id
+    assert user in session
+
+
+def test_registering_a_known_user_writes_nothing(
+    session, dependence_factory, shared_cache
+) -> None:
+    user = dependence_factory["first_user"]
+    assert get_user(session, user.login).id == user.id
+    version = shared_cache.tiers[-1].version(namespace("user", user.login))
+    with assert_max_queries(0):
+        register_user(session, user.login, "first", "last", None)
+    assert shared_cache.tiers[-1].version(namespace("user", user.login)) == version
+
+
+def test_registered_user_is_found(session, shared_cache) -> None:
+    login = "registered@example.com"
+    assert get_user(session, login) is None
+    register_user(session, login, "first", "last", None)
+    session.expunge_all()
+    assert get_user(session, login).first_name == "first"
+
+
+def test_group_info_invalidated_by_expense(
+    session, dependence_factory, activity, shared_cache
+) -> None:
+    factories = dependence_factory
+    user_id, group_id = factories["first_user"].id, factories["first_group"].id
+    assert read_group_info(session, user_id, group_id).expenses == 1
+    with assert_max_queries(0):
+        assert read_group_info(session, user_id, group_id).expenses == 1
+    create_expense(
+        session,
+        user_id,
+        group_id,
+        ExpenseCreate(
+            descriptions="descriptions",
+            amount=10,
+            category_id=activity["category"].id,
+        ),
+    )
+    assert read_group_info(session, user_id, group_id).expenses == 2
+
+
+def test_removing_a_member_invalidates_the_group_once(
+    session, dependence_factory, add_second_user_in_group, shared_cache
+) -> None:
+    factories = dependence_factory
+    group_id = factories["first_group"].id
+    remove_user(
+        session, factories["first_user"].id, group_id, factories["second_user"].id
+    )
+    # Once in the transaction of the write and once when it commits.
+    assert shared_cache.tiers[-1].version(namespace("group", group_id)) == 2
+
+
+def test_misses_are_loaded_on_primary(tmp_path) -> None:
+    primary = create_engine(f"sqlite:///{tmp_path / 'primary.db'}")
+    replica = create_engine(f"sqlite:///{tmp_path / 'replica.db'}")
+    for db_engine in (primary, replica):
+        Base.metadata.create_all(bind=db_engine)
+    with Session(primary) as db:
+        db.add(User(login="user@example.com", first_name="first", last_name="last"))
+        db.commit()
+    tiered = TieredCache(MemoryCache(), loading=primary_reads)
+    with RoutingSession(bind=primary, replica=replica) as db:
+        assert db.scalar(select(func.count(User.id))) == 0
+        loaded = tiered.get_or_load(
+            "users", "count", lambda: db.scalar(select(func.count(User.id)))
+        )
+        assert loaded == 1
+        assert db.scalar(select(func.count(User.id))) == 0
+    primary.dispose()
+    replica.dispose()
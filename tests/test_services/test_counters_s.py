@@ -0,0 +1,118 @@
+import pytest
+from sqlalchemy import create_engine, event, select
+from sqlalchemy.orm import Session
+
+from config import settings
+from database import Base, RoutingSession
+from enums import GroupStatusEnum
+from models import Group, GroupCounter, GroupCounterChange, User
+from schemas import ExpenseCreate
+from services import (
+    GroupCounterConsumer,
+    apply_group_counter_changes,
+    create_expense,
+    read_group_info,
+    wait_for_group_counters,
+)
+from tests.conftest import SessionLocal
+
+
+@pytest.fixture()
+def write_behind(monkeypatch):
+    monkeypatch.setattr(settings, "COUNTERS_WRITE_BEHIND", True)
+
+
+def add_expense(session, factories, activity, amount: float) -> None:
+    create_expense(
+        session,
+        factories["first_user"].id,
+        factories["first_group"].id,
+        ExpenseCreate(
+            descriptions="descriptions",
+            amount=amount,
+            category_id=activity["category"].id,
+        ),
+    )
+
+
+def test_write_behind_queues_changes(
+    session, dependence_factory, activity, write_behind
+) -> None:
+    factories = dependence_factory
+    group_id = factories["first_group"].id
+    counters = session.get(GroupCounter, group_id)
+    expense_count, total_amount = counters.expense_count, counters.total_amount
+    add_expense(session, factories, activity, 10)
+    add_expense(session, factories, activity, 5.5)
+    session.refresh(counters)
+    assert counters.expense_count == expense_count
+    assert session.query(GroupCounterChange).filter_by(group_id=group_id).count() == 2
+    applied = apply_group_counter_changes(session)
+    session.commit()
+    assert len(applied) == 2
+    session.refresh(counters)
+    assert counters.expense_count == expense_count + 2
+    assert float(counters.total_amount) == pytest.approx(float(total_amount) + 15.5)
+    assert session.query(GroupCounterChange).count() == 0
+
+
+def test_consumer_drains_in_batches(
+    session, dependence_factory, activity, write_behind, monkeypatch
+) -> None:
+    monkeypatch.setattr(settings, "COUNTERS_BATCH_SIZE", 2)
+    factories = dependence_factory
+    for _ in range(3):
+        add_expense(session, factories, activity, 1)
+    assert GroupCounterConsumer(SessionLocal).drain() == 3
+    assert session.query(GroupCounterChange).count() == 0
+
+
+def test_wait_for_writes(session, dependence_factory, activity, write_behind) -> None:
+    factories = dependence_factory
+    user_id, group_id = factories["first_user"].id, factories["first_group"].id
+    add_expense(session, factories, activity, 10)
+    assert read_group_info(session, user_id, group_id).expenses == 1
+    info = read_group_info(session, user_id, group_id, wait_for_writes=True)
+    assert info.expenses == 2
+
+
+def test_drain_runs_on_primary(tmp_path, write_behind) -> None:
+    primary = create_engine(f"sqlite:///{tmp_path / 'primary.db'}")
+    replica = create_engine(f"sqlite:///{tmp_path / 'replica.db'}")
+    for db_engine in (primary, replica):
+        Base.metadata.create_all(bind=db_engine)
+    with Session(primary) as db:
+        db.add(User(id=1, login="user@example.com", first_name="a", last_name="b"))
+        db.flush()
+        db.add(
+            Group(
+                id=1,
+                title="title",
+                description="description",
+                admin_id=1,
+                status=GroupStatusEnum.ACTIVE,
+                icon_url="icon",
+                color_code="#000000",
+            )
+        )
+        db.flush()
+        db.add(GroupCounterChange(group_id=1, expense_delta=1, amount_delta=10))
+        db.commit()
+    replica_statements = []
+    event.listen(
+        replica,
+        "before_cursor_execute",
+        lambda *args: replica_statements.append(args[2]),
+    )
+    consumer = GroupCounterConsumer(
+        lambda: RoutingSession(bind=primary, replica=replica)
+    )
+    assert consumer.drain() == 1
+    with RoutingSession(bind=primary, replica=replica) as db:
+        wait_for_group_counters(db, 1)
+    assert replica_statements == []
+    with Session(primary) as db:
+        assert db.get(GroupCounter, 1).expense_count == 1
+        assert db.scalars(select(GroupCounterChange)).all() == []
+    primary.dispose()
+    replica.dispose()
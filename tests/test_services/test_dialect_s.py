@@ -0,0 +1,105 @@
+import datetime
+from decimal import Decimal
+
+from sqlalchemy import func, select, text
+
+from database.dialect import between_dates, date_bucket, in_month, insert, sum_if
+from models import Expense, User
+from tests.factories import CategoryFactory, CategoryGroupFactory, ExpenseFactory
+
+
+def add_expenses(factories, times) -> None:
+    category = CategoryFactory()
+    CategoryGroupFactory(category_id=category.id, group_id=factories["first_group"].id)
+    for time in times:
+        ExpenseFactory(
+            user_id=factories["first_user"].id,
+            group_id=factories["first_group"].id,
+            category_id=category.id,
+            time=time,
+            amount=10,
+        )
+
+
+def test_in_month(session, dependence_factory) -> None:
+    add_expenses(
+        dependence_factory,
+        [
+            datetime.datetime(2022, 11, 30, 23, 59, 59),
+            datetime.datetime(2022, 12, 1),
+            datetime.datetime(2022, 12, 31, 23, 59, 59),
+            datetime.datetime(2023, 1, 1),
+        ],
+    )
+    december = session.scalar(
+        select(func.count(Expense.id)).where(in_month(Expense.time, 2022, 12))
+    )
+    assert december == 2
+
+
+def test_between_dates_includes_end_midnight(session, dependence_factory) -> None:
+    add_expenses(
+        dependence_factory,
+        [datetime.datetime(2022, 12, 10), datetime.datetime(2022, 12, 22, 0, 0, 1)],
+    )
+    count = session.scalar(
+        select(func.count(Expense.id)).where(
+            between_dates(
+                Expense.time, datetime.date(2022, 12, 10), datetime.date(2022, 12, 22)
+            )
+        )
+    )
+    assert count == 1
+
+
+def test_date_bucket_and_sum_if(session, dependence_factory) -> None:
+    add_expenses(
+        dependence_factory,
+        [
+            datetime.datetime(2022, 12, 10, 8),
+            datetime.datetime(2022, 12, 10, 20),
+            datetime.datetime(2022, 12, 11, 8),
+        ],
+    )
+    rows = session.execute(
+        select(
+            date_bucket(Expense.time),
+            sum_if(Expense.amount, Expense.time < datetime.datetime(2022, 12, 10, 12)),
+        )
+        .group_by(date_bucket(Expense.time))
+        .order_by(date_bucket(Expense.time))
+    ).all()
+    assert [(day, amount) for day, amount in rows] == [
+        (datetime.date(2022, 12, 10), 10),
+        (datetime.date(2022, 12, 11), None),
+    ]
+
+
+def test_insert_on_conflict_do_nothing(session, dependence_factory) -> None:
+    login = dependence_factory["first_user"].login
+    statement = (
+        insert(session, User)
+        .values(login=login, first_name="first", last_name="last")
+        .on_conflict_do_nothing(index_elements=[User.login])
+    )
+    session.execute(statement)
+    assert session.scalar(select(func.count(User.id)).filter_by(login=login)) == 1
+
+
+def test_money_is_stored_in_cents(session, dependence_factory) -> None:
+    add_expenses(dependence_factory, [datetime.datetime(2022, 12, 1)] * 2)
+    session.execute(text("UPDATE expenses SET amount = 1005"))
+    session.add(
+        Expense(
+            descriptions="rounded",
+            amount=0.125,
+            user_id=dependence_factory["first_user"].id,
+            group_id=dependence_factory["first_group"].id,
+            category_id=session.scalar(select(Expense.category_id).limit(1)),
+        )
+    )
+    session.flush()
+    assert session.scalar(text("SELECT min(amount) FROM expenses")) == 13
+    total = session.scalar(select(func.sum(Expense.amount)))
+    assert total == Decimal("20.23")
+    assert isinstance(total, Decimal)
@@ -8,6 +8,7 @@ from enums import GroupStatusEnum
 from schemas import ExpenseCreate, ExpenseUpdate
 from services import create_expense
 from services.expense import update_expense, delete_expense, read_expenses
+from services.rows import to_user_expenses
 from tests.factories import UserGroupFactory
 
 
@@ -78,8 +79,12 @@ def test_update_expense_another_user(session, dependence_factory, activity) -> N
     UserGroupFactory(
         user_id=factories["second_user"].id, group_id=factories["first_group"].id
     )
-    date_update_expense = ExpenseCreate(
-        descriptions="descriptions", amount=999.9, category_id=activity["category"].id
+    date_update_expense = ExpenseUpdate(
+        descriptions="descriptions",
+        amount=999.9,
+        category_id=activity["category"].id,
+        group_id=factories["first_group"].id,
+        time=activity["first_expense"].time,
     )
     with pytest.raises(HTTPException) as ex_info:
         update_expense(
@@ -153,10 +158,10 @@ def test_read_expenses_by_group_all_time(
         group_id=factories["first_group"].id,
         user_id=factories["first_user"].id,
     )
-    data = session.execute(data).fetchall()
+    data = to_user_expenses(session.execute(data))
     assert len(data) == len(expenses)
     for data, expense in zip(data, expenses):
-        data_instance = data[0]
+        data_instance = data
         assert data_instance.id == expense.id
         assert data_instance.time == expense.time
         assert data_instance.amount == expense.amount
@@ -177,10 +182,10 @@ def test_read_expenses_by_group_month(
         user_id=factories["first_user"].id,
         filter_date=activity["filter_date"],
     )
-    data = session.execute(data).fetchall()
+    data = to_user_expenses(session.execute(data))
     assert len(data) == len(expenses)
     for data, expense in zip(data, expenses):
-        data_instance = data[0]
+        data_instance = data
         assert data_instance.id == expense.id
         assert data_instance.time == expense.time
         assert data_instance.amount == expense.amount
@@ -202,10 +207,10 @@ def test_read_expenses_by_group_time_range(
         start_date=update_activity["start_date"],
         end_date=update_activity["end_date"],
     )
-    data = session.execute(data).fetchall()
+    data = to_user_expenses(session.execute(data))
     assert len(data) == len(expenses)
     for data, expense in zip(data, expenses):
-        data_instance = data[0]
+        data_instance = data
         assert data_instance.id == expense.id
         assert data_instance.time == expense.time
         assert data_instance.amount == expense.amount
@@ -253,7 +258,7 @@ def test_read_expenses_all_time(session, dependence_factory, activity, update_ac
     activity = activity
     update_activity = update_activity
     data = read_expenses(db=session, user_id=factories["first_user"].id)
-    data = session.execute(data).fetchall()
+    data = to_user_expenses(session.execute(data))
     expenses = [
         activity["first_expense"],
         update_activity["second_expense"],
@@ -261,7 +266,7 @@ def test_read_expenses_all_time(session, dependence_factory, activity, update_ac
     ]
     assert len(data) == len(expenses)
     for data, expense in zip(data, expenses):
-        data_instance = data[0]
+        data_instance = data
         assert data_instance.id == expense.id
         assert data_instance.time == expense.time
         assert data_instance.amount == expense.amount
@@ -279,10 +284,10 @@ def test_read_expenses_month(session, dependence_factory, activity, update_activ
         user_id=factories["first_user"].id,
         filter_date=update_activity["start_date"],
     )
-    data = session.execute(data).fetchall()
+    data = to_user_expenses(session.execute(data))
     assert len(data) == len(expenses)
     for data, expense in zip(data, expenses):
-        data_instance = data[0]
+        data_instance = data
         assert data_instance.id == expense.id
         assert data_instance.time == expense.time
         assert data_instance.amount == expense.amount
@@ -303,10 +308,10 @@ def test_read_expenses_time_range(
         start_date=update_activity["start_date"],
         end_date=update_activity["end_date"],
     )
-    data = session.execute(data).fetchall()
+    data = to_user_expenses(session.execute(data))
     assert len(data) == len(expenses)
     for data, expense in zip(data, expenses):
-        data_instance = data[0]
+        data_instance = data
         assert data_instance.id == expense.id
         assert data_instance.time == expense.time
         assert data_instance.amount == expense.amount
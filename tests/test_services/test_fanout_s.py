@@ -0,0 +1,90 @@
+import threading
+import time
+from contextvars import ContextVar
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import Session
+
+from config import settings
+from database import RoutingSession, fan_out
+from database.fanout import FanOutQueuePool
+from models import User
+from tests.conftest import engine, postgres_only
+
+request_id: ContextVar[str] = ContextVar("request_id", default="")
+
+
+def test_fan_out_on_test_transaction(session, dependence_factory) -> None:
+    factories = dependence_factory
+    count, first_user = fan_out(
+        session,
+        lambda db: db.scalar(select(func.count(User.id))),
+        lambda db: db.get(User, factories["first_user"].id),
+    )
+    assert count == 2
+    assert first_user.login == factories["first_user"].login
+    assert first_user in session
+
+
+@postgres_only
+def test_fan_out_runs_queries_concurrently() -> None:
+    threads = set()
+
+    def sleep(db: Session) -> str:
+        threads.add(threading.get_ident())
+        db.execute(select(func.pg_sleep(0.2)))
+        return request_id.get()
+
+    token = request_id.set("request")
+    try:
+        with Session(bind=engine) as db:
+            start = time.perf_counter()
+            results = fan_out(db, sleep, sleep, sleep)
+            elapsed = time.perf_counter() - start
+    finally:
+        request_id.reset(token)
+    assert results == ["request"] * 3
+    assert len(threads) == 3
+    assert elapsed < 0.5
+
+
+@postgres_only
+def test_fan_out_runs_inline_without_free_connections() -> None:
+    threads = []
+
+    def thread(db: Session) -> int:
+        count = db.scalar(select(func.count(User.id)))
+        threads.append(threading.get_ident())
+        return count
+
+    small_engine = create_engine(
+        settings.SQLALCHEMY_DATABASE_URI,
+        poolclass=FanOutQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=5,
+    )
+    try:
+        with Session(bind=small_engine) as db:
+            db.connection()
+            start = time.perf_counter()
+            results = fan_out(db, thread, thread)
+            elapsed = time.perf_counter() - start
+    finally:
+        small_engine.dispose()
+    assert results[0] == results[1]
+    assert threads == [threading.get_ident()] * 2
+    assert elapsed < 1
+
+
+@postgres_only
+def test_fan_out_keeps_the_primary_pin() -> None:
+    replica = create_engine(settings.SQLALCHEMY_DATABASE_URI)
+    try:
+        with RoutingSession(bind=engine, replica=replica) as db:
+            bind = lambda session: session.get_bind(clause=select(User.id))
+            assert fan_out(db, bind, bind) == [replica, replica]
+            db.execute(select(User.id).with_for_update())
+            assert fan_out(db, bind, bind) == [engine, engine]
+    finally:
+        replica.dispose()
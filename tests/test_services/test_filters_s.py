@@ -0,0 +1,179 @@
+import datetime
+from typing import Optional
+
+import pytest
+from sqlalchemy import insert, text
+
+from enums import ExpenseSortEnum
+from models import Expense
+from services import read_expenses, read_group_history
+from tests.conftest import postgres_only
+from tests.factories import CategoryFactory, CategoryGroupFactory
+
+ROWS = 400
+
+# The index each filter shape of the expense listings is served by. Every
+# listing filters on an equality prefix (the group, the user or both) and
+# orders by its sort column with the id as tie-breaker, so the index both
+# narrows and orders the rows.
+LISTING_INDEXES = {
+    ("group", None, "time"): "ix_expenses_group_id_time",
+    ("group", "category", "time"): "ix_expenses_group_id_category_id_time",
+    ("group", "member", "time"): "ix_expenses_group_id_user_id_time",
+    ("group", None, "amount"): "ix_expenses_group_id_amount",
+    ("user", None, "time"): "ix_expenses_user_id_time",
+    ("user", None, "amount"): "ix_expenses_user_id_amount",
+}
+
+
+def listing_index(
+    group_id: Optional[int] = None,
+    user_id: Optional[int] = None,
+    category_id: Optional[int] = None,
+    sort_by: Optional[ExpenseSortEnum] = None,
+) -> str:
+    """
+    Returns the name of the index a listing with these filters is served
+    by. An equality filter on the member or category narrows the most, so
+    its index wins. Otherwise the index in the sort order does: a page of
+    a listing in time order stops after its first matching rows, which
+    beats reading the whole of an amount range and sorting it.
+    """
+    if group_id is None:
+        scope, equality = "user", None
+    elif user_id is not None:
+        scope, equality = "group", "member"
+    elif category_id is not None:
+        scope, equality = "group", "category"
+    else:
+        scope, equality = "group", None
+    by_amount = sort_by == ExpenseSortEnum.AMOUNT and equality is None
+    order = "amount" if by_amount else "time"
+    return LISTING_INDEXES[scope, equality, order]
+
+
+@pytest.fixture
+def listing(session, dependence_factory, add_second_user_in_group) -> dict:
+    factories = dependence_factory
+    group_id = factories["first_group"].id
+    users = [factories["first_user"].id, factories["second_user"].id]
+    categories = [CategoryFactory(title=f"listing {index}").id for index in range(4)]
+    for category_id in categories:
+        CategoryGroupFactory(category_id=category_id, group_id=group_id)
+    start = datetime.datetime(2023, 1, 1)
+    session.execute(
+        insert(Expense),
+        [
+            {
+                "descriptions": f"expense {index}",
+                "amount": index % 97 + 1,
+                "time": start + datetime.timedelta(hours=index),
+                "user_id": users[index % 2],
+                "group_id": group_id,
+                "category_id": categories[index % 4],
+            }
+            for index in range(ROWS)
+        ],
+    )
+    return {"group_id": group_id, "users": users, "categories": categories}
+
+
+def test_group_history_filters(session, dependence_factory, listing) -> None:
+    user_id = dependence_factory["first_user"].id
+    rows = session.execute(
+        read_group_history(
+            session,
+            user_id,
+            listing["group_id"],
+            category_id=listing["categories"][0],
+            member_id=listing["users"][0],
+            min_amount=10,
+            max_amount=50,
+            sort_by=ExpenseSortEnum.AMOUNT,
+            descending=False,
+        )
+    ).all()
+    assert rows
+    assert all(10 <= row.amount <= 50 for row in rows)
+    assert {row.user_id for row in rows} == {listing["users"][0]}
+    assert {row.category_id for row in rows} == {listing["categories"][0]}
+    assert [row.amount for row in rows] == sorted(row.amount for row in rows)
+
+
+def test_read_expenses_filters(session, dependence_factory, listing) -> None:
+    user_id = dependence_factory["first_user"].id
+    rows = session.execute(
+        read_expenses(session, user_id, max_amount=5, sort_by=ExpenseSortEnum.TIME)
+    ).all()
+    assert rows
+    assert all(row.amount <= 5 for row in rows)
+    assert [row.time for row in rows] == sorted(
+        (row.time for row in rows), reverse=True
+    )
+
+
+def used_indexes(session, statement) -> set:
+    session.execute(text("SET LOCAL enable_seqscan = off"))
+    compiled = statement.limit(8).compile(
+        session.get_bind(), compile_kwargs={"literal_binds": True}
+    )
+    (plan,) = session.execute(text(f"EXPLAIN (FORMAT JSON) {compiled}")).scalar()
+    indexes, nodes = set(), [plan["Plan"]]
+    while nodes:
+        node = nodes.pop()
+        if node.get("Relation Name") == "expenses" and "Index Name" in node:
+            indexes.add(node["Index Name"])
+        nodes.extend(node.get("Plans", []))
+    return indexes
+
+
+@postgres_only
+@pytest.mark.parametrize(
+    "filters",
+    [
+        {},
+        {"category_id": 0},
+        {"member_id": 0},
+        {"sort_by": ExpenseSortEnum.AMOUNT},
+        {"min_amount": 10},
+        {"min_amount": 90, "sort_by": ExpenseSortEnum.AMOUNT},
+    ],
+)
+def test_group_history_plans(session, dependence_factory, listing, filters) -> None:
+    if "category_id" in filters:
+        filters["category_id"] = listing["categories"][0]
+    if "member_id" in filters:
+        filters["member_id"] = listing["users"][1]
+    session.execute(text("ANALYZE expenses"))
+    statement = read_group_history(
+        session, listing["users"][0], listing["group_id"], **filters
+    )
+    expected = listing_index(
+        group_id=listing["group_id"],
+        user_id=filters.get("member_id"),
+        category_id=filters.get("category_id"),
+        sort_by=filters.get("sort_by", ExpenseSortEnum.TIME),
+    )
+    assert used_indexes(session, statement) == {expected}
+
+
+@postgres_only
+@pytest.mark.parametrize(
+    "filters",
+    [
+        {"sort_by": ExpenseSortEnum.TIME},
+        {"sort_by": ExpenseSortEnum.AMOUNT},
+        {"sort_by": ExpenseSortEnum.TIME, "group": True},
+    ],
+)
+def test_read_expenses_plans(session, dependence_factory, listing, filters) -> None:
+    session.execute(text("ANALYZE expenses"))
+    group_id = listing["group_id"] if filters.pop("group", False) else None
+    user_id = listing["users"][0]
+    statement = read_expenses(session, user_id, group_id=group_id, **filters)
+    expected = listing_index(
+        group_id=group_id,
+        user_id=user_id if group_id else None,
+        sort_by=filters["sort_by"],
+    )
+    assert used_indexes(session, statement) == {expected}
@@ -5,18 +5,22 @@ import pytest
 from starlette.exceptions import HTTPException
 from sqlalchemy.orm import joinedload
 
-from models import Group, UserGroup
+from models import Expense, Group, GroupCounter, UserGroup
 from enums import GroupStatusEnum
-from schemas import GroupCreate
+from schemas import ExpenseCreate, ExpenseUpdate, GroupCreate
 from services import (
     add_user_in_group,
+    create_expense,
     create_group,
+    delete_expense,
     disband_group,
     leave_group,
+    read_group_info,
     read_categories_group,
     read_user_groups,
     read_users_group,
     remove_user,
+    update_expense,
     update_group,
 )
 from tests.factories import (
@@ -132,6 +136,23 @@ def test_add_inactive_user_in_group(session, dependence_factory) -> None:
     ) == datetime.date.today().strftime("%Y-%m-%d")
 
 
+def test_add_user_in_group_twice(session, dependence_factory) -> None:
+    factories = dependence_factory
+    add_user_in_group(session, factories["second_user"].id, factories["first_group"].id)
+    add_user_in_group(session, factories["second_user"].id, factories["first_group"].id)
+    session.commit()
+    db_user_groups = (
+        session.query(UserGroup)
+        .filter_by(
+            group_id=factories["first_group"].id,
+            user_id=factories["second_user"].id,
+        )
+        .all()
+    )
+    assert len(db_user_groups) == 1
+    assert db_user_groups[0].status == GroupStatusEnum.ACTIVE
+
+
 def test_read_users_group(
     session, dependence_factory, add_second_user_in_group
 ) -> None:
@@ -299,3 +320,63 @@ def test_remove_inactive_user(session, dependence_factory) -> None:
     assert "The user is not active or does not exist in this group!" in str(
         ex_info.value.detail
     )
+
+
+def assert_counters_exact(session, group_id: int) -> None:
+    counters = session.get(GroupCounter, group_id, populate_existing=True)
+    expenses = (
+        session.query(Expense).filter_by(group_id=group_id).populate_existing().all()
+    )
+    assert counters.member_count == (
+        session.query(UserGroup)
+        .filter_by(group_id=group_id, status=GroupStatusEnum.ACTIVE)
+        .count()
+    )
+    assert counters.expense_count == len(expenses)
+    assert float(counters.total_amount) == pytest.approx(
+        sum(float(expense.amount) for expense in expenses)
+    )
+
+
+def test_group_counters_follow_writes(session, dependence_factory, activity) -> None:
+    factories = dependence_factory
+    user_id = factories["first_user"].id
+    second_user_id = factories["second_user"].id
+    group_id = factories["first_group"].id
+    category_id = activity["category"].id
+    assert_counters_exact(session, group_id)
+    for _ in range(2):
+        add_user_in_group(session, second_user_id, group_id)
+        session.commit()
+    assert_counters_exact(session, group_id)
+    expense = create_expense(
+        session,
+        user_id,
+        group_id,
+        ExpenseCreate(descriptions="descriptions", amount=10, category_id=category_id),
+    )
+    assert_counters_exact(session, group_id)
+    update_expense(
+        session,
+        user_id,
+        group_id,
+        ExpenseUpdate(
+            descriptions="descriptions",
+            amount=25.5,
+            category_id=category_id,
+            group_id=group_id,
+            time=datetime.datetime(2023, 1, 1),
+        ),
+        expense.id,
+    )
+    assert_counters_exact(session, group_id)
+    delete_expense(session, user_id, group_id, expense.id)
+    assert_counters_exact(session, group_id)
+    for _ in range(2):
+        leave_group(session, second_user_id, group_id)
+    assert_counters_exact(session, group_id)
+    info = read_group_info(session, user_id, group_id)
+    assert (info.members, info.expenses) == (1, 1)
+    disband_group(session, group_id)
+    session.commit()
+    assert_counters_exact(session, group_id)
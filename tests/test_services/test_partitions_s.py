@@ -0,0 +1,42 @@
+import datetime
+
+from sqlalchemy import text
+
+from database.partitions import ensure_partitions, partition_name
+from tests.conftest import postgres_only
+
+
+@postgres_only
+def test_ensure_partitions_moves_rows_out_of_default(session) -> None:
+    connection = session.connection()
+    connection.execute(
+        text(
+            "CREATE TABLE events (id integer, time timestamp NOT NULL) "
+            "PARTITION BY RANGE (time)"
+        )
+    )
+    connection.execute(text("CREATE TABLE events_default PARTITION OF events DEFAULT"))
+    connection.execute(
+        text("INSERT INTO events VALUES (1, '2023-02-10'), (2, '2023-05-01')")
+    )
+    created = ensure_partitions(
+        connection, "events", months_ahead=1, today=datetime.date(2023, 2, 20)
+    )
+    assert created == ["events_2023_02", "events_2023_03"]
+    assert (
+        ensure_partitions(
+            connection, "events", months_ahead=1, today=datetime.date(2023, 2, 20)
+        )
+        == []
+    )
+    assert connection.scalar(text("SELECT id FROM events_2023_02")) == 1
+    assert connection.scalar(text("SELECT id FROM events_default")) == 2
+    plan = connection.execute(
+        text(
+            "EXPLAIN SELECT * FROM events "
+            "WHERE time >= '2023-02-01' AND time < '2023-03-01'"
+        )
+    ).scalars()
+    scanned = " ".join(plan)
+    assert partition_name("events", datetime.date(2023, 2, 1)) in scanned
+    assert "events_default" not in scanned
@@ -94,7 +94,7 @@ def test_read_replenishments_all_time(session) -> None:
     ]
     data = session.execute(data).fetchall()
     for data, expense in zip(data, expenses):
-        data_instance = data[0]
+        data_instance = data
         assert data_instance.id == expense.id
         assert data_instance.time == expense.time
         assert data_instance.amount == expense.amount
@@ -118,24 +118,22 @@ def test_read_replenishments_month(session) -> None:
     data = session.execute(data).fetchall()
     assert len(data) == len(replenishments)
     for data, replenishments in zip(data, replenishments):
-        data_instance = data[0]
+        data_instance = data
         assert data_instance.id == replenishments.id
         assert data_instance.time == replenishments.time
         assert data_instance.amount == replenishments.amount
         assert data_instance.descriptions == replenishments.descriptions
-        assert data_instance.user.id == user.id
 
     replenishments = [second_replenishments, third_replenishments]
     data = read_replenishments(user_id=user.id, filter_date=time)
     data = session.execute(data).fetchall()
     assert len(data) == len(replenishments)
     for data, replenishments in zip(data, replenishments):
-        data_instance = data[0]
+        data_instance = data
         assert data_instance.id == replenishments.id
         assert data_instance.time == replenishments.time
         assert data_instance.amount == replenishments.amount
         assert data_instance.descriptions == replenishments.descriptions
-        assert data_instance.user.id == user.id
 
 
 def test_read_replenishments_time_range(session) -> None:
@@ -163,9 +161,8 @@ def test_read_replenishments_time_range(session) -> None:
     data = session.execute(data).fetchall()
     assert len(data) == len(replenishments)
     for data, replenishments in zip(data, replenishments):
-        data_instance = data[0]
+        data_instance = data
         assert data_instance.id == replenishments.id
         assert data_instance.time == replenishments.time
         assert data_instance.amount == replenishments.amount
         assert data_instance.descriptions == replenishments.descriptions
-        assert data_instance.user.id == user.id
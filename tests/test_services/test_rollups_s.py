@@ -0,0 +1,77 @@
+from sqlalchemy import create_engine, update
+from sqlalchemy.orm import Session
+
+from config import settings
+from database import Base
+from enums import GroupStatusEnum
+from models import Group, GroupCounter, User, UserArchiveTotal
+from rollups import run
+from schemas import ExpenseCreate
+from services import create_expense
+from services.counters import read_group_counter_drift, rebuild_group_counters
+from tests.factories import CategoryFactory, CategoryGroupFactory
+
+
+def test_drift_is_found_and_rebuilt(session, dependence_factory, activity) -> None:
+    group_id = dependence_factory["first_group"].id
+    assert read_group_counter_drift(session, group_id, group_id + 1) == []
+    session.execute(
+        update(GroupCounter).filter_by(group_id=group_id).values(expense_count=7)
+    )
+    (drift,) = read_group_counter_drift(session, group_id, group_id + 1)
+    assert (drift["stored_expense_count"], drift["expense_count"]) == (7, 1)
+    assert rebuild_group_counters(session, group_id, group_id + 1) == 1
+    assert read_group_counter_drift(session, group_id, group_id + 1) == []
+
+
+def test_queued_changes_are_not_drift(session, dependence_factory, monkeypatch) -> None:
+    monkeypatch.setattr(settings, "COUNTERS_WRITE_BEHIND", True)
+    factories = dependence_factory
+    group_id = factories["first_group"].id
+    category = CategoryFactory()
+    CategoryGroupFactory(category_id=category.id, group_id=group_id)
+    create_expense(
+        session,
+        factories["first_user"].id,
+        group_id,
+        ExpenseCreate(
+            descriptions="descriptions",
+            amount=10,
+            category_id=category.id,
+        ),
+    )
+    assert read_group_counter_drift(session, group_id, group_id + 1) == []
+
+
+def test_cli_verify_and_repair(tmp_path, capsys) -> None:
+    uri = f"sqlite:///{tmp_path / 'rollups.db'}"
+    db_engine = create_engine(uri)
+    Base.metadata.create_all(bind=db_engine)
+    with Session(db_engine) as db:
+        db.add(User(id=1, login="user@example.com", first_name="a", last_name="b"))
+        for group_id in range(1, 6):
+            db.add(
+                Group(
+                    id=group_id,
+                    title="title",
+                    description="description",
+                    admin_id=1,
+                    status=GroupStatusEnum.ACTIVE,
+                    icon_url="icon",
+                    color_code="color",
+                )
+            )
+        db.flush()
+        db.add(GroupCounter(group_id=2, member_count=3, expense_count=0))
+        db.add(UserArchiveTotal(user_id=1, expense_amount=5))
+        db.commit()
+    db_engine.dispose()
+    assert run(uri, "verify", workers=2, chunk_size=2) == 1
+    assert "Found drift in 5 groups and 1 users" in capsys.readouterr().out
+    assert run(uri, "verify", workers=2, chunk_size=2, repair=True) == 0
+    assert run(uri, "verify", workers=2, chunk_size=2) == 0
+    assert "Found drift in 0 groups and 0 users" in capsys.readouterr().out
+    assert run(uri, "rebuild", workers=2, chunk_size=2) == 0
+    output = capsys.readouterr().out
+    assert "Rebuilt the counters of 5 groups" in output
+    assert "Rebuilt the archived totals of 1 users" in output
@@ -0,0 +1,90 @@
+import pytest
+from sqlalchemy import create_engine, select
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.sessions import SessionMiddleware
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from database import Base, ReplicaRoutingMiddleware, RoutingSession
+from database.routing import Routing, _routing
+from models import User
+
+
+@pytest.fixture()
+def engines(tmp_path):
+    primary = create_engine(f"sqlite:///{tmp_path / 'primary.db'}")
+    replica = create_engine(f"sqlite:///{tmp_path / 'replica.db'}")
+    for db_engine in (primary, replica):
+        Base.metadata.create_all(bind=db_engine)
+    yield primary, replica
+    primary.dispose()
+    replica.dispose()
+
+
+def add_user(db: RoutingSession, login: str) -> None:
+    db.add(User(login=login, first_name="first", last_name="last"))
+    db.commit()
+
+
+def count_users(db: RoutingSession) -> int:
+    return len(db.scalars(select(User)).all())
+
+
+def test_reads_go_to_replica(engines) -> None:
+    primary, replica = engines
+    with RoutingSession(bind=primary) as db:
+        add_user(db, "primary@example.com")
+    with RoutingSession(bind=primary, replica=replica) as db:
+        assert count_users(db) == 0
+
+
+def test_reads_after_write_stay_on_primary(engines) -> None:
+    primary, replica = engines
+    with RoutingSession(bind=primary, replica=replica) as db:
+        add_user(db, "primary@example.com")
+        assert count_users(db) == 1
+
+
+def test_pinned_request_reads_primary(engines) -> None:
+    primary, replica = engines
+    with RoutingSession(bind=primary) as db:
+        add_user(db, "primary@example.com")
+    token = _routing.set(Routing(primary=True))
+    try:
+        with RoutingSession(bind=primary, replica=replica) as db:
+            assert count_users(db) == 1
+    finally:
+        _routing.reset(token)
+
+
+@pytest.mark.parametrize("sticky_seconds, expected", [(60.0, 1), (0.0, 0)])
+def test_sticky_window_after_write(engines, sticky_seconds, expected) -> None:
+    primary, replica = engines
+
+    async def users(request):
+        with RoutingSession(bind=primary, replica=replica) as db:
+            if request.method == "POST":
+                add_user(db, "primary@example.com")
+            return JSONResponse({"users": count_users(db)})
+
+    app = Starlette(
+        routes=[Route("/users", users, methods=["GET", "POST"])],
+        middleware=[
+            Middleware(SessionMiddleware, secret_key="secret"),
+            Middleware(ReplicaRoutingMiddleware, sticky_seconds=sticky_seconds),
+        ],
+    )
+    client = TestClient(app)
+    assert client.post("/users").json() == {"users": 1}
+    assert client.get("/users").json() == {"users": expected}
+
+
+def test_locking_reads_go_to_primary(engines) -> None:
+    primary, replica = engines
+    with RoutingSession(bind=primary) as db:
+        add_user(db, "primary@example.com")
+    with RoutingSession(bind=primary, replica=replica) as db:
+        assert len(db.scalars(select(User).with_for_update()).all()) == 1
+        assert count_users(db) == 1
@@ -0,0 +1,96 @@
+import datetime
+
+import pytest
+from starlette.exceptions import HTTPException
+
+from services import search_history
+from tests.factories import (
+    CategoryFactory,
+    CategoryGroupFactory,
+    ExpenseFactory,
+    GroupFactory,
+    ReplenishmentFactory,
+)
+
+
+@pytest.fixture
+def descriptions(dependence_factory) -> dict:
+    factories = dependence_factory
+    user_id = factories["first_user"].id
+    group_id = factories["first_group"].id
+    category = CategoryFactory()
+    CategoryGroupFactory(category_id=category.id, group_id=group_id)
+    other_group = GroupFactory(admin_id=factories["second_user"].id)
+    CategoryGroupFactory(category_id=category.id, group_id=other_group.id)
+    start = datetime.datetime(2023, 3, 1)
+    expenses = [
+        ExpenseFactory(
+            descriptions=f"Pizza night {index}",
+            amount=10 + index,
+            user_id=user_id,
+            group_id=group_id,
+            category_id=category.id,
+            time=start + datetime.timedelta(days=index),
+        )
+        for index in range(5)
+    ]
+    ExpenseFactory(
+        descriptions="Pizza in another group",
+        user_id=factories["second_user"].id,
+        group_id=other_group.id,
+        category_id=category.id,
+    )
+    ExpenseFactory(
+        descriptions="Groceries",
+        user_id=user_id,
+        group_id=group_id,
+        category_id=category.id,
+    )
+    replenishment = ReplenishmentFactory(
+        descriptions="Salary for pizzas", amount=500, user_id=user_id, time=start
+    )
+    return {"expenses": expenses, "replenishment": replenishment}
+
+
+def test_search_scoped_to_user(session, dependence_factory, descriptions) -> None:
+    user_id = dependence_factory["first_user"].id
+    page = search_history(session, user_id, "piz")
+    found = {(item.kind, item.id) for item in page.items}
+    assert found == {
+        ("expense", expense.id) for expense in descriptions["expenses"]
+    } | {("replenishment", descriptions["replenishment"].id)}
+    assert page.next_cursor is None
+
+
+def test_search_filters(session, dependence_factory, descriptions) -> None:
+    user_id = dependence_factory["first_user"].id
+    group_id = dependence_factory["first_group"].id
+    page = search_history(
+        session, user_id, "pizza NIGHT", group_id=group_id, min_amount=12, max_amount=13
+    )
+    assert sorted(item.amount for item in page.items) == [12, 13]
+    assert {item.kind for item in page.items} == {"expense"}
+
+
+def test_search_keyset_pages(session, dependence_factory, descriptions) -> None:
+    user_id = dependence_factory["first_user"].id
+    ids, cursor = [], None
+    while True:
+        page = search_history(session, user_id, "pizza", cursor=cursor, size=2)
+        ids += [(item.kind, item.id) for item in page.items]
+        if page.next_cursor is None:
+            break
+        cursor = page.next_cursor
+    assert len(ids) == len(set(ids)) == 6
+    assert ids == [
+        (item.kind, item.id)
+        for item in search_history(session, user_id, "pizza", size=10).items
+    ]
+
+
+def test_search_rejects_bad_input(session, dependence_factory) -> None:
+    user_id = dependence_factory["first_user"].id
+    with pytest.raises(HTTPException):
+        search_history(session, user_id, "--")
+    with pytest.raises(HTTPException):
+        search_history(session, user_id, "pizza", cursor="not a cursor")